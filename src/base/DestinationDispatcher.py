@@ -0,0 +1,116 @@
+import asyncio
+import numpy as np
+
+from src.base.FloorList import FLOOR_LIST
+from src.base.MatchingDispatcher import MatchingDispatcher
+from src.metrics.BoardingTime import boarding_times
+from src.utils.Clock import CLOCK
+
+
+class DestinationDispatcher(MatchingDispatcher):
+    """
+    destination dispatch, each arriving passenger is allocated to a lift by source and target at once
+    the lift with the cheapest sum of time to reach the source, stops its trip adds to the lift's
+    stop set and boarding time at the lift's committed load takes the passenger, full lifts are skipped
+    passengers with the same destination so share lifts, cutting stops per round trip
+    allocations are written straight into the lift assignment, and each lift to replan is woken once
+    lifts should run with assign_multi and bypass_prev_assignment off, so each boards only its own passengers
+    """
+    EPOCH = 0.0
+
+    def __init__(self, passengers, epoch=EPOCH, stop_time=MatchingDispatcher.STOP_TIME) -> None:
+        super().__init__(passengers, epoch=epoch, stop_time=stop_time, slots=1)
+        self.allocations = 0
+        self.retry = None
+
+    def allocate_trips(self, time, sources, targets) -> np.ndarray:
+        """
+        index of the lift each trip is allocated to in turn, -1 from the first trip no lift has room for
+        the costs of a trip over the fleet are one array expression, and each allocation
+        adds to the load and committed stops the following trips are costed against
+        """
+        fleet = self.passengers.fleet
+        fleet.refresh(time)
+        floors, source_rows = np.unique(np.asarray(sources, dtype=object), return_inverse=True)
+        reaching = fleet.reaching_time_matrix(time, floors)
+        # a lift that cannot stop at the source comes back after its current target
+        heights = FLOOR_LIST.heights_of(floors)[:, None]
+        after_target = fleet.calc_time(fleet.target_height) + \
+            fleet.spec_calc_times(np.abs(heights - fleet.target_height[None, :]))
+        waits = np.where(np.isnan(reaching), after_target, reaching)
+        committed = self.passengers.stop_sets.committed([lift.name for lift in fleet.lifts], FLOOR_LIST.floor_index)
+        load = np.array([lift.get_total_assigned() for lift in fleet.lifts], dtype=np.int64)
+        allocated = np.full(len(source_rows), -1, dtype=np.int64)
+        source_ordinals = FLOOR_LIST.ordinals_of(sources).tolist()
+        target_ordinals = FLOOR_LIST.ordinals_of(targets).tolist()
+        for k, (row, source, target) in enumerate(zip(source_rows.tolist(), source_ordinals, target_ordinals)):
+            new_stops = (~committed[:, source]).astype(np.int64) + ~committed[:, target]
+            costs = waits[row] + self.stop_time * new_stops + boarding_times(fleet.capacity, load, 0, 1)
+            costs[load >= fleet.capacity] = np.inf
+            if not np.isfinite(costs).any():
+                break
+            i = int(np.argmin(costs))
+            allocated[k] = i
+            load[i] += 1
+            committed[i, [source, target]] = True
+        return allocated
+
+    def has_room(self) -> bool:
+        return any(lift.get_total_assigned() < lift.capacity for lift in self.passengers.fleet.lifts)
+
+    def retry_later(self):
+        "dispatches again a stop later, as at epoch 0 retrying at once would keep the virtual clock from advancing"
+        if self.retry is None or self.retry.cancelled() or self.retry.when() <= asyncio.get_running_loop().time():
+            self.retry = asyncio.get_running_loop().call_later(self.stop_time, self.notify)
+
+    async def dispatch(self):
+        store = self.passengers.store
+        unassigned = np.flatnonzero((store.column('status') == 'Waiting') & (store.column('lift') == 0))
+        if unassigned.size == 0:
+            return
+        if not self.has_room():
+            # passengers no lift has room for are retried once lifts unload
+            self.retry_later()
+            return
+        order = unassigned[np.argsort(store.column('trip_start_time')[unassigned], kind='stable')]
+        sources = store.column('source')[order]
+        dirs = store.column('dir')[order]
+        allocated = self.allocate_trips(CLOCK.now(), sources, store.column('target')[order])
+        if (allocated < 0).any():
+            self.retry_later()
+        fleet = self.passengers.fleet
+        stop_heights = fleet.status_to_stop()
+        for i in np.unique(allocated[allocated >= 0]).tolist():
+            lift = fleet.lifts[i]
+            trips = np.flatnonzero(allocated == i)
+            for source in np.unique(sources[trips]).tolist():
+                at_source = trips[sources[trips] == source]
+                selection = self.passengers.select(order[at_source])
+                self.passengers.assign_lift_for_selection(lift, selection, assign_multi=False)
+                FLOOR_LIST.get_floor(source).passengers.assign_lift_for_selection(lift, selection, assign_multi=False)
+            self.wake_to_replan(lift, stop_heights[i], sources[trips], dirs[trips])
+            self.allocations += trips.size
+
+    def wake_to_replan(self, lift, stop_height, sources, dirs):
+        """
+        wakes a stationed lift, or a moving lift for the nearest source it can still stop at
+        on its way in the passengers' direction, so it redirects there
+        a loading lift picks up its passengers when it chooses its next target
+        """
+        if lift.is_stationed():
+            lift.wake(sources[0], dirs[0])
+            return
+        if lift.loading_state is not False:
+            return
+        current_floor = FLOOR_LIST.get_floor(lift.floor)
+        target_floor = FLOOR_LIST.get_floor(lift.floor_move_state['target_floor'])
+        sign = 1 if lift.dir == 'U' else -1
+        passing = []
+        for source, dir in dict.fromkeys(zip(sources.tolist(), dirs.tolist())):
+            floor = FLOOR_LIST.get_floor(source)
+            ahead = (floor.height - stop_height) * sign
+            if ahead >= 0 and lift.is_within_next_target(current_floor, target_floor, lift.dir, floor, dir):
+                passing += [(ahead, source, dir)]
+        if passing:
+            _, source, dir = min(passing)
+            lift.wake(source, dir)
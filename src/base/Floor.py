@@ -1,8 +1,8 @@
 from logging import INFO, DEBUG
-from datetime import datetime
 from pandas import NaT
 
 from src.utils.Logging import get_logger
+from src.utils.Clock import CLOCK
 
 class Floor:
     def __init__(self, floorname, height) -> None:
@@ -14,7 +14,7 @@ class Floor:
 
     def init_logger(self):
         logger = get_logger(self.name, self.__class__.__name__, INFO)
-        self.log = lambda msg: logger.info(msg)
+        self.log = lambda msg, *args: logger.info(msg, *args)
 
     @property
     def name(self):
@@ -66,7 +66,7 @@ class Floor:
         df['start_time'] = format_start_time(df)
 
         print_cols = ['trip', 'dir', 'start_time']
-        print('Floor', self.name, 'passengers waiting at', passenger_time_format(datetime.now()))
+        print('Floor', self.name, 'passengers waiting at', passenger_time_format(CLOCK.now()))
         if self.passengers.count_passengers() > 0:
             print(df.loc[:, print_cols].sort_values(ordering))
         else:
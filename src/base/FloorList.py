@@ -1,27 +1,84 @@
+import numpy as np
 import pandas as pd
 
 from src.base.Floor import Floor
 
 class FloorList:
+    """
+    floors from the bottom up, each floor's position in floornames is its ordinal
+    so floors compare and order as integers, not by name
+    """
     def __init__(self, floors, floor_heights):
+        # bumped on every change, so caches keyed on it never see stale floors
+        self.version = 0
+        self.reset(floors, floor_heights)
+
+    def reset(self, floors, floor_heights):
+        "replaces all floors in place, so modules holding this list see the new floors, only before a simulation starts"
         self.floors = []
         self.floornames = []
-
+        # ordinal of each floor, indexes rows and columns of travel time matrices
+        self.floor_index = {}
+        self.floor_lookup = {}
         for floorname in floors:
-            self.add_floor(Floor(floorname, floor_heights[floorname]))
+            self.register_floor(Floor(floorname, floor_heights[floorname]))
+        # arrays are built once for all floors
+        self.heights = np.array([floor.height for _, floor in self.floors], dtype=np.float64)
+        self.floorname_array = np.array(self.floornames, dtype=object)
+        self.version += 1
 
-    def add_floor(self, floor: Floor):
-        assert floor.name not in self.floornames
+    def register_floor(self, floor: Floor):
+        assert floor.name not in self.floor_index
+        # ordinals follow height
+        assert len(self.floors) == 0 or floor.height >= self.floors[-1][1].height
+        self.floor_index[floor.name] = len(self.floornames)
+        self.floor_lookup[floor.name] = floor
         self.floornames += [floor.name]
         self.floors += [[floor.name, floor]]
         floor.init_logger()
 
+    def add_floor(self, floor: Floor):
+        "adds a floor on top of the existing ones"
+        self.register_floor(floor)
+        self.heights = np.append(self.heights, floor.height)
+        self.floorname_array = np.append(self.floorname_array, np.array([floor.name], dtype=object))
+        self.version += 1
+
     def get_floor(self, floorname):
         if floorname is None:
             return None
-        if floorname not in self.floornames:
+        if floorname not in self.floor_lookup:
+            raise ValueError('Invalid floor name')
+        return self.floor_lookup[floorname]
+
+    def get_floor_index(self, floorname) -> int:
+        if floorname not in self.floor_index:
             raise ValueError('Invalid floor name')
-        return [f[1] for f in self.floors if f[0] == floorname][0]
+        return self.floor_index[floorname]
+
+    def ordinals_of(self, floornames) -> np.ndarray:
+        return np.fromiter((self.floor_index[f] for f in floornames), dtype=np.int64, count=len(floornames))
+
+    def names_of(self, ordinals) -> np.ndarray:
+        return self.floorname_array[ordinals]
+
+    def heights_of(self, floornames) -> np.ndarray:
+        return self.heights[self.ordinals_of(floornames)]
+
+    def get_direction(self, source, target):
+        "'U' or 'D' for a trip between floor names, None for the same floor"
+        source_index, target_index = self.get_floor_index(source), self.get_floor_index(target)
+        if target_index > source_index:
+            return 'U'
+        elif target_index < source_index:
+            return 'D'
+        return None
+
+    def get_bottom_floor(self):
+        return self.floornames[0]
+
+    def get_top_floor(self):
+        return self.floornames[-1]
     
     def list_floors(self):
         return self.floornames
@@ -65,5 +122,5 @@ class FloorList:
 FLOORS = ['G'] + list('L' + str(i).zfill(2) for i in range(1, 20))
 FLOOR_HEIGHTS = {i:float(2+int(i[1:])*3) if i != 'G' else 0.0 for i in FLOORS}
 FLOOR_LIST = FloorList(FLOORS, FLOOR_HEIGHTS)
-MIN_FLOOR = min(FLOORS)
-MAX_FLOOR = max(FLOORS)
+MIN_FLOOR = FLOOR_LIST.get_bottom_floor()
+MAX_FLOOR = FLOOR_LIST.get_top_floor()
@@ -1,24 +1,41 @@
 import asyncio
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
 from logging import INFO, DEBUG
-
-from src.utils.Logging import get_logger, print_st
+from typing import NamedTuple
+
+from src.utils.Logging import get_logger, Deferred
+from src.utils.Events import (
+    EVENTS, Boarded, Offboarded, Redirected, LiftMoved, LiftMoving, LiftTargetChosen,
+    LiftStationed, LiftLoaded, StatusCounts
+)
+from src.utils.Clock import CLOCK
 from src.base.Floor import Floor
 from src.base.PassengerList import PassengerList, PASSENGERS
+from src.base.LiftAssignment import LiftAssignment
 from src.base.FloorList import FLOOR_LIST, MAX_FLOOR, MIN_FLOOR
 from src.metrics.LiftSpec import LiftSpec
-from src.metrics.CalcMovingFloor import CalcMovingFloor
 from src.metrics.CalcAccelModelMovingStatus import CalcAccelModelMovingStatus
+from src.metrics.Trajectory import Trajectory
 
 LIFT_CAPACITY_DEFAULT = 12
 
+class Wake(NamedTuple):
+    "arrival message of a dispatcher that already assigned the call to the lift, it expects no answer"
+    source: str
+    target: str
+    dir: str
+
+
 class Lift:
     "lift class"
 
     def __init__(self, name, floorname, dir, capacity = LIFT_CAPACITY_DEFAULT, model = "accel", 
-                 lift_managing=False, lift_tracking=True) -> None:
+                 lift_managing=False, lift_tracking=True, spec: LiftSpec = None,
+                 assign_multi=True, bypass_prev_assignment=True, onboarding_mode='earliest') -> None:
         self.name = name
+        LiftAssignment.bit(name)
         self.floor = floorname
         self.height = self.get_current_floor().height
         self.dir = dir
@@ -27,14 +44,21 @@ class Lift:
         self.passenger_count = 0
         self.passengers: PassengerList = PassengerList(lift_managing=lift_managing, lift_tracking=lift_tracking)
         self.calculate_passenger_count()
-        self.model = LiftSpec(model=model)
+        self.model = spec if spec is not None else LiftSpec.shared(model=model)
+        # baseline coordination settings
+        self.assign_multi = assign_multi
+        self.bypass_prev_assignment = bypass_prev_assignment
+        # 'earliest' or 'random', which waiting passengers board when capacity is insufficient
+        if onboarding_mode not in ('earliest', 'random'):
+            raise ValueError('Invalid onboarding_mode')
+        self.onboarding_mode = onboarding_mode
         # lift movement state
         self.next_height = self.height
         self.redirect_state = False
         self.floor_move_state = {
             'start_move_floor':self.floor,
             'target_floor': self.floor,
-            'start_move_time': datetime.now()
+            'start_move_time': CLOCK.now()
         }
         self.loading_state = False
         self.arrival_queue = asyncio.Queue()
@@ -42,19 +66,19 @@ class Lift:
         # logging
         logger = get_logger(name, self.__class__.__name__, INFO)
         detail_logger = get_logger(name+'_det', self.__class__.__name__, DEBUG)
-        self.log = lambda msg: logger.info(msg)
-        self.detail_log = lambda msg: detail_logger.debug(msg)
-        self.log(f"{self.name}: init")
+        self.log = lambda msg, *args: logger.info(msg, *args)
+        self.detail_log = lambda msg, *args: detail_logger.debug(msg, *args)
+        self.log("%s: init", self.name)
 
     def __del__(self):
-        self.log(f"{self.name}: start destructing")
+        self.log("%s: start destructing", self.name)
         while not self.arrival_queue.empty():
             msg = self.arrival_queue.get_nowait()
-            self.log(f"{self.name}: flushing arrival_queue item {msg}")
+            self.log("%s: flushing arrival_queue item %s", self.name, msg)
         while not self.reassignment_queue.empty():
             msg = self.reassignment_queue.get_nowait()
-            self.log(f"{self.name}: flushing reassignment_queue item {msg}")
-        self.log(f"{self.name}: destruction complete")
+            self.log("%s: flushing reassignment_queue item %s", self.name, msg)
+        self.log("%s: destruction complete", self.name)
 
     def calculate_passenger_count(self) -> None:
         self.passenger_count = self.passengers.count_passengers()
@@ -92,25 +116,43 @@ class Lift:
     def set_stationed(self):
         self.dir = 'S'
     
+    def wake(self, source, dir):
+        "lets the lift replan for a call a dispatcher already assigned to it"
+        self.arrival_queue.put_nowait(Wake(source, None, dir))
+
+    def respond(self, msg, accepted):
+        "answers an arrival message on lift_msg_queue, wake ups are not awaited so get no answer"
+        if not isinstance(msg, Wake):
+            PASSENGERS.lift_msg_queue.put_nowait(accepted)
+
+    def has_waiting_call(self, msg):
+        "whether the message's call has passengers to redirect for, unassigned or for a wake up assigned to this lift"
+        source, _, dir = msg
+        waiting = PASSENGERS.filter_waiting_at(FLOOR_LIST.get_floor(source), dir)
+        if isinstance(msg, Wake):
+            return waiting.filter_by_lift_assigned(self).count_passengers() > 0
+        return waiting.filter_by_lift_unassigned().count_passengers() > 0
+
     async def assign_passengers_while_boarding(self, time_to_board):
         try:
             first_assignment = True
             time_left_for_boarding = time_to_board
             arrival_queue = self.arrival_queue
-            boarding_time_from = datetime.now()
+            boarding_time_from = CLOCK.now()
             while True:
                 pa_trigger = asyncio.wait_for(arrival_queue.get(), timeout=time_left_for_boarding)
-                self.log(f'{self.name} pending arrivals while boarding')
+                self.log("%s pending arrivals while boarding", self.name)
                 triggered = False
-                new_source, _, new_dir = await pa_trigger
+                msg = await pa_trigger
+                new_source, _, new_dir = msg
                 triggered = True
-                self.log(f'{self.name}. evaluating while loading {new_source, _, new_dir}')
+                self.log("%s. evaluating while loading %s", self.name, (new_source, _, new_dir))
                 current_floor = FLOOR_LIST.get_floor(self.floor)
                 floor = FLOOR_LIST.get_floor(new_source)
                 if self.floor != new_source:
                     current_target = FLOOR_LIST.get_floor(self.loading_state['current_target'])
                     if current_target is None:
-                        self.detail_log(f'{self.name} debugging loading_state None')
+                        self.detail_log("%s debugging loading_state None", self.name)
                     if (
                         current_target is None or
                         self.is_within_next_target(current_floor, current_target, self.next_dir, floor, new_dir)
@@ -118,36 +160,35 @@ class Lift:
                         new_target = self.precalc_next_target_after_loading()
                         self.update_next_dir(new_target)
                         if new_target is not None:
-                            self.detail_log(f'{self.name} loading_state current_target set to {new_target}')
+                            self.detail_log("%s loading_state current_target set to %s", self.name, new_target)
                             self.loading_state['current_target'] = new_target
-                        self.assign_passengers(new_target, assign_multi=True)
+                        self.assign_passengers(new_target, assign_multi=self.assign_multi)
                         if not first_assignment:
                             self.unassign_passengers(prev_new_source, prev_new_dir)
 
-                        self.log(f'{self.name} arrival calc True')
-                        PASSENGERS.lift_msg_queue.put_nowait(True)
+                        self.log("%s arrival calc True", self.name)
+                        self.respond(msg, True)
                         triggered = False
                         await asyncio.sleep(0)
 
                         first_assignment = False
                         prev_new_source, prev_new_dir = new_target, self.next_dir
 
-                        time_now = datetime.now()
+                        time_now = CLOCK.now()
                         time_taken_to_arrive = (time_now - boarding_time_from).total_seconds()
-                        self.log(f"{self.name}: at floor {self.floor} facing {self.dir} "
-                                 f"while loading assigned to floor {floor.name} dir {self.next_dir} "
-                                 f"after {time_taken_to_arrive}")
+                        self.log("%s: at floor %s facing %s while loading assigned to floor %s dir %s after %s",
+                                 self.name, self.floor, self.dir, floor.name, self.next_dir, time_taken_to_arrive)
                         boarding_time_from = time_now
                         time_left_for_boarding -= time_taken_to_arrive
                         if time_left_for_boarding <= 0:
                             break # break while-loop
                         else:
                             continue # continue while-loop
-                self.log(f'{self.name} arrival calc False')
-                PASSENGERS.lift_msg_queue.put_nowait(False)
+                self.log("%s arrival calc False", self.name)
+                self.respond(msg, False)
                 triggered = False
                 await asyncio.sleep(0)
-                time_now = datetime.now()
+                time_now = CLOCK.now()
                 time_taken = (time_now - boarding_time_from).total_seconds()
                 boarding_time_from = time_now
                 time_left_for_boarding -= time_taken
@@ -156,13 +197,13 @@ class Lift:
                 else:
                     continue
         except asyncio.TimeoutError:
-            self.log(f'{self.name} arrival calc timeout')
+            self.log("%s arrival calc timeout", self.name)
             # does it ever enter here
             if triggered:
-                PASSENGERS.lift_msg_queue.put_nowait(False)
+                self.respond(msg, False)
                 self.log('lift_msg_queue to release arrival queue')
             await asyncio.sleep(0)
-            self.log(f'{self.name} finish boarding')
+            self.log("%s finish boarding", self.name)
     
     def precalc_num_to_onboard(self, onboarding_mode, bypass_prev_assignment=True, return_index=False):
         """
@@ -172,37 +213,31 @@ class Lift:
         floor = self.get_current_floor()
         if onboarding_mode == 'all':
             if bypass_prev_assignment:
-                passengers_to_assign = PASSENGERS.filter_by_status_waiting() \
-                    .filter_by_floor(floor)
+                passengers_to_assign = PASSENGERS.filter_waiting_at(floor)
             else:
-                passengers_to_assign = PASSENGERS.filter_by_status_waiting() \
-                    .filter_by_floor(floor) \
+                passengers_to_assign = PASSENGERS.filter_waiting_at(floor) \
                     .filter_by_lift_assigned_not_to_other_only(self)
             return passengers_to_assign.count_passengers()
         else:
             if bypass_prev_assignment:
-                eligible_passengers = PASSENGERS.filter_by_status_waiting() \
-                    .filter_by_floor(floor) \
-                    .filter_by_direction(self.next_dir)
+                eligible_passengers = PASSENGERS.filter_waiting_at(floor, self.next_dir)
             else:
-                eligible_passengers = PASSENGERS.filter_by_status_waiting() \
-                    .filter_by_floor(floor) \
-                    .filter_by_direction(self.next_dir) \
+                eligible_passengers = PASSENGERS.filter_waiting_at(floor, self.next_dir) \
                     .filter_by_lift_assigned_not_to_other_only(self)
             if self.has_capacity_for(eligible_passengers):
-                selection = eligible_passengers.df
+                passenger_list = eligible_passengers
             else:
                 if onboarding_mode == 'random':
-                    selection = eligible_passengers.sample_passengers(self.capacity - self.passenger_count)
-                elif onboarding_mode == 'earliest':
-                    selection = eligible_passengers.filter_dir_for_earliest_arrival(
-                        self.dir, self.capacity - self.passenger_count
+                    passenger_list = PassengerList(
+                        eligible_passengers.sample_passengers(self.capacity - self.passenger_count)
                     )
+                elif onboarding_mode == 'earliest':
+                    passenger_list = eligible_passengers.filter_by_direction(self.dir) \
+                        .filter_first_arrivals(self.capacity - self.passenger_count)
                 else:
                     raise ValueError('Invalid onboarding_mode')
-            passenger_list = PassengerList(selection)
             if return_index:
-                return passenger_list.df.index
+                return passenger_list.get_ids()
             return passenger_list.count_passengers()
 
     async def onboard_all(self, bypass_prev_assignment=True):
@@ -210,12 +245,10 @@ class Lift:
         floor = self.get_current_floor()
         # assign lift
         if bypass_prev_assignment:
-            passengers_to_assign = PASSENGERS.filter_by_status_waiting() \
-                .filter_by_floor(floor)
+            passengers_to_assign = PASSENGERS.filter_waiting_at(floor)
             PASSENGERS.assign_lift_for_selection(self, passengers_to_assign, assign_multi=False)
         else:
-            passengers_to_assign = PASSENGERS.filter_by_status_waiting() \
-                .filter_by_floor(floor) \
+            passengers_to_assign = PASSENGERS.filter_waiting_at(floor) \
                 .filter_by_lift_assigned_not_to_other_only(self)
             PASSENGERS.assign_lift_for_selection(self, passengers_to_assign, assign_multi=False)
         # board
@@ -233,34 +266,30 @@ class Lift:
         self.passengers.assign_lift(self, assign_multi=False)
         self.passengers.board(passengers_to_assign)
         floor.onboard_selected(passengers_to_assign)
-        floor.log(f"{floor.name}: {num_to_onboard} passengers boarded")
-        floor.log(f"{floor.name}: passenger count is {floor.passengers.count_passengers()}")
+        floor.log("%s: %s passengers boarded", floor.name, num_to_onboard)
+        floor.log("%s: passenger count is %s", floor.name, floor.passengers.count_passengers())
         self.calculate_passenger_count()
-        self.log(f"{self.name}: Updated passenger count {self.passenger_count}")
+        self.log("%s: Updated passenger count %s", self.name, self.passenger_count)
 
         if time_to_onboard > 0:
-            self.detail_log(f'{self.name}: onboarding {num_to_onboard} passengers takes {time_to_onboard} s')
+            self.detail_log("%s: onboarding %s passengers takes %s s", self.name, num_to_onboard, time_to_onboard)
             await asyncio.sleep(time_to_onboard)
-        self.log(f"{self.name}: Onboarding {num_to_onboard} passengers at floor {floor.name}")
-        print_st(f"{num_to_onboard} passengers boarded {self.name} at {floor.name}")
+        self.log("%s: Onboarding %s passengers at floor %s", self.name, num_to_onboard, floor.name)
+        EVENTS.emit(Boarded, self.name, floor.name, num_to_onboard)
 
     async def onboard_random_available(self, bypass_prev_assignment=True):
         "onboards passengers on the same floor by random if capacity is insufficient"
         floor = FLOOR_LIST.get_floor(self.floor)
         if bypass_prev_assignment:
-            eligible_passengers = PASSENGERS.filter_by_status_waiting() \
-                .filter_by_floor(floor) \
-                .filter_by_direction(self.next_dir)
+            eligible_passengers = PASSENGERS.filter_waiting_at(floor, self.next_dir)
         else:
-            eligible_passengers = PASSENGERS.filter_by_status_waiting() \
-                .filter_by_floor(floor) \
-                .filter_by_direction(self.next_dir) \
+            eligible_passengers = PASSENGERS.filter_waiting_at(floor, self.next_dir) \
                 .filter_by_lift_assigned_not_to_other_only(self)
         if self.has_capacity_for(eligible_passengers):
-            selection = eligible_passengers.df
+            passenger_list = eligible_passengers
         else:
             selection = eligible_passengers.sample_passengers(self.capacity - self.passenger_count)
-        passenger_list = PassengerList(selection)
+            passenger_list = PassengerList(selection)
 
         from src.metrics.BoardingTime import boarding_time
 
@@ -272,39 +301,33 @@ class Lift:
         PASSENGERS.assign_lift_for_selection(self, passenger_list, assign_multi=False)
         PASSENGERS.board(passenger_list)
         floor.onboard_selected(passenger_list)
-        floor.log(f"{floor.name}: {num_to_onboard} passengers boarded")
-        floor.log(f"{floor.name}: passenger count is {floor.passengers.count_passengers()}")
+        floor.log("%s: %s passengers boarded", floor.name, num_to_onboard)
+        floor.log("%s: passenger count is %s", floor.name, floor.passengers.count_passengers())
         self.passengers.bulk_add_passengers(passenger_list)
         self.passengers.assign_lift(self, assign_multi=False)
         self.passengers.board(passenger_list)
         self.calculate_passenger_count()
-        self.log(f"{self.name}: Updated passenger count {self.passenger_count}")
+        self.log("%s: Updated passenger count %s", self.name, self.passenger_count)
 
         if time_to_onboard > 0:
-            self.detail_log(f'{self.name}: onboarding {num_to_onboard} passengers takes {time_to_onboard} s')
+            self.detail_log("%s: onboarding %s passengers takes %s s", self.name, num_to_onboard, time_to_onboard)
             await asyncio.sleep(time_to_onboard)
-        self.log(f"{self.name}: Onboarding {num_to_onboard} passengers at floor {floor.name}")
-        print_st(f"{num_to_onboard} passengers boarded {self.name} at {floor.name}")
+        self.log("%s: Onboarding %s passengers at floor %s", self.name, num_to_onboard, floor.name)
+        EVENTS.emit(Boarded, self.name, floor.name, num_to_onboard)
 
     async def onboard_earliest_arrival(self, bypass_prev_assignment=True):
         "onboards passengers on the same floor by earliest assignment if capacity is insufficient"
         floor = FLOOR_LIST.get_floor(self.floor)
         if bypass_prev_assignment:
-            eligible_passengers = PASSENGERS.filter_by_status_waiting() \
-                .filter_by_floor(floor) \
-                .filter_by_direction(self.next_dir)
+            eligible_passengers = PASSENGERS.filter_waiting_at(floor, self.next_dir)
         else:
-            eligible_passengers = PASSENGERS.filter_by_status_waiting() \
-                .filter_by_floor(floor) \
-                .filter_by_direction(self.next_dir) \
+            eligible_passengers = PASSENGERS.filter_waiting_at(floor, self.next_dir) \
                 .filter_by_lift_assigned_not_to_other_only(self)
         if self.has_capacity_for(eligible_passengers):
-            selection = eligible_passengers.df
+            passenger_list = eligible_passengers
         else:
-            selection = eligible_passengers.filter_dir_for_earliest_arrival(
-                self.dir, self.capacity - self.passenger_count
-            )
-        passenger_list = PassengerList(selection)
+            passenger_list = eligible_passengers.filter_by_direction(self.dir) \
+                .filter_first_arrivals(self.capacity - self.passenger_count)
         
         from src.metrics.BoardingTime import boarding_time
 
@@ -316,19 +339,19 @@ class Lift:
         PASSENGERS.assign_lift_for_selection(self, passenger_list, assign_multi=False)
         PASSENGERS.board(passenger_list)
         floor.onboard_selected(passenger_list)
-        floor.log(f"{floor.name}: {num_to_onboard} passengers boarded")
-        floor.log(f"{floor.name}: passenger count is {floor.passengers.count_passengers()}")
+        floor.log("%s: %s passengers boarded", floor.name, num_to_onboard)
+        floor.log("%s: passenger count is %s", floor.name, floor.passengers.count_passengers())
         self.passengers.bulk_add_passengers(passenger_list)
         self.passengers.assign_lift(self, assign_multi=False)
         self.passengers.board(passenger_list)
         self.calculate_passenger_count()
-        self.log(f"{self.name}: Updated passenger count {self.passenger_count}")
+        self.log("%s: Updated passenger count %s", self.name, self.passenger_count)
 
         if time_to_board > 0:
-            self.detail_log(f'{self.name}: onboarding {num_to_onboard} passengers takes {time_to_board} s')
+            self.detail_log("%s: onboarding %s passengers takes %s s", self.name, num_to_onboard, time_to_board)
         await self.assign_passengers_while_boarding(time_to_board)
-        self.log(f"{self.name}: Onboarding {num_to_onboard} passengers at floor {floor.name}")
-        print_st(f"{num_to_onboard} passengers boarded {self.name} at {floor.name}")
+        self.log("%s: Onboarding %s passengers at floor %s", self.name, num_to_onboard, floor.name)
+        EVENTS.emit(Boarded, self.name, floor.name, num_to_onboard)
 
     def precalc_num_to_offboard(self, offboarding_mode):
         if offboarding_mode == 'all':
@@ -350,14 +373,14 @@ class Lift:
             return None
         time_to_offboard = boarding_time(self, num_to_offboard, num_to_offboard, 0)
         if time_to_offboard > 0:
-            self.detail_log(f'{self.name}: offboarding {num_to_offboard} passengers takes {time_to_offboard} s')
+            self.detail_log("%s: offboarding %s passengers takes %s s", self.name, num_to_offboard, time_to_offboard)
             await asyncio.sleep(time_to_offboard)
 
-        self.log(f"{self.name}: Offboarding {num_to_offboard} passengers at floor {floor.name}")
+        self.log("%s: Offboarding %s passengers at floor %s", self.name, num_to_offboard, floor.name)
         self.passengers.remove_all_passengers()
         self.calculate_passenger_count()
-        self.log(f"{self.name}: Updated passenger count {self.passenger_count}")
-        print_st(f"{num_to_offboard} passengers offboarded {self.name}")
+        self.log("%s: Updated passenger count %s", self.name, self.passenger_count)
+        EVENTS.emit(Offboarded, self.name, floor.name, num_to_offboard)
 
     async def offboard_arrived(self):
         current_floor = FLOOR_LIST.get_floor(self.floor)
@@ -370,19 +393,21 @@ class Lift:
             return None
         time_to_board = boarding_time(self, self.passenger_count, num_to_offboard, 0)
         if time_to_board > 0:
-            self.detail_log(f'{self.name}: offboarding {num_to_offboard} passengers takes {time_to_board} s')
+            self.detail_log("%s: offboarding %s passengers takes %s s", self.name, num_to_offboard, time_to_board)
         await self.assign_passengers_while_boarding(time_to_board)
 
-        self.log(f"{self.name}: Offboarding {num_to_offboard} passengers at floor {current_floor.name}")
+        self.log("%s: Offboarding %s passengers at floor %s", self.name, num_to_offboard, current_floor.name)
         self.passengers.remove_passengers(to_offboard)
         self.calculate_passenger_count()
         PASSENGERS.update_arrival(to_offboard)
-        self.log(f"{self.name}: Updated passenger count {self.passenger_count}")
-        print_st(f"{num_to_offboard} passengers offboarded {self.name} at {current_floor.name}")
+        self.log("%s: Updated passenger count %s", self.name, self.passenger_count)
+        EVENTS.emit(Offboarded, self.name, current_floor.name, num_to_offboard)
 
     def precalc_loading_time(self, offboarding_mode, onboarding_mode):
         num_to_offboard = self.precalc_num_to_offboard(offboarding_mode=offboarding_mode)
-        num_to_onboard = self.precalc_num_to_onboard(onboarding_mode=onboarding_mode)
+        num_to_onboard = self.precalc_num_to_onboard(
+            onboarding_mode=onboarding_mode, bypass_prev_assignment=self.bypass_prev_assignment
+        )
 
         from src.metrics.BoardingTime import boarding_time
 
@@ -395,60 +420,61 @@ class Lift:
         "moves to floor, responds to new async requests"
         current_floor = FLOOR_LIST.get_floor(self.floor)
         time_to_move = self.calc_time_to_move(current_floor, floor)
-        time_to_arrive = datetime.now() + timedelta(seconds=time_to_move)
-        self.detail_log(f'{self.name} schedule to arrive at {floor.name} in {round(time_to_move, 2)}')
+        time_to_arrive = CLOCK.now() + timedelta(seconds=time_to_move)
+        self.detail_log("%s schedule to arrive at %s in %s", self.name, floor.name, round(time_to_move, 2))
         if floor.height > self.height:
             self.dir = 'U'
         elif floor.height < self.height:
             self.dir = 'D'
         self.next_height = floor.height
-        self.log(f"{self.name}: Start move from {current_floor.name} height {current_floor.height} at dir {self.dir}")
+        self.log("%s: Start move from %s height %s at dir %s",
+                 self.name, current_floor.name, current_floor.height, self.dir)
 
-        time_since_latest_move = datetime.now()
+        time_since_latest_move = CLOCK.now()
         self.floor_move_state = {
             'start_move_floor':self.floor,
             'target_floor': floor.name,
             'start_move_time': time_since_latest_move
         }
+        trajectory = self.get_trajectory()
         try:
             while True:
                 redirect = False
                 arrival_queue = self.arrival_queue
                 pa_trigger = asyncio.wait_for(arrival_queue.get(), timeout=time_to_move)
-                self.log(f'{self.name} pending arrivals while moving')
+                self.log("%s pending arrivals while moving", self.name)
                 triggered = False
-                new_source, _, new_dir = await pa_trigger
+                msg = await pa_trigger
+                new_source, _, new_dir = msg
                 triggered = True
-                self.log(f'{self.name} arrival queue while moving {new_source, _, new_dir}')
+                self.log("%s arrival queue while moving %s", self.name, (new_source, _, new_dir))
                 if  (
                     self.has_capacity() and 
                     self.is_within_next_target(current_floor, floor, self.dir, 
                                                 FLOOR_LIST.get_floor(new_source), new_dir) and
-                    PASSENGERS.filter_by_floor(FLOOR_LIST.get_floor(new_source)).filter_by_direction(new_dir) \
-                        .filter_by_lift_unassigned().filter_by_status_waiting().count_passengers() > 0
+                    self.has_waiting_call(msg)
                 ):
-                    time_elapsed = (datetime.now() - time_since_latest_move).total_seconds()
-                    moving_status = self.get_moving_status_in_loop(time_elapsed, floor)
-                    redirect = self.calc_is_floor_reachable_while_moving(moving_status, new_source)
+                    time_elapsed = (CLOCK.now() - time_since_latest_move).total_seconds()
+                    redirect = trajectory.can_stop_at(time_elapsed, FLOOR_LIST.get_floor(new_source).height)
                     if redirect:
                         prev_floor = floor
                         floor = FLOOR_LIST.get_floor(new_source)
                         self.update_next_dir(floor.name)
-                        print_st(f'Redirecting {self.name} to {floor.name}')
-                    self.log(f'{self.name} redirect is {redirect}')
+                        EVENTS.emit(Redirected, self.name, floor.name, prev_floor.name)
+                    self.log("%s redirect is %s", self.name, redirect)
                     if redirect:
                         # release prev assignment (operation sequence is for async not distributed)
                         if new_source != prev_floor.name:
                             self.unassign_passengers(prev_floor.name, self.next_dir)
-                            unassigned_passengers = PASSENGERS.filter_by_status_waiting().filter_by_lift_unassigned() \
-                                .filter_by_floor(prev_floor).filter_by_direction(self.next_dir)
-                            self.log(f'unassigned passengers {unassigned_passengers.df.index}')
+                            unassigned_passengers = PASSENGERS.filter_waiting_at(prev_floor, self.next_dir) \
+                                .filter_by_lift_unassigned()
+                            self.log("unassigned passengers %s", unassigned_passengers.get_ids())
 
                         # assign new floor passengers (operation sequence is for async not distributed)
-                        time_taken = (datetime.now()-time_since_latest_move).total_seconds()
-                        self.log(f"{self.name} redirect to floor {floor.name} dir {self.next_dir} "
-                                    f"after {round(time_taken, 2)}")
-                        self.assign_passengers(floor.name, assign_multi=True)
+                        time_taken = (CLOCK.now()-time_since_latest_move).total_seconds()
+                        self.log("%s redirect to floor %s dir %s after %s",
+                                 self.name, floor.name, self.next_dir, round(time_taken, 2))
+                        self.assign_passengers(floor.name, assign_multi=self.assign_multi)
 
                         # # perform redirection
                         # time_to_move = self.calc_time_to_move_while_moving(moving_status, new_source)
@@ -457,48 +483,50 @@ class Lift:
                         # self.detail_log(f"{self.name} schedule to arrive in {round(time_to_move, 2)}")
 
                         # update lift state
-                        time_since_latest_move = datetime.now()
+                        h, d, v = trajectory.state_at(time_elapsed)
+                        trajectory = Trajectory.from_status(h, d, v, floor.height, self.model)
+                        time_since_latest_move = CLOCK.now()
                         self.redirect_state = {
-                            'moving_status': moving_status,
+                            'trajectory': trajectory,
                             'target_floor': floor.name,
                             'time_of_redirect': time_since_latest_move
                         }
                         self.next_height = floor.height
-                        self.log(f'{self.name} send to passengers lift_msg_queue {redirect} from move')
-                        PASSENGERS.lift_msg_queue.put_nowait(redirect)
+                        self.log("%s send to passengers lift_msg_queue %s from move", self.name, redirect)
+                        self.respond(msg, redirect)
                         triggered = False
                         await asyncio.sleep(0)
 
                         # reassign unassigned passengers
                         if new_source != prev_floor.name and unassigned_passengers.count_passengers() > 0:
-                            self.log(f'{self.name} attempt to reassign for {unassigned_passengers.df.index}')
-                            PASSENGERS.reassignment_trigger.put_nowait((prev_floor.name, unassigned_passengers.df.index))
+                            self.log("%s attempt to reassign for %s", self.name, unassigned_passengers.get_ids())
+                            PASSENGERS.reassignment_trigger.put_nowait((prev_floor.name, unassigned_passengers.get_ids()))
                             # PASSENGERS.reassign_unassigned(floor.name, unassigned_passengers.df.index)
 
                         # update timer
-                        time_to_move = self.calc_time_to_move_while_moving(moving_status, new_source)
-                        time_to_arrive = datetime.now() + timedelta(seconds=time_to_move)
-                        self.detail_log(f"{self.name} after redirect schedule to arrive in {round(time_to_move, 2)}")
+                        time_to_move = trajectory.arrival_time()
+                        time_to_arrive = CLOCK.now() + timedelta(seconds=time_to_move)
+                        self.detail_log("%s after redirect schedule to arrive in %s", self.name, round(time_to_move, 2))
                         continue
-                self.log(f'{self.name} no redirect')
-                PASSENGERS.lift_msg_queue.put_nowait(redirect)
+                self.log("%s no redirect", self.name)
+                self.respond(msg, redirect)
                 triggered = False
                 await asyncio.sleep(0)
                 
                 # update timer
-                time_to_move = (time_to_arrive - datetime.now()).total_seconds()
-                self.detail_log(f"{self.name} no redirection; schedule to arrive in {round(time_to_move, 2)}")
+                time_to_move = (time_to_arrive - CLOCK.now()).total_seconds()
+                self.detail_log("%s no redirection; schedule to arrive in %s", self.name, round(time_to_move, 2))
         except asyncio.TimeoutError:
-            self.log(f'{self.name} redirect calc loop timeout')
+            self.log("%s redirect calc loop timeout", self.name)
             # does it ever enter here
             if triggered:
-                PASSENGERS.lift_msg_queue.put_nowait(False)
+                self.respond(msg, False)
                 self.log('lift_msg_queue to release arrival queue')
             await asyncio.sleep(0)
-            print_st(f"{self.name} reaches {floor.name}")
-            self.log(f"{self.name}: reached {floor.name} at height {floor.height}")
+            self.log("%s: reached %s at height %s", self.name, floor.name, floor.height)
             self.dir = self.next_dir
-            self.log(f"{self.name}: latest dir {self.dir}")
+            EVENTS.emit(LiftMoved, self.name, floor.name, self.dir)
+            self.log("%s: latest dir %s", self.name, self.dir)
             
             self.floor = floor.name
             self.height = floor.height
@@ -511,19 +539,20 @@ class Lift:
         "moves to floor in a single operation"
         current_floor = FLOOR_LIST.get_floor(self.floor)
         time_to_move = self.calc_time_to_move(current_floor, floor)
-        self.detail_log(f'time to move is {time_to_move}')
+        self.detail_log("time to move is %s", time_to_move)
         if floor.height > self.height:
             self.dir = 'U'
         elif floor.height < self.height:
             self.dir = 'D'
         else:
             self.set_stationed()
-        self.log(f"{self.name}: Start move from {current_floor.name} height {current_floor.height} at dir {self.dir}")
+        self.log("%s: Start move from %s height %s at dir %s",
+                 self.name, current_floor.name, current_floor.height, self.dir)
 
         import time
         time.sleep(time_to_move)
 
-        self.log(f"{self.name}: reached {floor.name} at height {floor.height}")
+        self.log("%s: reached %s at height %s", self.name, floor.name, floor.height)
         # if self.floor == floor.name:
         #     single_floor_dir = self.find_single_passenger_floor()
         #     if single_floor_dir is not None:
@@ -539,45 +568,56 @@ class Lift:
     def calc_time_to_move(self, old_floor, new_floor):
         "distance lookup function takes into account time for acceleration and deceleration"
 
-        new_height = new_floor.height
-        old_height = old_floor.height
-        distance = abs( new_height - old_height)
-        return self.model.calc_time(distance)
+        return self.model.floor_travel_time(FLOOR_LIST, old_floor.name, new_floor.name)
     
     def get_moving_status_from_floor(self, time_elapsed, source_floor, target_floor):
-        moving_status = CalcMovingFloor(
-            source=source_floor,
-            target=target_floor.name,
-            lift_spec=self.model
-        )
-        return moving_status.calc_state(time_elapsed)
-    
-    def get_moving_status_after_redirect(self, time_elapsed, moving_status, target_floor):
-        return moving_status.calc_status(target_floor.height, time_elapsed)
+        return self.model.move_trajectory(FLOOR_LIST, source_floor, target_floor.name).state_at(time_elapsed)
 
-    def get_moving_status_in_loop(self, time_elapsed, target_floor):
+    def get_trajectory(self):
+        "Trajectory of the current move, measured from its start or latest redirect"
+        if self.redirect_state == False:
+            return self.model.move_trajectory(
+                FLOOR_LIST, self.floor_move_state['start_move_floor'], self.floor_move_state['target_floor']
+            )
+        return self.redirect_state['trajectory']
+
+    def get_motion_in_loop(self, time_elapsed, target_floor):
+        "height, direction and velocity of the lift"
         if self.redirect_state == False:
-            h, d, v  = self.get_moving_status_from_floor(time_elapsed, self.floor_move_state['start_move_floor'], target_floor)
+            return self.get_moving_status_from_floor(time_elapsed, self.floor_move_state['start_move_floor'], target_floor)
         else:
-            h, d, v = self.get_moving_status_after_redirect(time_elapsed, self.redirect_state['moving_status'], target_floor)
+            return self.redirect_state['trajectory'].state_at(time_elapsed)
+
+    def get_moving_status_in_loop(self, time_elapsed, target_floor):
+        h, d, v = self.get_motion_in_loop(time_elapsed, target_floor)
         return CalcAccelModelMovingStatus(h, d, v, self.model)
 
-    def get_moving_status(self, time):
+    def get_motion(self, time):
         if self.redirect_state == False:
             time_elapsed = (time-self.floor_move_state['start_move_time']).total_seconds()
             target_floor = FLOOR_LIST.get_floor(self.floor_move_state['target_floor'])
         else:
             time_elapsed = (time-self.redirect_state['time_of_redirect']).total_seconds()
             target_floor = FLOOR_LIST.get_floor(self.redirect_state['target_floor'])
-        return self.get_moving_status_in_loop(time_elapsed, target_floor)
+        return self.get_motion_in_loop(time_elapsed, target_floor)
+
+    def get_moving_status(self, time):
+        h, d, v = self.get_motion(time)
+        return CalcAccelModelMovingStatus(h, d, v, self.model)
     
-    def get_reaching_time(self, time, proposed_target_height):
+    def get_reaching_time(self, time, proposed_target_height, proposed_target=None):
+        "proposed_target floor name, when given, lets lifts standing at a floor look up the travel time"
         if self.loading_state is not False:
             current_height = FLOOR_LIST.get_floor(self.floor).height
-            loading_time = self.precalc_loading_time(offboarding_mode='arrived', onboarding_mode='earliest')
-            time_to_move = self.model.calc_time(abs(proposed_target_height - current_height))
+            loading_time = self.precalc_loading_time(offboarding_mode='arrived', onboarding_mode=self.onboarding_mode)
+            if proposed_target is not None:
+                time_to_move = self.model.floor_travel_time(FLOOR_LIST, self.floor, proposed_target)
+            else:
+                time_to_move = self.model.calc_time(abs(proposed_target_height - current_height))
             time_to_load = loading_time - (time - self.loading_state['start_load_time']).total_seconds()
             return time_to_load + time_to_move
+        if self.dir == 'S' and proposed_target is not None:
+            return self.model.floor_travel_time(FLOOR_LIST, self.floor, proposed_target)
         moving_status = self.get_moving_status(time)
         if self.dir == 'S':
             return moving_status.calc_time(proposed_target_height)
@@ -642,7 +682,7 @@ class Lift:
             nearest_floor = self.find_nearest_floor(targets)
             if nearest_floor is None:
                 return None
-            if nearest_floor >= self.floor:
+            if FLOOR_LIST.get_floor_index(nearest_floor) >= FLOOR_LIST.get_floor_index(self.floor):
                 self.dir = 'U'
             else:
                 self.dir = 'D'
@@ -654,14 +694,13 @@ class Lift:
             columns={'target': 'lift_target'}
         )
         lift_targets = lift_targets.loc[lift_targets.lift_target != self.floor,:]
-        passengers_to_board_index = PASSENGERS.df.index.isin(self.precalc_num_to_onboard('earliest', return_index=True))
-        passengers_to_board = PassengerList(PASSENGERS.df.loc[passengers_to_board_index, :])
+        passengers_to_board = PASSENGERS.filter_by_ids(self.precalc_num_to_onboard(
+            'earliest', bypass_prev_assignment=self.bypass_prev_assignment, return_index=True
+        ))
         passengers_to_board_targets = passengers_to_board.passenger_target_scan().rename(
             columns={'target': 'lift_target'}
         )
-        passengers_in_wait = PassengerList(
-            PASSENGERS.df.loc[(PASSENGERS.df.status == 'Waiting') & (~ passengers_to_board_index), :]
-        )
+        passengers_in_wait = PASSENGERS.filter_by_status_waiting().filter_excluding(passengers_to_board)
         waiting_targets = passengers_in_wait.passenger_source_scan().rename(
             columns={'source': 'lift_target'}
         )
@@ -674,49 +713,42 @@ class Lift:
         furthest_target, furthest_dir = self.find_furthest_target_dir()
         if self.floor == furthest_target and self.dir != furthest_dir:
             self.dir = furthest_dir
-            self.log(f"{self.name}: maximal floor turn back to {self.dir}")
+            self.log("%s: maximal floor turn back to %s", self.name, self.dir)
         
     def find_next_lift_target(self, targets):
         if targets.shape[0] == 0:
             return None
+        ordinals = FLOOR_LIST.ordinals_of(targets.lift_target.tolist())
+        dirs = targets.dir.to_numpy()
+        current = FLOOR_LIST.get_floor_index(self.floor)
         if self.dir == 'U':
-            floor_scan = targets.loc[
-                (targets.lift_target > self.floor) &
-                (targets.dir == 'U'), :
-            ]
-            if floor_scan.shape[0] > 0:
-                return floor_scan.lift_target.min()
-
-            floor_scan = targets.loc[
-                (targets.dir == 'D'), :
-            ]
-            if floor_scan.shape[0] > 0:
-                return floor_scan.lift_target.max()
-
-            return targets.lift_target.min()
+            floor_scan = (ordinals > current) & (dirs == 'U')
+            if floor_scan.any():
+                return FLOOR_LIST.floornames[ordinals[floor_scan].min()]
+
+            floor_scan = dirs == 'D'
+            if floor_scan.any():
+                return FLOOR_LIST.floornames[ordinals[floor_scan].max()]
+
+            return FLOOR_LIST.floornames[ordinals.min()]
         elif self.dir == 'D':
-            floor_scan = targets.loc[
-                (targets.lift_target < self.floor) &
-                (targets.dir == 'D'), :
-            ]
-            if floor_scan.shape[0] > 0:
-                return floor_scan.lift_target.max()
+            floor_scan = (ordinals < current) & (dirs == 'D')
+            if floor_scan.any():
+                return FLOOR_LIST.floornames[ordinals[floor_scan].max()]
 
-            floor_scan = targets.loc[
-                (targets.dir == 'U'), :
-            ]
-            if floor_scan.shape[0] > 0:
-                return floor_scan.lift_target.min()
+            floor_scan = dirs == 'U'
+            if floor_scan.any():
+                return FLOOR_LIST.floornames[ordinals[floor_scan].min()]
 
-            return targets.lift_target.max()
+            return FLOOR_LIST.floornames[ordinals.max()]
 
     def find_nearest_floor(self, targets):
         if targets.shape[0] == 0:
             return None
         
-        floor_heights = {f:FLOOR_LIST.get_floor(f).height for f in targets.lift_target}
-        floor_dist = {f:abs(self.height - floor_heights[f]) for f in floor_heights}
-        return sorted(floor_dist.items(), key=lambda x: x[1])[0][0]
+        target_floors = targets.lift_target.tolist()
+        floor_dist = np.abs(self.height - FLOOR_LIST.heights_of(target_floors))
+        return target_floors[int(np.argmin(floor_dist))]
         
     def find_furthest_target_dir(self, remove_extremes=False):
         """
@@ -728,9 +760,9 @@ class Lift:
         )
         if remove_extremes:
             to_exclude = (
-                (lift_targets.lift_target == max(FLOOR_LIST.list_floors())) & (lift_targets.dir == 'U')
+                (lift_targets.lift_target == FLOOR_LIST.get_top_floor()) & (lift_targets.dir == 'U')
             ) | (
-                (lift_targets.lift_target == min(FLOOR_LIST.list_floors())) & (lift_targets.dir == 'D')
+                (lift_targets.lift_target == FLOOR_LIST.get_bottom_floor()) & (lift_targets.dir == 'D')
             )
             lift_targets = lift_targets.loc[~to_exclude,:]
         passengers_in_wait = PASSENGERS.filter_by_status_waiting().filter_by_lift_assigned_not_to_other_only(self)
@@ -748,7 +780,7 @@ class Lift:
         lift_targets = self.passengers.passenger_target_scan().rename(
             columns={'target': 'lift_target'}
         )
-        passengers_in_wait = PassengerList(PASSENGERS.df.loc[PASSENGERS.df.lift == 'Unassigned', :])
+        passengers_in_wait = PASSENGERS.filter_by_lift_unassigned()
         waiting_targets = passengers_in_wait.passenger_source_scan().rename(
             columns={'source': 'lift_target'}
         )
@@ -761,12 +793,13 @@ class Lift:
     def find_furthest_floor_dir(self, targets):
         if targets.shape[0] == 0:
             return None, None
+        ordinals = FLOOR_LIST.ordinals_of(targets.lift_target.tolist())
         if self.dir == 'U':
             opp_dir = 'D'
-            furthest = targets.lift_target.max()
+            furthest = FLOOR_LIST.floornames[ordinals.max()]
         elif self.dir == 'D':
             opp_dir = 'U'
-            furthest = targets.lift_target.min()
+            furthest = FLOOR_LIST.floornames[ordinals.min()]
         
         if self.dir in targets.loc[targets.lift_target==furthest, 'dir'].values:
             return (furthest, self.dir)
@@ -816,22 +849,20 @@ class Lift:
         # assigns waiting passengers and their floors to lifts
         floor = FLOOR_LIST.get_floor(target_floor)
         if assign_multi:
-            assignment_list = PASSENGERS \
-                .filter_by_status_waiting() \
-                .filter_by_floor(FLOOR_LIST.get_floor(target_floor)) \
-                .filter_by_direction(self.next_dir)
+            assignment_list = PASSENGERS.filter_waiting_at(floor, self.next_dir, n=limit)
         else:
-            assignment_list = PASSENGERS \
-                .filter_by_status_waiting() \
-                .filter_by_floor(FLOOR_LIST.get_floor(target_floor)) \
-                .filter_by_direction(self.next_dir) \
-                .filter_by_lift_unassigned()
-        num_to_assign = min(assignment_list.count_passengers(), limit)
-        assignment_list = assignment_list.filter_by_earliest_arrival(num_to_assign)
-        self.detail_log(f"{self.name}:  assignment_list {assignment_list.df.loc[:,['status', 'lift', 'current', 'dir', 'source', 'target']]}"
-              f"target floor {target_floor} lift next dir {self.next_dir} which has passengers {floor.passengers.df.index.tolist()}")
+            assignment_list = PASSENGERS.filter_waiting_at(floor, self.next_dir) \
+                .filter_by_lift_unassigned() \
+                .filter_first_arrivals(limit)
+        # selections are copies, so rendering them later on the logging thread is safe
+        floor_ids = floor.passengers.get_ids().copy()
+        self.detail_log(
+            "%s:  assignment_list %starget floor %s lift next dir %s which has passengers %s", self.name,
+            Deferred(lambda: assignment_list.df.loc[:, ['status', 'lift', 'current', 'dir', 'source', 'target']]),
+            target_floor, self.next_dir, floor_ids
+        )
         PASSENGERS.assign_lift_for_selection(self, assignment_list)
-        self.log(f'assigning {self.name} {assignment_list.df.index.tolist()} for {floor.name} which has {floor.passengers.df.index.tolist()}')
+        self.log("assigning %s %s for %s which has %s", self.name, assignment_list.get_ids(), floor.name, floor_ids)
         floor.passengers.assign_lift_for_selection(self, assignment_list)
 
     def unassign_passengers(self, prev_target_floor, prev_next_dir):
@@ -839,85 +870,79 @@ class Lift:
             return None
         prev_floor = FLOOR_LIST.get_floor(prev_target_floor)
         to_unassign = PASSENGERS \
-            .filter_by_status_waiting() \
-            .filter_by_floor(FLOOR_LIST.get_floor(prev_target_floor)) \
-            .filter_by_direction(prev_next_dir) \
+            .filter_waiting_at(prev_floor, prev_next_dir) \
             .filter_by_lift_assigned(self)
         PASSENGERS.unassign_lift_for_selection(self, to_unassign)
         prev_floor.passengers.unassign_lift_for_selection(self, to_unassign)
 
     def get_total_assigned(self):
-        non_arrived = PASSENGERS.df.loc[PASSENGERS.df.status != 'Arrived', :]
-        return (non_arrived.lift == self.name).sum()
+        return PASSENGERS.count_assigned_to(self)
     
     async def lift_baseline_operation(self):
         """
         baseline operation
         """
-        self.log(f'{self.name} start baseline operation')
-        print(f'{self.name} start baseline operation')
+        self.log("%s start baseline operation", self.name)
         await asyncio.sleep(0)
         next_target = self.next_baseline_target()
         self.update_next_dir(next_target)
         if next_target is not None:
-            print(f'{self.name} lift new target {next_target} next direction {self.next_dir}')
-            self.log(f'{self.name} lift new target {next_target} next direction {self.next_dir}')
-        self.assign_passengers(next_target, assign_multi=True)
+            EVENTS.emit(LiftTargetChosen, self.name, next_target, self.next_dir)
+            self.log("%s lift new target %s next direction %s", self.name, next_target, self.next_dir)
+        self.assign_passengers(next_target, assign_multi=self.assign_multi)
         # print('debug passenger assignment')
         # PASSENGERS.pprint_passenger_status(FLOOR_LIST, ordering_type='source')
         while True:
             if next_target is not None:
                 # baseline allows multi assignment after floor is chosen
-                print_st(f'{self.name} moving to target {next_target}')
+                EVENTS.emit(LiftMoving, self.name, next_target)
                 next_floor = FLOOR_LIST.get_floor(next_target)
                 await self.move(next_floor)
-                print(f'{self.name} lift moved to target {self.floor} facing {self.dir}')
                 await self.loading()
-                for lift in PASSENGERS.tracking_lifts:                
-                    print(f'{lift.name} facing {lift.dir} after loading at {lift.floor}, lift passengers:',
-                          ', '.join([str(i) for i in lift.passengers.df.index.values]))
-                self.print_overall_stats()
+                if EVENTS.active:
+                    EVENTS.emit(LiftLoaded, self.name, self.floor, self.dir, self.passengers.get_ids().copy())
+                    EVENTS.emit(StatusCounts, PASSENGERS.status_counter.summary())
                 await asyncio.sleep(0)
                 next_target = self.next_baseline_target()
-                self.log(f'{self.name} lift new target {next_target}')
+                self.log("%s lift new target %s", self.name, next_target)
                 self.update_next_dir(next_target)        
-                print(f'{self.name} lift new target {next_target} next direction {self.next_dir}')
-                self.log(f'{self.name} lift next direction {self.next_dir}')
-                self.assign_passengers(next_target, assign_multi=True)
+                EVENTS.emit(LiftTargetChosen, self.name, next_target, self.next_dir)
+                self.log("%s lift next direction %s", self.name, self.next_dir)
+                self.assign_passengers(next_target, assign_multi=self.assign_multi)
                 # print('debug passenger assignment')
                 # PASSENGERS.pprint_passenger_status(FLOOR_LIST, ordering_type='source')
             else:
-                self.log(f"{self.name} setting stationed")
-                print_st(f"{self.name} stationed at {self.floor}")
+                self.log("%s setting stationed", self.name)
+                EVENTS.emit(LiftStationed, self.name, self.floor)
                 self.set_stationed()
                 await asyncio.sleep(0)
                 # to catch passenger arrivals instead of always running
                 arrival_task = asyncio.create_task(self.arrival_queue.get())
                 reassignment_task = asyncio.create_task(self.reassignment_queue.get())
                 to_wait_for = [arrival_task, reassignment_task]
-                self.log(f"{self.name} spending arrivals while stationed")
+                self.log("%s spending arrivals while stationed", self.name)
                 done, pending = await asyncio.wait(to_wait_for, return_when=asyncio.FIRST_COMPLETED)
                 rcv_msg = done.pop().result()
-                self.log(f'{self.name} while stationed received queue with {rcv_msg}')
+                self.log("%s while stationed received queue with %s", self.name, rcv_msg)
                 is_reassignment = False
                 if rcv_msg[0] == 'reassign':
                     is_reassignment = True
                     __, new_source, _, new_dir = rcv_msg
                 else:
                     new_source, _, new_dir = rcv_msg
-                self.log(f'{self.name} evaluating while stationed {new_source, _, new_dir}')
+                self.log("%s evaluating while stationed %s", self.name, (new_source, _, new_dir))
                 next_target = self.next_baseline_target()
-                self.log(f'{self.name} lift new target {next_target}')
+                self.log("%s lift new target %s", self.name, next_target)
                 self.update_next_dir(next_target)
-                print(f'{self.name} lift new target {next_target} next direction {self.next_dir}')
-                self.log(f'{self.name} lift next direction {self.next_dir}')
-                self.assign_passengers(next_target, assign_multi=True)
+                EVENTS.emit(LiftTargetChosen, self.name, next_target, self.next_dir)
+                self.log("%s lift next direction %s", self.name, self.next_dir)
+                self.assign_passengers(next_target, assign_multi=self.assign_multi)
                 
-                self.log(f'{self.name} send to passengers lift_msg_queue True from lift_baseline_operation')
+                self.log("%s send to passengers lift_msg_queue True from lift_baseline_operation", self.name)
                 if is_reassignment:
                     PASSENGERS.reassignment_rsp_queue.put_nowait(True)
                 else:
-                    PASSENGERS.lift_msg_queue.put_nowait(True)
+                    self.respond(rcv_msg, True)
                 await asyncio.sleep(0)
                 for t in pending:
                     t.cancel()
@@ -925,15 +950,19 @@ class Lift:
                 # PASSENGERS.pprint_passenger_status(FLOOR_LIST, ordering_type='source')
 
     async def loading(self, print_lift_stats = False, print_passenger_stats=False):
-        loading_start_time = datetime.now()
+        loading_start_time = CLOCK.now()
         self.loading_state = {
             'stopping_floor': self.floor,
             'start_load_time': loading_start_time,
         }
         self.loading_state['current_target'] = self.precalc_next_target_after_loading()
         await self.offboard_arrived()
-        await self.onboard_earliest_arrival()
-        PASSENGERS.update_passenger_metrics(print_passenger_stats, FLOOR_LIST)
+        if self.onboarding_mode == 'random':
+            await self.onboard_random_available(bypass_prev_assignment=self.bypass_prev_assignment)
+        else:
+            await self.onboard_earliest_arrival(bypass_prev_assignment=self.bypass_prev_assignment)
+        if print_passenger_stats:
+            PASSENGERS.pprint_passenger_status(FLOOR_LIST)
         if print_lift_stats:
             self.pprint_current_passengers()
         self.loading_state = False
@@ -953,11 +982,11 @@ class Lift:
         df['board_time'] = format_board_time(df)
 
         print_cols = ['source', 'start_time', 'board_time', 'target']
-        print(f"{self.name} passengers on-board at {passenger_time_format(datetime.now())}")
+        print(f"{self.name} passengers on-board at {passenger_time_format(CLOCK.now())}")
         if self.passenger_count > 0:
             print(df.loc[:, print_cols])
         else:
             print('lift empty')
 
     def print_overall_stats(self):
-        print('overall stats', PASSENGERS.df.groupby(['status', 'lift']).size().sort_index(level='status'))
+        print('overall stats', PASSENGERS.status_counter.summary())
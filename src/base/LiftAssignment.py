@@ -0,0 +1,116 @@
+import numpy as np
+
+
+class LiftAssignment:
+    """
+    assignment table between traveling passengers and lifts
+    a passenger maps to a bitmask of candidate lifts, one bit per lift name,
+    a lift maps to the ids of passengers it is a candidate for
+    and a running count of passengers assigned to it alone
+    """
+    MAX_LIFTS = 63
+    lift_bits = {}
+    lift_names = []
+
+    def __init__(self) -> None:
+        self.lift_passengers = {}
+        self.sole_counts = {}
+
+    @classmethod
+    def reset(cls):
+        "frees every lift bit, masks made before are meaningless after"
+        cls.lift_bits = {}
+        cls.lift_names = []
+
+    @classmethod
+    def bit(cls, lift_name) -> int:
+        if lift_name not in cls.lift_bits:
+            if len(cls.lift_names) >= cls.MAX_LIFTS:
+                raise ValueError(f'at most {cls.MAX_LIFTS} lifts can be assigned')
+            cls.lift_bits[lift_name] = 1 << len(cls.lift_names)
+            cls.lift_names += [lift_name]
+        return cls.lift_bits[lift_name]
+
+    @classmethod
+    def names_of(cls, mask) -> list:
+        return [name for i, name in enumerate(cls.lift_names) if mask >> i & 1]
+
+    @classmethod
+    def value_from_mask(cls, mask):
+        "readable assignment, 'Unassigned', a lift name or the list of lift names"
+        names = cls.names_of(int(mask))
+        if len(names) == 0:
+            return 'Unassigned'
+        elif len(names) == 1:
+            return names[0]
+        return str(names)
+
+    @classmethod
+    def values_from_masks(cls, masks) -> np.ndarray:
+        unique_masks, inverse = np.unique(masks, return_inverse=True)
+        values = np.array([cls.value_from_mask(m) for m in unique_masks], dtype=object)
+        return values[inverse.reshape(-1)]
+
+    @classmethod
+    def mask_from_value(cls, value) -> int:
+        "parses assignments in the formats the lift column has held"
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        if isinstance(value, list):
+            names = value
+        elif isinstance(value, str) and len(value) > 0 and value[0] == "[" and value[-1] == "]":
+            names = [name.replace("'", "") for name in value[1:-1].split(', ') if name != '']
+        elif isinstance(value, str) and value not in ('Unassigned', 'nan', 'None', ''):
+            names = [value]
+        else:
+            names = []
+        mask = 0
+        for name in names:
+            mask |= cls.bit(name)
+        return mask
+
+    @classmethod
+    def masks_from_values(cls, values) -> np.ndarray:
+        return np.array([cls.mask_from_value(v) for v in values], dtype=np.int64)
+
+    def count_sole(self, lift_name) -> int:
+        "passengers assigned to this lift and no other, O(1)"
+        return self.sole_counts.get(lift_name, 0)
+
+    def get_passenger_ids(self, lift_name) -> set:
+        return self.lift_passengers.get(lift_name, set())
+
+    def _add(self, passenger_id, mask):
+        for name in LiftAssignment.names_of(mask):
+            self.lift_passengers.setdefault(name, set()).add(passenger_id)
+        if mask != 0 and mask & (mask - 1) == 0:
+            name = LiftAssignment.lift_names[mask.bit_length() - 1]
+            self.sole_counts[name] = self.sole_counts.get(name, 0) + 1
+
+    def _remove(self, passenger_id, mask):
+        for name in LiftAssignment.names_of(mask):
+            self.lift_passengers.get(name, set()).discard(passenger_id)
+        if mask != 0 and mask & (mask - 1) == 0:
+            name = LiftAssignment.lift_names[mask.bit_length() - 1]
+            self.sole_counts[name] -= 1
+
+    def update(self, passenger_ids, old_masks, new_masks):
+        for passenger_id, old_mask, new_mask in zip(passenger_ids.tolist(), old_masks.tolist(), new_masks.tolist()):
+            if old_mask != new_mask:
+                self._remove(passenger_id, old_mask)
+                self._add(passenger_id, new_mask)
+
+    def add(self, passenger_ids, masks):
+        for passenger_id, mask in zip(passenger_ids.tolist(), masks.tolist()):
+            if mask != 0:
+                self._add(passenger_id, mask)
+
+    def release(self, passenger_ids, masks):
+        "drops passengers that completed their trip"
+        for passenger_id, mask in zip(passenger_ids.tolist(), masks.tolist()):
+            if mask != 0:
+                self._remove(passenger_id, mask)
+
+    def clear(self):
+        self.lift_passengers = {}
+        self.sole_counts = {}
@@ -0,0 +1,133 @@
+import numpy as np
+
+
+class LiftFleet:
+    """
+    state of all tracked lifts as arrays, one entry per lift
+    batched kinematics of the acceleration model, so which lifts can stop
+    at a height and when is one array expression over the fleet
+    """
+    DIR_SIGN = {'U': 1, 'D': -1, 'S': 0}
+
+    def __init__(self) -> None:
+        self.lifts = []
+        self.dirs = np.empty(0, dtype=object)
+        self.a = np.empty(0, dtype=np.float64)
+        self.max_v = np.empty(0, dtype=np.float64)
+        self.overhead = np.empty(0, dtype=np.float64)
+        self.accel_model = np.empty(0, dtype=bool)
+        self.height = np.empty(0, dtype=np.float64)
+        self.velocity = np.empty(0, dtype=np.float64)
+        # +1 moving up, -1 moving down, 0 standing
+        self.direction = np.empty(0, dtype=np.int8)
+        self.target_height = np.empty(0, dtype=np.float64)
+        self.load = np.empty(0, dtype=np.int64)
+        self.capacity = np.empty(0, dtype=np.int64)
+        self.loading = np.empty(0, dtype=bool)
+        # seconds a loading lift still takes to close its doors
+        self.load_remaining = np.empty(0, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.lifts)
+
+    def add(self, lift):
+        self.lifts += [lift]
+        n = len(self.lifts)
+        for name, array in vars(self).items():
+            if isinstance(array, np.ndarray):
+                setattr(self, name, np.resize(array, n))
+        self.refresh_lift(n - 1)
+
+    def refresh_lift(self, i, time=None):
+        "copies the state of the i-th lift, sampling its motion at time when it is moving"
+        from src.base.FloorList import FLOOR_LIST
+
+        lift = self.lifts[i]
+        self.dirs[i] = lift.dir
+        self.a[i] = lift.model.a
+        self.max_v[i] = lift.model.max_v
+        self.overhead[i] = lift.model.overhead
+        self.accel_model[i] = lift.model.model_type == "accel"
+        self.target_height[i] = lift.next_height
+        self.load[i] = lift.passenger_count
+        self.capacity[i] = lift.capacity
+        self.loading[i] = lift.loading_state is not False
+        self.load_remaining[i] = 0.0
+        if self.loading[i] and time is not None:
+            loading_time = lift.precalc_loading_time(offboarding_mode='arrived', onboarding_mode=lift.onboarding_mode)
+            self.load_remaining[i] = loading_time - (time - lift.loading_state['start_load_time']).total_seconds()
+        if time is None or self.loading[i] or lift.dir == 'S':
+            self.height[i] = FLOOR_LIST.get_floor(lift.floor).height
+            self.velocity[i] = 0.0
+            self.direction[i] = LiftFleet.DIR_SIGN[lift.dir]
+        else:
+            h, d, v = lift.get_motion(time)
+            self.height[i] = h
+            self.velocity[i] = v
+            self.direction[i] = LiftFleet.DIR_SIGN[d]
+
+    def refresh(self, time):
+        for i in range(len(self.lifts)):
+            self.refresh_lift(i, time)
+
+    def spec_calc_times(self, dists) -> np.ndarray:
+        "LiftSpec.calc_time of each lift over its distance"
+        accel_dist = self.max_v ** 2 / self.a
+        with np.errstate(invalid='ignore'):
+            accel_time = np.where(
+                dists < accel_dist,
+                2 * np.sqrt(dists / self.a),
+                2 * self.max_v / self.a + (dists - accel_dist) / self.max_v
+            )
+        return np.where(self.accel_model, accel_time, self.overhead + dists / self.max_v)
+
+    def status_to_stop(self) -> np.ndarray:
+        "heights where each lift comes to rest when braking now"
+        return self.height + self.direction * (self.velocity ** 2 / self.a / 2)
+
+    def stoppability(self, new_height) -> np.ndarray:
+        "lifts that can stop at new_height without turning back, standing lifts always can"
+        stop_height = self.status_to_stop()
+        return np.where(
+            self.direction > 0, stop_height <= new_height,
+            np.where(self.direction < 0, stop_height >= new_height, True)
+        )
+
+    def calc_time(self, new_height) -> np.ndarray:
+        "time for each lift to stop at new_height, turning back first if it cannot stop in time"
+        accel_dist = self.max_v ** 2 / self.a
+        time_to_max = (self.max_v - self.velocity) / self.a
+        dist_to_max = time_to_max * (self.velocity + self.max_v) / 2
+        dist_to_travel = np.abs(new_height - self.height)
+        max_reachable = dist_to_travel > (accel_dist / 2 + dist_to_max)
+        max_speed_time = (dist_to_travel - accel_dist / 2 - dist_to_max) / self.max_v
+        time_with_max = time_to_max + max_speed_time + self.max_v / self.a
+        with np.errstate(invalid='ignore'):
+            discriminant = self.velocity**2 / 2 + self.a * dist_to_travel
+            accel_time = (np.sqrt(discriminant) - self.velocity) / self.a
+        time_no_max = 2*accel_time + self.velocity / self.a
+        direct_time = np.where(max_reachable, time_with_max, time_no_max)
+
+        trans_time = self.velocity / self.a
+        turn_time = trans_time + self.spec_calc_times(np.abs(new_height - self.status_to_stop()))
+        return np.where(self.stoppability(new_height), direct_time, turn_time)
+
+    def reaching_times(self, time, target_height, target_floor) -> np.ndarray:
+        """
+        Lift.get_reaching_time of every lift, nan where a moving lift cannot stop at the target
+        expects refresh(time) beforehand
+        """
+        return self.reaching_time_matrix(time, [target_floor])[0]
+
+    def reaching_time_matrix(self, time, target_floors) -> np.ndarray:
+        """
+        reaching_times of every lift to each of target_floors, one row per floor
+        standing lifts, loading or not, travel from their floor once their doors close
+        expects refresh(time) beforehand
+        """
+        from src.base.FloorList import FLOOR_LIST
+
+        target_height = FLOOR_LIST.heights[FLOOR_LIST.ordinals_of(target_floors)][:, None]
+        moving = np.where(self.stoppability(target_height), self.calc_time(target_height), np.nan)
+        standing = self.load_remaining + self.spec_calc_times(np.abs(target_height - self.height))
+        return np.where(self.loading | (self.direction == 0), standing, moving)
@@ -0,0 +1,131 @@
+import asyncio
+import numpy as np
+import pandas as pd
+
+from src.base.FloorList import FLOOR_LIST
+from src.metrics.MinCostAssignment import min_cost_assignment
+from src.utils.Clock import CLOCK
+
+
+class MatchingDispatcher:
+    """
+    centralized alternative to the lift by lift arrival search
+    at each decision epoch the waiting passengers no lift is assigned to are grouped into hall calls
+    by source floor and direction, and all calls are matched to lifts in one min-cost assignment
+    over reaching time, committed stops and remaining capacity
+    each lift offers slots columns, so it can take several calls in an epoch at one more stop each
+    matches are written straight into the lift assignment, and each matched lift is woken once to replan
+    """
+    # seconds arrivals are gathered before a solve
+    EPOCH = 1.0
+    # seconds one more stop is taken to delay a lift
+    STOP_TIME = 5.0
+    SLOTS = 3
+
+    def __init__(self, passengers, epoch=EPOCH, stop_time=STOP_TIME, slots=SLOTS) -> None:
+        self.passengers = passengers
+        self.epoch = epoch
+        self.stop_time = stop_time
+        self.slots = slots
+        self.pending = asyncio.Event()
+        self.solves = 0
+        self.calls_assigned = 0
+
+    def notify(self):
+        "marks hall calls pending, they are dispatched at the end of the epoch"
+        self.pending.set()
+
+    async def run(self):
+        await asyncio.gather(self.dispatch_loop(), self.reassignment_loop())
+
+    async def dispatch_loop(self):
+        while True:
+            await self.pending.wait()
+            await asyncio.sleep(self.epoch)
+            self.pending.clear()
+            await self.dispatch()
+
+    async def reassignment_loop(self):
+        "passengers freed by a redirect are hall calls again"
+        while True:
+            arrival_source, passenger_ids = await self.passengers.reassignment_trigger.get()
+            self.passengers.log("dispatcher notified of freed passengers %s at %s", passenger_ids, arrival_source)
+            self.notify()
+
+    def hall_calls(self):
+        "source floors, directions and passenger counts of waiting passengers no lift is assigned to"
+        store = self.passengers.store
+        unassigned = (store.column('status') == 'Waiting') & (store.column('lift') == 0)
+        calls = pd.DataFrame({
+            'source': store.column('source')[unassigned],
+            'dir': store.column('dir')[unassigned],
+        }).value_counts(sort=False)
+        return (
+            calls.index.get_level_values('source').to_numpy(dtype=object),
+            calls.index.get_level_values('dir').to_numpy(dtype=object),
+            calls.to_numpy(dtype=np.int64),
+        )
+
+    def committed_stops(self) -> np.ndarray:
+        "number of floors each lift has committed to stop at"
+        stop_sets = self.passengers.stop_sets
+        return np.array([stop_sets.count(lift.name) for lift in self.passengers.fleet.lifts], dtype=np.int64)
+
+    def cost_matrix(self, time, sources, dirs, counts) -> np.ndarray:
+        """
+        seconds for each lift slot to serve each call, one row per call and one column per lift and slot
+        inf where a lift faces away or cannot stop in time, and slot k where fewer than k + 1 places remain,
+        so a lift is never matched to more calls than it has room for
+        """
+        fleet = self.passengers.fleet
+        fleet.refresh(time)
+        reaching = fleet.reaching_time_matrix(time, sources)
+        remaining = np.array([lift.capacity - lift.get_total_assigned() for lift in fleet.lifts])
+        overflow = np.maximum(counts[:, None] - remaining[None, :], 0)
+        cost = reaching + self.stop_time * (self.committed_stops()[None, :] + overflow)
+        eligible = (fleet.dirs[None, :] == dirs[:, None]) | (fleet.dirs[None, :] == 'S')
+        cost[~eligible | np.isnan(reaching)] = np.inf
+        return np.concatenate([
+            np.where(remaining[None, :] > slot, cost + slot * self.stop_time, np.inf)
+            for slot in range(self.slots)
+        ], axis=1)
+
+    async def dispatch(self):
+        sources, dirs, counts = self.hall_calls()
+        if sources.size == 0:
+            return
+        fleet = self.passengers.fleet
+        cost = self.cost_matrix(CLOCK.now(), sources, dirs, counts)
+        calls, columns = min_cost_assignment(cost)
+        self.solves += 1
+        self.passengers.log(
+            "dispatch solve %s: %s calls, %s matched", self.solves, sources.size, calls.size
+        )
+        served = 0
+        woken = {}
+        # columns run slot by slot, so each lift first takes and is woken for its cheapest call
+        for column, call in sorted(zip(columns.tolist(), calls.tolist())):
+            lift = fleet.lifts[column % len(fleet)]
+            left = self.assign_to(lift, FLOOR_LIST.get_floor(sources[call]), dirs[call])
+            served += left == 0
+            woken.setdefault(lift.name, (lift, sources[call], dirs[call]))
+        for lift, source, dir in woken.values():
+            lift.wake(source, dir)
+        self.calls_assigned += served
+        if served < sources.size:
+            # calls no lift could take, or took only in part, are retried next epoch
+            self.notify()
+
+    def assign_to(self, lift, floor, dir) -> int:
+        """
+        assigns the call's earliest unassigned passengers lift has room for
+        returns how many of the call's passengers are left unassigned
+        """
+        waiting = self.passengers.filter_waiting_at(floor, dir).filter_by_lift_unassigned()
+        limit = lift.capacity - lift.get_total_assigned()
+        if limit <= 0:
+            return waiting.count_passengers()
+        selection = waiting.filter_first_arrivals(limit)
+        self.passengers.assign_lift_for_selection(lift, selection, assign_multi=False)
+        floor.passengers.assign_lift_for_selection(lift, selection, assign_multi=False)
+        return waiting.count_passengers() - selection.count_passengers()
@@ -1,11 +1,23 @@
-from itertools import count
-from datetime import datetime
+import numpy as np
 
 class Passenger:
-    _passenger_record = count(1)
+    "a single passenger, slotted since simulations create one per arrival"
+    __slots__ = (
+        'id', 'floor_list', 'source', 'current', 'target', 'dir', 'trip_start', 'status', 'lift',
+        'board_time', 'dest_arrival_time', 'travel_time', 'waiting_time', 'time_on_lift',
+    )
+    _next_id = 1
 
-    def __init__(self, source, target, trip_start_time = datetime.now()):
-        self.id = next(self._passenger_record)
+    def __init__(self, source, target, trip_start_time=None, floor_list=None):
+        """
+        floor_list orders the floors, FLOOR_LIST when None
+        trip_start_time defaults to the simulation clock at construction
+        """
+        if trip_start_time is None:
+            from src.utils.Clock import CLOCK
+            trip_start_time = CLOCK.now()
+        self.id = Passenger.reserve_ids(1).start
+        self.floor_list = floor_list
         self.source = source
         self.current = source
         self.target = target
@@ -13,16 +25,34 @@ class Passenger:
         self.trip_start = trip_start_time
         self.status = 'Waiting'
         self.lift = 'Unassigned'
+        self.board_time = None
+        self.dest_arrival_time = None
+        self.travel_time = np.nan
+        self.waiting_time = np.nan
+        self.time_on_lift = np.nan
+
+    @classmethod
+    def reserve_ids(cls, n) -> range:
+        "contiguous range of n unused passenger ids"
+        ids = range(cls._next_id, cls._next_id + n)
+        cls._next_id += n
+        return ids
+
+    @classmethod
+    def reset_ids(cls):
+        "ids start from 1 again, for a new simulation"
+        cls._next_id = 1
 
     @classmethod
     def passenger_record(cls):
-        cls._passenger_record += 1
-        return cls._passenger_record
+        "id the next passenger will get"
+        return cls._next_id
 
     def calculate_direction(self):
-        if self.target > self.source:
-            return 'U'
-        elif self.target < self.source:
-            return 'D'
-        else:
+        from src.base.FloorList import FLOOR_LIST
+
+        floor_list = self.floor_list if self.floor_list is not None else FLOOR_LIST
+        direction = floor_list.get_direction(self.source, self.target)
+        if direction is None:
             raise ValueError('problem calculating passenger direction')
+        return direction
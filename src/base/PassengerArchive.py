@@ -0,0 +1,65 @@
+import numpy as np
+
+from src.base.PassengerStore import PassengerStore
+from src.base.LiftAssignment import LiftAssignment
+
+
+class PassengerArchive:
+    """
+    append-only cold tier of passengers that completed their trips
+    rows are held in memory, or with a spill_dir, written out in chunks of max_rows
+    through a RunWriter so memory stays bounded over long runs
+    """
+    MAX_ROWS = 10_000
+
+    def __init__(self, schema, spill_dir=None, max_rows=MAX_ROWS) -> None:
+        self.schema = schema
+        self.spill_dir = spill_dir
+        self.max_rows = max_rows
+        self.store = PassengerStore(schema)
+        self.writer = None
+        self.spilled_rows = 0
+
+    def __len__(self):
+        return self.spilled_rows + self.store.size
+
+    def add(self, store: PassengerStore):
+        self.store.extend(store)
+        if self.spill_dir is not None and self.store.size >= self.max_rows:
+            self.spill()
+
+    def spill(self):
+        "hands the rows in memory to the writer thread"
+        from src.utils.RunWriter import RunWriter
+
+        if self.writer is None:
+            self.writer = RunWriter(self.spill_dir, chunk_rows=self.max_rows)
+        self.writer.add(self.store)
+        self.writer.flush()
+        self.spilled_rows += self.store.size
+        self.store = PassengerStore(self.schema)
+
+    def clear(self):
+        "empties the archive, chunks already spilled stay on disk but are no longer read"
+        if self.writer is not None:
+            self.writer.close()
+        self.writer = None
+        self.spilled_rows = 0
+        self.store = PassengerStore(self.schema)
+
+    def to_store(self) -> PassengerStore:
+        "all archived rows, spilled chunks read back first"
+        store = PassengerStore(self.schema, capacity=len(self))
+        if self.spilled_rows > 0:
+            from src.utils.RunWriter import load_run
+
+            self.writer.sync()
+            spilled_df = load_run(self.spill_dir)
+            spilled_df = spilled_df.assign(lift=LiftAssignment.masks_from_values(spilled_df['lift']))
+            store.extend_df(spilled_df)
+        store.extend(self.store)
+        return store
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,55 @@
+import numpy as np
+
+from src.base.Passenger import Passenger
+from src.base.PassengerList import PassengerList
+from src.base.PassengerStore import PassengerStore
+from src.base.LiftAssignment import LiftAssignment
+
+
+class PassengerBatch:
+    """
+    many waiting passengers created at once from arrays of source, target and trip start time
+    ids are one contiguous block and columns are filled directly, with no Passenger objects or DataFrames
+    """
+    def __init__(self, sources, targets, trip_start_times=None, floor_list=None) -> None:
+        "trip_start_times is an array or a single time for all, the simulation clock when None"
+        from src.base.FloorList import FLOOR_LIST
+        from src.utils.Clock import CLOCK
+
+        floor_list = floor_list if floor_list is not None else FLOOR_LIST
+        self.sources = np.asarray(sources, dtype=object)
+        self.targets = np.asarray(targets, dtype=object)
+        if self.sources.shape != self.targets.shape or self.sources.ndim != 1:
+            raise ValueError('sources and targets must be 1-d arrays of the same length')
+        n = self.sources.size
+        if trip_start_times is None:
+            trip_start_times = CLOCK.now()
+        self.trip_start_times = np.broadcast_to(
+            np.asarray(trip_start_times, dtype='datetime64[ns]'), (n,)
+        )
+
+        source_ordinals = floor_list.ordinals_of(self.sources)
+        target_ordinals = floor_list.ordinals_of(self.targets)
+        if np.any(source_ordinals == target_ordinals):
+            raise ValueError('problem calculating passenger direction')
+        self.dirs = np.where(target_ordinals > source_ordinals, 'U', 'D').astype(object)
+        id_range = Passenger.reserve_ids(n)
+        self.ids = np.arange(id_range.start, id_range.stop, dtype=np.int64)
+
+    def __len__(self):
+        return self.ids.size
+
+    def to_store(self) -> PassengerStore:
+        return PassengerStore.from_arrays(PassengerList.store_schema, self.ids, {
+            'source': self.sources,
+            'current': self.sources,
+            'target': self.targets,
+            'dir': self.dirs,
+            'status': 'Waiting',
+            'lift': LiftAssignment.mask_from_value('Unassigned'),
+            'trip_start_time': self.trip_start_times,
+        })
+
+    def to_passenger_list(self) -> PassengerList:
+        "passenger list ready for PassengerList.passenger_list_arrival"
+        return PassengerList(store=self.to_store())
@@ -1,11 +1,20 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime
 from logging import INFO, DEBUG
 import asyncio
 
-from src.utils.Logging import get_logger, print_st
+from src.utils.Logging import get_logger, Deferred
+from src.utils.Events import EVENTS, PassengerArrived
+from src.utils.Clock import CLOCK
 from src.base.Passenger import Passenger
 from src.base.Floor import Floor
+from src.base.PassengerStore import PassengerStore
+from src.base.PassengerArchive import PassengerArchive
+from src.base.WaitingIndex import WaitingIndex
+from src.base.LiftAssignment import LiftAssignment
+from src.base.StatusCounter import StatusCounter
+from src.base.StopSets import StopSets
+from src.base.LiftFleet import LiftFleet
 
 class PassengerList:
     schema = {
@@ -22,60 +31,228 @@ class PassengerList:
         'waiting_time': 'Float64',
         'time_on_lift': 'Float64'
     }
+    # lift assignments are stored as bitmasks of candidate lifts
+    store_schema = schema | {'lift': 'int64'}
 
     def __init__(self, passenger_list_df = None, p_list_name = None,
-                 lift_managing = False, lift_tracking = False):
+                 lift_managing = False, lift_tracking = False, store = None):
         self.name = p_list_name
         self.lift_managing = lift_managing
         if p_list_name is not None:
             logger = get_logger(p_list_name, self.__class__.__name__, INFO)
             pa_assignment_logger = get_logger(p_list_name+'_arr_ass', self.__class__.__name__, DEBUG)
-            self.log = lambda msg: logger.info(msg)
-            self.log(f"{p_list_name}: init")
-            self.custom_log = lambda msg: pa_assignment_logger.debug(msg)
+            self.log = lambda msg, *args: logger.info(msg, *args)
+            self.log("%s: init", p_list_name)
+            self.custom_log = lambda msg, *args: pa_assignment_logger.debug(msg, *args)
         else:
             self.log = lambda *args: None
-        if passenger_list_df is not None:
-            self.df: pd.DataFrameType = pd.DataFrame(
-                passenger_list_df,
-                index=passenger_list_df.index,
-                columns=PassengerList.schema
-            ).astype(
-                PassengerList.schema
-            )
+        self._df_cache = None
+        self.waiting_index = None
+        self.assignment = None
+        self.status_counter = None
+        self.stop_sets = None
+        # receives records of passengers as they complete their trips, see src.utils.RunWriter
+        self.run_writer = None
+        # passengers that completed their trips move here, keeping the store to the working set
+        self.archive = None
+        if store is not None:
+            self.store = store
+        elif passenger_list_df is not None:
+            self.store = PassengerList.store_from_df(passenger_list_df)
         else:
-            self.df: pd.DataFrameType = pd.DataFrame(
-                columns=PassengerList.schema
-            ).astype(
-                PassengerList.schema
-            )
+            self.store = PassengerStore(PassengerList.store_schema)
         if lift_managing:
-            self.lift_msg_queue = asyncio.Queue()
-            self.reassignment_trigger = asyncio.Queue()
-            self.reassignment_rsp_queue = asyncio.Queue()
-            self.arrival_lock = asyncio.Lock()
-            self.tracking_lifts = []
-        # temp for dev of print stream
-        self.print_queue = asyncio.Queue()
-        self.visual_lock = asyncio.Lock()
+            self.init_lift_managing()
+
+    def init_lift_managing(self):
+        "queues, tracked lifts and the indexes kept over the store by the list managing the lifts"
+        self.lift_msg_queue = asyncio.Queue()
+        self.reassignment_trigger = asyncio.Queue()
+        self.reassignment_rsp_queue = asyncio.Queue()
+        self.arrival_lock = asyncio.Lock()
+        self.tracking_lifts = []
+        self.fleet = LiftFleet()
+        self.waiting_index = WaitingIndex()
+        self.rebuild_waiting_index()
+        self.assignment = LiftAssignment()
+        self.stop_sets = StopSets()
+        self.status_counter = StatusCounter()
+        self.count_statuses(slice(None))
+        self.archive = PassengerArchive(PassengerList.store_schema)
+        self.archive_arrived()
+        # a MatchingDispatcher replaces the lift by lift arrival search when set
+        self.dispatcher = None
+
+    def reset(self):
+        """
+        starts the list managing the lifts over for another simulation in the same process
+        passengers, floor passengers, lifts, passenger ids and the lift bit registry are cleared,
+        and queues are made anew for the next event loop
+        """
+        assert self.lift_managing
+        from src.base.FloorList import FLOOR_LIST
+
+        LiftAssignment.reset()
+        Passenger.reset_ids()
+        self.store = PassengerStore(PassengerList.store_schema)
+        self._df_cache = None
+        self.run_writer = None
+        self.init_lift_managing()
+        for _, floor in FLOOR_LIST.floors:
+            floor.passengers = PassengerList()
 
     def __del__(self):
-        self.log(f"{self.name}: start destructing")
+        self.log("%s: start destructing", self.name)
         if self.lift_managing:
             if self.arrival_lock.locked():
-                self.log(f"{self.name}: releasing arrival_lock to destruct")
+                self.log("%s: releasing arrival_lock to destruct", self.name)
                 self.arrival_lock.release()
             while not self.reassignment_trigger.empty():
                 msg = self.reassignment_trigger.get_nowait()
-                self.log(f"{self.name}: flushing reassignment_trigger item {msg}")
+                self.log("%s: flushing reassignment_trigger item %s", self.name, msg)
             while not self.lift_msg_queue.empty():
                 msg = self.lift_msg_queue.get_nowait()
-                self.log(f"{self.name}: flushing lift_msg_queue item {msg}")
+                self.log("%s: flushing lift_msg_queue item %s", self.name, msg)
             while not self.reassignment_rsp_queue.empty():
                 msg = self.reassignment_rsp_queue.get_nowait()
-                self.log(f"{self.name}: flushing reassignment_rsp_queue item {msg}")
-        self.log(f"{self.name}: destruction complete")
+                self.log("%s: flushing reassignment_rsp_queue item %s", self.name, msg)
+        self.log("%s: destruction complete", self.name)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        "pandas view of the passenger columns, materialized lazily and cached until the next change"
+        if (
+            self._df_cache is None or
+            self._df_cache[0] is not self.store or
+            self._df_cache[1] != self.store.version
+        ):
+            df = self.store.to_df()
+            df['lift'] = LiftAssignment.values_from_masks(self.store.column('lift'))
+            self._df_cache = (self.store, self.store.version, df)
+        return self._df_cache[2]
+
+    @df.setter
+    def df(self, passenger_list_df: pd.DataFrame):
+        self.store = PassengerList.store_from_df(passenger_list_df)
+        self._df_cache = None
+        self.rebuild_waiting_index()
+        self.rebuild_assignment()
+        if self.status_counter is not None:
+            self.status_counter.clear()
+            self.count_statuses(slice(None))
+        if self.archive is not None:
+            self.archive.clear()
+            self.archive_arrived()
+
+    def archive_arrived(self):
+        "moves arrived passengers from the store to the archive"
+        arrived = self.store.take(self.store.column('status') == 'Arrived')
+        self.archive_store(arrived)
+
+    def archive_store(self, arrived: PassengerStore):
+        if arrived.size == 0:
+            return
+        self.archive.add(arrived)
+        self.store.remove(arrived.get_ids())
+
+    def history(self):
+        "passengers of the store and the archive together, ordered by id, for queries over the whole run"
+        if self.archive is None or len(self.archive) == 0:
+            return PassengerList(store=self.store)
+        store = self.archive.to_store()
+        store.extend(self.store)
+        return PassengerList(store=store.take(np.argsort(store.get_ids(), kind='stable')))
+
+    @classmethod
+    def lift_masks_df(cls, passenger_list_df: pd.DataFrame) -> pd.DataFrame:
+        "replaces readable lift assignments with bitmasks"
+        if 'lift' not in passenger_list_df.columns:
+            return passenger_list_df
+        return passenger_list_df.assign(lift=LiftAssignment.masks_from_values(passenger_list_df['lift']))
+
+    @classmethod
+    def store_from_df(cls, passenger_list_df: pd.DataFrame) -> PassengerStore:
+        return PassengerStore.from_df(PassengerList.store_schema, PassengerList.lift_masks_df(passenger_list_df))
+
+    def rebuild_assignment(self):
+        if self.assignment is None:
+            return
+        self.assignment.clear()
+        self.stop_sets.clear()
+        self.add_assignment(slice(None))
+
+    def add_assignment(self, positions):
+        "adds assignments of traveling passengers at row positions to the assignment table"
+        if self.assignment is None:
+            return
+        traveling = self.store.column('status')[positions] != 'Arrived'
+        self.assignment.add(
+            self.get_ids()[positions][traveling],
+            self.store.column('lift')[positions][traveling]
+        )
+        self.stop_sets.change(*self.stop_columns(positions), 1)
+
+    def stop_columns(self, positions, masks=None):
+        "masks, statuses, sources and targets at row positions, as StopSets.change takes them"
+        return (
+            self.store.column('lift')[positions] if masks is None else masks,
+            self.store.column('status')[positions],
+            self.store.column('source')[positions],
+            self.store.column('target')[positions],
+        )
+
+    def count_statuses(self, positions):
+        "adds passengers at row positions to the status counters"
+        if self.status_counter is None:
+            return
+        self.status_counter.add(self.store.column('status')[positions], self.store.column('lift')[positions])
 
+    def rebuild_waiting_index(self):
+        if self.waiting_index is None:
+            return
+        order = self.earliest_arrival_positions()
+        self.waiting_index.rebuild(
+            self.store.column('source')[order],
+            self.store.column('dir')[order],
+            self.store.column('status')[order],
+            self.get_ids()[order].tolist()
+        )
+
+    def index_waiting(self, positions):
+        "adds passengers at row positions to the waiting index"
+        if self.waiting_index is None:
+            return
+        sources = self.store.column('source')
+        dirs = self.store.column('dir')
+        statuses = self.store.column('status')
+        ids = self.get_ids()
+        for pos in positions:
+            if statuses[pos] == 'Waiting':
+                self.waiting_index.add(sources[pos], dirs[pos], int(ids[pos]))
+
+    def select(self, selection):
+        "passengers at rows given by a boolean mask or row positions"
+        return PassengerList(store=self.store.take(selection))
+
+    def get_ids(self):
+        return self.store.get_ids()
+
+    @classmethod
+    def passenger_to_values(cls, passenger: Passenger) -> dict:
+        return {
+            'source': passenger.source,
+            'current': passenger.current,
+            'target': passenger.target,
+            'dir': passenger.dir,
+            'status': passenger.status,
+            'lift': LiftAssignment.mask_from_value(passenger.lift),
+            'trip_start_time': passenger.trip_start,
+            'board_time': getattr(passenger, 'board_time', None),
+            'dest_arrival_time': getattr(passenger, 'dest_arrival_time', None),
+            'travel_time': getattr(passenger, 'travel_time', np.nan),
+            'waiting_time': getattr(passenger, 'waiting_time', np.nan),
+            'time_on_lift': getattr(passenger, 'time_on_lift', np.nan),
+        }
 
     @classmethod
     def passenger_to_df(cls, passenger: Passenger):
@@ -89,21 +266,11 @@ class PassengerList:
                     passenger.status,
                     passenger.lift,
                     passenger.trip_start,
-                    passenger.board_time
-                        if 'board_time' in passenger.__dict__.keys()
-                        else None,
-                    passenger.dest_arrival_time
-                        if 'dest_arrival_time' in passenger.__dict__.keys()
-                        else None,
-                    passenger.travel_time
-                        if 'travel_time' in passenger.__dict__.keys()
-                        else pd.NA,
-                    passenger.waiting_time
-                        if 'travel_time' in passenger.__dict__.keys()
-                        else pd.NA,
-                    passenger.time_on_lift
-                        if 'travel_time' in passenger.__dict__.keys()
-                        else pd.NA
+                    getattr(passenger, 'board_time', None),
+                    getattr(passenger, 'dest_arrival_time', None),
+                    getattr(passenger, 'travel_time', pd.NA),
+                    getattr(passenger, 'waiting_time', pd.NA),
+                    getattr(passenger, 'time_on_lift', pd.NA),
                 ]
             ],
             columns=PassengerList.schema,
@@ -119,14 +286,14 @@ class PassengerList:
         msg = source, target, dir
         search_redirect_lift = self.lift_search_redirect_gen(source, dir)
         for next_lift in iter(search_redirect_lift):
-            if self.df.loc[passenger_id, 'lift'] != 'Unassigned':
-                self.log(f"passenger {passenger_id} assigned; stop search")
+            if self.store.get(passenger_id, 'lift') != 0:
+                self.log("passenger %s assigned; stop search", passenger_id)
                 break
-            next_lift.log(f'{next_lift.name} from {next_lift.floor} evaluating for {msg}')
+            next_lift.log("%s from %s evaluating for %s", next_lift.name, next_lift.floor, msg)
             next_lift.arrival_queue.put_nowait(msg)
-            self.log(f"evaluating {next_lift.name} for {passenger_id}")
+            self.log("evaluating %s for %s", next_lift.name, passenger_id)
             assigned = await self.lift_msg_queue.get()
-            self.log(f"evaluation {next_lift.name} for {passenger_id} is {assigned}")
+            self.log("evaluation %s for %s is %s", next_lift.name, passenger_id, assigned)
 
     async def reassign_to_stationary_lifts(self, lifts_for_reassignment, passenger_ids):
         """assigns one passenger per stationary lift"""
@@ -136,26 +303,22 @@ class PassengerList:
             return
         remaining_passenger_ids = passenger_ids
         while lift is not None:
-            self.log(f"calculating reassignment of lift {lift.name} for passengers {passenger_ids}")
+            self.log("calculating reassignment of lift %s for passengers %s", lift.name, passenger_ids)
             remaining_capacity = lift.capacity - lift.passenger_count
             if remaining_capacity >= len(passenger_ids):
                 to_assign = passenger_ids
             else:
                 to_assign = passenger_ids[:remaining_capacity]
-            msg = tuple(
-                ['reassign'] +
-                self.df.reset_index() \
-                .loc[to_assign, ['source', 'target', 'dir']] \
-                .drop_duplicates() \
-                .values[0].tolist()
-            )
+            # looked up by id, row positions stop matching ids once arrived passengers are archived
+            first = to_assign[0]
+            msg = ('reassign', *(self.store.get(first, col) for col in ['source', 'target', 'dir']))
             if lift.is_stationed():
                 lift.reassignment_queue.put_nowait(msg)
-                self.log(f"reassignment evaluating {lift.name} for {passenger_ids}")
+                self.log("reassignment evaluating %s for %s", lift.name, passenger_ids)
                 assigned = await self.reassignment_rsp_queue.get()
-                self.log(f"reassignment evaluation {lift.name} for {passenger_ids} is {assigned}")
+                self.log("reassignment evaluation %s for %s is %s", lift.name, passenger_ids, assigned)
                 if assigned:
-                    self.log(f"reassigned {to_assign} to {lift.name}")
+                    self.log("reassigned %s to %s", to_assign, lift.name)
                     remaining_passenger_ids = [i for i in remaining_passenger_ids if i not in to_assign]
                     if len(remaining_passenger_ids) == 0:
                         return
@@ -164,103 +327,145 @@ class PassengerList:
     def register_lift(self, lift):
         assert hasattr(self, 'tracking_lifts')
         self.tracking_lifts += [lift]
+        self.fleet.add(lift)
 
-    def lift_search_redirect_gen(self, arrival_source, arrival_dir):
-        time = datetime.now()
-        lift_order = {}
+    def fleet_search_order(self, arrival_source, lift_dirs):
+        "lifts facing one of lift_dirs that can reach the arrival source floor, nearest in time first"
+        time = CLOCK.now()
 
         from src.base.FloorList import FLOOR_LIST
         target_height = FLOOR_LIST.get_floor(arrival_source).height
-        for lift in PASSENGERS.tracking_lifts:
-            if (lift.dir == arrival_dir or lift.dir == 'S'):
-                time_to_reach = lift.get_reaching_time(time, target_height)
-                self.custom_log(f'lift_search_redirect_gen {lift.name} time_to_reach {time_to_reach}')
-                if time_to_reach is not None:
-                    lift_order[lift] = time_to_reach
-        search_order = sorted(lift_order.items(), key=lambda x: x[1])
-        self.custom_log(f'search order {[[item[0].name, item[1]] for item in search_order]}')
-        for sorted_lift in search_order:
-            yield sorted_lift[0]
+        self.fleet.refresh(time)
+        times_to_reach = self.fleet.reaching_times(time, target_height, arrival_source)
+        eligible = np.isin(self.fleet.dirs, lift_dirs)
+        candidates = np.flatnonzero(eligible & ~np.isnan(times_to_reach))
+        order = candidates[np.argsort(times_to_reach[candidates], kind='stable')]
+        search_order = [[self.fleet.lifts[i], times_to_reach[i]] for i in order.tolist()]
+        self.custom_log("search order %s", Deferred(lambda: [[lift.name, t] for lift, t in search_order]))
+        return [lift for lift, _ in search_order]
 
-    def lift_search_reassign_stationary_gen(self, arrival_source):
-        time = datetime.now()
-        lift_order = {}
+    def lift_search_redirect_gen(self, arrival_source, arrival_dir):
+        yield from self.fleet_search_order(arrival_source, [arrival_dir, 'S'])
 
-        from src.base.FloorList import FLOOR_LIST
-        target_height = FLOOR_LIST.get_floor(arrival_source).height
-        for lift in PASSENGERS.tracking_lifts:
-            if lift.dir != 'S':
-                continue
-            time_to_reach = lift.get_reaching_time(time, target_height)
-            if time_to_reach is not None:
-                lift_order[lift] = time_to_reach
-        search_order = sorted(lift_order.items(), key=lambda x: x[1])
-        self.custom_log(f'search order {[[item[0].name, item[1]] for item in search_order]}')
-        for sorted_lift in search_order:
-            yield sorted_lift[0]
+    def lift_search_reassign_stationary_gen(self, arrival_source):
+        yield from self.fleet_search_order(arrival_source, ['S'])
     
     def count_passengers(self) -> int:
-        return self.df.shape[0]
+        return self.store.size
     
     def count_traveling_passengers(self) -> int:
-        return (self.df.status != 'Arrived').sum()
+        return int((self.store.column('status') != 'Arrived').sum())
 
     def bulk_add_passengers(self, passengers):
-        self.df = pd.concat([
-            self.df,
-            passengers.df
-        ], axis=0)
+        start = self.store.size
+        self.store.extend(passengers.store)
+        if self.waiting_index is not None:
+            arrival_order = passengers.earliest_arrival_positions()
+            self.index_waiting((start + arrival_order).tolist())
+        self.add_assignment(slice(start, self.store.size))
+        self.count_statuses(slice(start, self.store.size))
 
     def remove_all_passengers(self):
-        self.df = self.df.loc[[],:]
+        self.store.clear()
 
     def remove_passengers(self, passengers):
         self.complement_passenger_list(passengers)
 
     def board(self, passengers):
-        self.df.loc[passengers.df.index, 'status'] = 'Onboard'
-        self.log(f'board: passengers {passengers.df.index.tolist()} boarding')
-        self.update_boarding_time(passengers)
-
-    def update_boarding_time(self, passengers):
-        self.df.loc[passengers.df.index, 'board_time'] = datetime.now()
+        positions = self.store.positions_of(passengers.get_ids())
+        if self.waiting_index is not None:
+            sources = self.store.column('source')
+            dirs = self.store.column('dir')
+            ids = self.get_ids()
+            for pos in positions.tolist():
+                self.waiting_index.remove(sources[pos], dirs[pos], int(ids[pos]))
+        if self.status_counter is not None:
+            self.status_counter.board(self.store.column('lift')[positions])
+        if self.stop_sets is not None:
+            self.stop_sets.remove_floors(self.store.column('lift')[positions], self.store.column('source')[positions])
+        self.store.set(positions, 'status', 'Onboard')
+        self.log("board: passengers %s boarding", passengers.get_ids().copy())
+        self.update_boarding_time(positions)
+
+    def update_boarding_time(self, positions):
+        "sets board time and waiting time of passengers at row positions"
+        from src.metrics.TimeMetrics import elapsed_seconds
+
+        board_time = np.datetime64(CLOCK.now(), 'ns')
+        self.store.set(positions, 'board_time', board_time)
+        self.store.set(
+            positions, 'waiting_time',
+            elapsed_seconds(board_time, self.store.column('trip_start_time')[positions])
+        )
 
     def update_arrival(self, passengers):
-        self.df.loc[passengers.df.index, 'status'] = 'Arrived'
-        self.df.loc[passengers.df.index, 'dest_arrival_time'] = datetime.now()
+        from src.metrics.TimeMetrics import elapsed_seconds
+
+        positions = self.store.positions_of(passengers.get_ids())
+        if self.assignment is not None:
+            self.assignment.release(self.get_ids()[positions], self.store.column('lift')[positions])
+        if self.status_counter is not None:
+            self.status_counter.arrive(self.store.column('lift')[positions])
+        if self.stop_sets is not None:
+            self.stop_sets.remove_floors(self.store.column('lift')[positions], self.store.column('target')[positions])
+        arrival_time = np.datetime64(CLOCK.now(), 'ns')
+        self.store.set(positions, 'status', 'Arrived')
+        self.store.set(positions, 'dest_arrival_time', arrival_time)
+        self.store.set(
+            positions, 'travel_time',
+            elapsed_seconds(arrival_time, self.store.column('trip_start_time')[positions])
+        )
+        self.store.set(
+            positions, 'time_on_lift',
+            elapsed_seconds(arrival_time, self.store.column('board_time')[positions])
+        )
+        arrived = self.store.take(positions)
+        if self.run_writer is not None:
+            self.run_writer.add(arrived)
+        if self.archive is not None:
+            self.archive_store(arrived)
         self.log(
-            f"{self.name}: {passengers.count_passengers()} passengers {passengers.df.index.tolist()} completed"
-            f"count is {self.count_traveling_passengers()}"
+            "%s: %s passengers %s completedcount is %s",
+            self.name, passengers.count_passengers(), passengers.get_ids().copy(), self.count_traveling_passengers()
         )
 
     def add_passenger_list(self, passenger_df: pd.DataFrame):
-        self.df = pd.concat([self.df, passenger_df])
+        start = self.store.size
+        self.store.extend_df(PassengerList.lift_masks_df(passenger_df))
+        self.index_waiting(range(start, self.store.size))
+        self.add_assignment(slice(start, self.store.size))
+        self.count_statuses(slice(start, self.store.size))
+
+    def add_passenger(self, passenger: Passenger):
+        self.store.append_row(passenger.id, PassengerList.passenger_to_values(passenger))
+        if self.waiting_index is not None and passenger.status == 'Waiting':
+            self.waiting_index.add(passenger.source, passenger.dir, passenger.id)
+        self.add_assignment(slice(self.store.size - 1, self.store.size))
+        self.count_statuses(slice(self.store.size - 1, self.store.size))
 
     async def passenger_arrival(self, passenger: Passenger):
-        passenger_df = PassengerList.passenger_to_df(passenger)
-        self.add_passenger_list(passenger_df)
+        self.add_passenger(passenger)
         self.log(
-            f"{self.name}: passenger {passenger.id} new arrival;"
-            f"count is {self.count_traveling_passengers()}"
+            "%s: passenger %s new arrival;count is %s", self.name, passenger.id, self.count_traveling_passengers()
         )
         
         from src.base.FloorList import FLOOR_LIST
         floor = FLOOR_LIST.get_floor(passenger.source)
-        floor.passengers.add_passenger_list(passenger_df)
-        floor.log(f"{floor.name}: 1 new arrival; count is {floor.passengers.count_passengers()}")
-        print_st(f"1 New passenger arrived at {floor.name} traveling to {passenger.target}")
+        floor.passengers.add_passenger(passenger)
+        floor.log("%s: 1 new arrival; count is %s", floor.name, floor.passengers.count_passengers())
+        EVENTS.emit(PassengerArrived, floor.name, 1, passenger.target)
 
-        # if not all([i in self.df.index for i in range(1,passenger.id+1)]):
-        #     print(list(range(1,passenger.id+1)), self.df.index)
-        assert all([i in self.df.index for i in range(1,passenger.id+1)])
+        if self.dispatcher is not None:
+            self.dispatcher.notify()
+            return
 
-        self.log(f'arrival search, attempt to acquire, is locked {self.arrival_lock.locked()}')
+        self.log("arrival search, attempt to acquire, is locked %s", self.arrival_lock.locked())
         async with self.arrival_lock:
             # flush any previous queue items
             while not self.lift_msg_queue.empty():
                 self.lift_msg_queue.get_nowait()
             self.log('arrival search, acquired')
-            self.custom_log(f"queuing for arrival of {passenger.id}")
+            self.custom_log("queuing for arrival of %s", passenger.id)
             await self.search_lifts_to_queue_passenger(passenger.id, passenger.source,
                                                        passenger.target, passenger.dir)
         self.log('arrival search, released')
@@ -269,7 +474,7 @@ class PassengerList:
         self.log('start reassignment listener')
         while True:
             arrival_source, passenger_ids = await self.reassignment_trigger.get()
-            self.log(f'reassignment triggered for {arrival_source, passenger_ids}')
+            self.log("reassignment triggered for %s", (arrival_source, passenger_ids))
             await self.reassign_unassigned(arrival_source, passenger_ids)
             self.log('reassignment listener loop end')
 
@@ -281,200 +486,210 @@ class PassengerList:
         await self.reassign_to_stationary_lifts(lifts_for_reassignment, passenger_ids)
 
     def passenger_list_arrival(self, passengers):
-        passenger_df = passengers.df
-        self.add_passenger_list(passenger_df)
+        "adds arriving passengers, given as a PassengerList or anything with to_passenger_list such as a PassengerBatch"
+        if not isinstance(passengers, PassengerList):
+            passengers = passengers.to_passenger_list()
+        self.bulk_add_passengers(passengers)
         self.log(
-            f"{self.name}: {passengers.count_passengers()} passengers {passenger_df.index.tolist()} new arrival;"
-            f"count is {self.count_traveling_passengers()}"
+            "%s: %s passengers %s new arrival;count is %s",
+            self.name, passengers.count_passengers(), passengers.get_ids().copy(), self.count_traveling_passengers()
         )
         
         from src.base.FloorList import FLOOR_LIST
-        for floor_name in passengers.df.source.unique():
+        sources = passengers.store.column('source')
+        for floor_name in pd.unique(sources):
             floor = FLOOR_LIST.get_floor(floor_name)
-            floor.passengers.add_passenger_list(
-                passengers.df.loc[passengers.df.source == floor_name,:]
-            )
+            from_floor = sources == floor_name
+            floor.passengers.bulk_add_passengers(passengers.select(from_floor))
             floor.log(
-                f"{floor.name}: {(passengers.df.source == floor_name).sum()} new arrival;"
-                f" count is {floor.passengers.count_passengers()}"
-            )
-            print_st(
-                f"{(passengers.df.source == floor_name).sum()} new passenger arrived at {floor.name}"
+                "%s: %s new arrival; count is %s", floor.name, from_floor.sum(), floor.passengers.count_passengers()
             )
+            EVENTS.emit(PassengerArrived, floor.name, int(from_floor.sum()))
+        if getattr(self, 'dispatcher', None) is not None:
+            self.dispatcher.notify()
 
     def complement_passenger_list(self, passenger_list):
-        self.df = self.df.loc[
-            self.df.index.difference(passenger_list.df.index), :
-        ]
+        self.store.remove(passenger_list.get_ids())
 
     def sample_passengers(self, n) -> pd.DataFrame:
         return self.df.sample(n)
 
     def filter_by_floor(self, floor: Floor):
         "filters passengers to those on a floor"
-        return PassengerList(self.df.loc[self.df.current == floor.name, :])
+        return self.select(self.store.column('current') == floor.name)
 
     def filter_by_destination(self, floor: Floor):
         "filters passengers to those on a floor"
-        return PassengerList(self.df.loc[self.df.target == floor.name, :])
+        return self.select(self.store.column('target') == floor.name)
 
     def filter_by_direction(self, direction):
         "filters passengers to those on a floor"
-        return PassengerList(self.df.loc[self.df.dir == direction, :])
+        return self.select(self.store.column('dir') == direction)
+
+    def filter_waiting_at(self, floor: Floor, direction=None, n=None):
+        """
+        filters waiting passengers on a floor heading in a direction, in arrival order
+        answered from the waiting index, with n only the earliest n are taken
+        """
+        assert self.waiting_index is not None
+        if direction is None:
+            passenger_ids = np.sort(
+                self.waiting_index.get_ids(floor.name, 'U') + self.waiting_index.get_ids(floor.name, 'D')
+            )
+        else:
+            passenger_ids = self.waiting_index.get_ids(floor.name, direction, n)
+        return self.select(self.store.positions_of(passenger_ids))
+
+    def filter_first_arrivals(self, n):
+        "filters an arrival ordered list to its first n passengers"
+        return self.select(slice(0, n))
+
+    def filter_by_ids(self, passenger_ids):
+        "filters passengers to those with given ids"
+        return self.select(np.sort(self.store.positions_of(passenger_ids)))
+
+    def filter_excluding(self, passenger_list):
+        "filters passengers to those not in another list"
+        return self.select(~np.isin(self.get_ids(), passenger_list.get_ids()))
 
     def filter_by_lift_assigned(self, lift):
         "filters passengers to those assigned to a lift"
-        def lift_filter_condition(assignment_condition, lift_name):
-            return lift_name == assignment_condition or lift_name in assignment_condition
-        filter_condition = self.df.loc[:,'lift'].apply(lambda x: lift_filter_condition(x, lift.name))
-        return PassengerList(self.df.loc[filter_condition, :])
+        return self.select(self.store.column('lift') & LiftAssignment.bit(lift.name) != 0)
+
+    def count_assigned_to(self, lift) -> int:
+        "counts traveling passengers assigned only to a lift"
+        if self.assignment is not None:
+            return self.assignment.count_sole(lift.name)
+        return int((
+            (self.store.column('status') != 'Arrived') &
+            (self.store.column('lift') == LiftAssignment.bit(lift.name))
+        ).sum())
 
     def filter_by_lift_unassigned(self):
         "filters passengers to those not assigned to a lift"
-        return PassengerList(self.df.loc[self.df.lift == 'Unassigned', :])
+        return self.select(self.store.column('lift') == 0)
     
     def filter_by_lift_assigned_not_to_other_only(self, lift):
         """as a signal of availability filters passengers 
         to those assigned to this or not assigned to other lift"""
-        def lift_filter_condition(assignment_condition, lift_name):
-            return (
-                type(assignment_condition) is str and
-                (
-                    assignment_condition == lift_name or
-                    assignment_condition == 'Unassigned'
-                )
-            ) or (
-                type(assignment_condition) is list and
-                (
-                    lift_name in assignment_condition or
-                    len(assignment_condition) == 0
-                )
-            )
-        filter_condition = self.df.loc[:,'lift'].apply(lambda x: lift_filter_condition(x, lift.name))
-        return PassengerList(self.df.loc[filter_condition, :])
+        masks = self.store.column('lift')
+        return self.select((masks == 0) | (masks & LiftAssignment.bit(lift.name) != 0))
+
+    def earliest_arrival_positions(self, selection=None):
+        "row positions ordered by trip start time"
+        positions = np.arange(self.store.size) if selection is None else np.flatnonzero(selection)
+        order = np.argsort(self.store.column('trip_start_time')[positions], kind='stable')
+        return positions[order]
     
     def filter_dir_for_earliest_arrival(self, dir, n):
-        filtered_df = self.df.loc[self.df.dir == dir, :]
-        to_select = min(n, filtered_df.shape[0])
-        return filtered_df.sort_values('trip_start_time').head(to_select)
+        positions = self.earliest_arrival_positions(self.store.column('dir') == dir)
+        return self.select(positions[:n]).df
     
     def filter_by_earliest_arrival(self, n):
-        return PassengerList(self.df.sort_values('trip_start_time').head(n))
+        return self.select(self.earliest_arrival_positions()[:n])
 
     def filter_by_status_waiting(self):
         "filters passengers to those waiting"
-        return PassengerList(self.df.loc[self.df.status == 'Waiting', :])
+        return self.select(self.store.column('status') == 'Waiting')
+
+    def filter_by_status_onboard(self):
+        "filters passengers to those onboard"
+        return self.select(self.store.column('status') == 'Onboard')
     
-    @classmethod
-    def append_lift(cls, existing_assignment, lift_name):
-        if type(existing_assignment) is list:
-            if lift_name in existing_assignment:
-                return existing_assignment
-            return existing_assignment + [lift_name]
-        elif (
-            type(existing_assignment) is str and
-            len(existing_assignment) > 0 and
-            existing_assignment[0] == "[" and
-            existing_assignment[-1] == "]"
-        ):
-            existing_assignment = existing_assignment[1:-1].split(', ')
-            existing_assignment = list(map(lambda x: x.replace("'", ""), existing_assignment))
-            if lift_name in existing_assignment:
-                return existing_assignment
-            return existing_assignment + [lift_name]
-        elif type(existing_assignment) is str:
-            if existing_assignment == 'Unassigned':
-                return lift_name
-            elif lift_name != existing_assignment:
-                return [existing_assignment] + [lift_name]
-            else:
-                return existing_assignment
+    def update_lift_masks(self, positions, new_masks):
+        "sets lift assignment bitmasks at row positions, keeping the assignment table in step"
+        masks = self.store.column('lift')
+        if self.assignment is not None:
+            traveling = self.store.column('status')[positions] != 'Arrived'
+            new_masks = np.broadcast_to(new_masks, masks[positions].shape)
+            self.assignment.update(
+                self.get_ids()[positions][traveling],
+                masks[positions][traveling],
+                new_masks[traveling]
+            )
+            self.stop_sets.change(*self.stop_columns(positions), -1)
+            self.stop_sets.change(*self.stop_columns(positions, new_masks), 1)
+        self.store.set(positions, 'lift', new_masks)
     
     def assign_lift(self, lift, assign_multi=True):
         from src.base.Lift import Lift
 
         assert type(lift) is Lift
+        waiting = np.flatnonzero(self.store.column('status') == 'Waiting')
+        bit = LiftAssignment.bit(lift.name)
         if assign_multi:
-            self.df.loc[(self.df.status == 'Waiting') & (self.df.lift != 'Unassigned'), 'lift'] = \
-                self.df.loc[(self.df.status == 'Waiting') & (self.df.lift != 'Unassigned'), 'lift'] \
-                .apply(lambda x: PassengerList.append_lift(x, lift.name))
-            self.df.loc[(self.df.status == 'Waiting') & (self.df.lift == 'Unassigned'), 'lift'] = lift.name
+            self.update_lift_masks(waiting, self.store.column('lift')[waiting] | bit)
         else:
-            self.df.loc[self.df.status == 'Waiting', 'lift'] = lift.name
+            self.update_lift_masks(waiting, bit)
     
     def assign_lift_for_floor(self, lift, floor, assign_multi=True):
         from src.base.Lift import Lift
 
         assert type(lift) is Lift
         assert type(floor) is Floor
+        waiting_on_floor = np.flatnonzero(
+            (self.store.column('status') == 'Waiting') & (self.store.column('source') == floor.name)
+        )
+        bit = LiftAssignment.bit(lift.name)
         if assign_multi:
-            self.df.loc[(self.df.status == 'Waiting') & (self.df.source==floor.name), 'lift'] = \
-                self.df.loc[(self.df.status == 'Waiting') & (self.df.source==floor.name), 'lift'] \
-                .apply(lambda x: PassengerList.append_lift(x, lift.name))
+            self.update_lift_masks(waiting_on_floor, self.store.column('lift')[waiting_on_floor] | bit)
         else:
-            self.df.loc[(self.df.status == 'Waiting') & (self.df.source==floor.name), 'lift'] = lift.name
+            self.update_lift_masks(waiting_on_floor, bit)
     
     def assign_lift_for_selection(self, lift, passenger_list, assign_multi=True):
         from src.base.Lift import Lift
 
         assert type(lift) is Lift
         assert type(passenger_list) is PassengerList
+        positions = self.store.positions_of(passenger_list.get_ids())
+        bit = LiftAssignment.bit(lift.name)
         if assign_multi:
-            self.df.loc[passenger_list.df.index, 'lift'] = \
-                self.df.loc[passenger_list.df.index, 'lift'] \
-                .apply(lambda x: PassengerList.append_lift(x, lift.name))
+            self.update_lift_masks(positions, self.store.column('lift')[positions] | bit)
         else:
-            self.df.loc[passenger_list.df.index, 'lift'] = lift.name
+            self.update_lift_masks(positions, bit)
 
     def unassign_lift_for_selection(self, lift, passenger_list):
         from src.base.Lift import Lift
 
         assert type(lift) is Lift
         assert type(passenger_list) is PassengerList
-        def unassign(lift_name, existing_assignment):
-            if type(existing_assignment) is str:
-                if existing_assignment == lift_name:
-                    return "Unassigned"
-            elif type(existing_assignment) is list:
-                if lift_name in existing_assignment:
-                    return [l for l in existing_assignment if l != lift_name]
-            return existing_assignment
-                
-        self.df.loc[passenger_list.df.index, 'lift'] = \
-            self.df.loc[passenger_list.df.index, 'lift'].apply(
-                lambda x: unassign(lift.name, x)
-            )
+        positions = self.store.positions_of(passenger_list.get_ids())
+        self.update_lift_masks(positions, self.store.column('lift')[positions] & ~LiftAssignment.bit(lift.name))
 
     def update_passenger_floor(self, floor):
-        self.df.loc[:, 'current'] = floor.name
+        self.store.set(slice(None), 'current', floor.name)
 
     def update_lift_passenger_floor(self, lift, floor):
-        self.df.loc[(self.df.status == 'Onboard') & (self.df.lift==lift.name), 'current'] = floor.name
+        self.store.set(
+            (self.store.column('status') == 'Onboard') & (self.store.column('lift') == LiftAssignment.bit(lift.name)),
+            'current', floor.name
+        )
+
+    def unique_pairs(self, first_col, second_col) -> pd.DataFrame:
+        "distinct value pairs of two columns in order of first occurrence"
+        pairs = dict.fromkeys(zip(self.store.column(first_col), self.store.column(second_col)))
+        return pd.DataFrame(list(pairs), columns=[first_col, second_col])
 
     def passenger_target_scan(self) -> pd.DataFrame:
         "scan for all passenger target destination"
-        return self.df.loc[:,['target', 'dir']].drop_duplicates()
+        return self.unique_pairs('target', 'dir')
 
     def passenger_source_scan(self) -> pd.DataFrame:
         "scan for all passenger source floors"
-        return self.df.loc[:,['source', 'dir']].drop_duplicates()
+        return self.unique_pairs('source', 'dir')
     
-    def boarded_lift_info(self) -> pd.DataFrame:
-        def get_boarded_lift(status, lift):
-            if status == 'Waiting':
-                return 'Waiting'
-            return lift
-        return self.df.loc[self.df.status != 'Arrived', :] \
-            .apply(lambda df: get_boarded_lift(df.status, df.lift), axis=1)
+    def boarded_lift_info(self) -> pd.Series:
+        status = self.store.column('status')
+        traveling = status != 'Arrived'
+        return pd.Series(
+            np.where(
+                status[traveling] == 'Waiting', 'Waiting',
+                LiftAssignment.values_from_masks(self.store.column('lift')[traveling])
+            ),
+            index=self.get_ids()[traveling],
+            dtype=object
+        )
     
-    def update_passenger_metrics(self, print_passenger_metrics,
-                                 floor_list, ordering_type='source'):
-        from src.metrics.TimeMetrics import calculate_all_metrics
-
-        self.df = calculate_all_metrics(self).df
-        if print_passenger_metrics:
-            self.pprint_passenger_status(floor_list, ordering_type=ordering_type)
-
     def pprint_passenger_status(self, floor_list, ordering_type='source'):
         def format_trip(df):
             return df.source + " -> " + df.target
@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+
+class PassengerStore:
+    """
+    columnar storage of passenger records
+    each column is a preallocated numpy array grown by doubling,
+    so appending a passenger is amortized O(1) regardless of how many are stored
+    """
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, schema, capacity=INITIAL_CAPACITY) -> None:
+        self.schema = schema
+        self.size = 0
+        self.capacity = max(capacity, 1)
+        self.ids = np.empty(self.capacity, dtype=np.int64)
+        self.columns = {
+            col: PassengerStore.empty_column(dtype, self.capacity)
+            for col, dtype in schema.items()
+        }
+        # bumped on every mutation, lets views cache derived data
+        self.version = 0
+        self.ids_sorted = True
+        self._positions = None
+
+    @classmethod
+    def numpy_dtype(cls, dtype):
+        if dtype == 'datetime64[ns]':
+            return np.dtype('datetime64[ns]')
+        elif dtype == 'Float64':
+            return np.dtype(np.float64)
+        elif dtype == 'int64':
+            return np.dtype(np.int64)
+        else:
+            return np.dtype(object)
+
+    @classmethod
+    def empty_column(cls, dtype, capacity):
+        np_dtype = PassengerStore.numpy_dtype(dtype)
+        if np_dtype.kind == 'M':
+            return np.full(capacity, np.datetime64('NaT'), dtype=np_dtype)
+        elif np_dtype.kind == 'f':
+            return np.full(capacity, np.nan, dtype=np_dtype)
+        elif np_dtype.kind == 'i':
+            return np.zeros(capacity, dtype=np_dtype)
+        else:
+            return np.full(capacity, None, dtype=np_dtype)
+
+    @classmethod
+    def from_df(cls, schema, df: pd.DataFrame):
+        store = cls(schema, capacity=df.shape[0])
+        store.extend_df(df)
+        return store
+
+    @classmethod
+    def from_arrays(cls, schema, ids, columns: dict):
+        "store holding the given id and column arrays, columns left out stay empty"
+        ids = np.asarray(ids, dtype=np.int64)
+        store = cls(schema, capacity=ids.size)
+        store.ids[:ids.size] = ids
+        for col, values in columns.items():
+            store.columns[col][:ids.size] = values
+        store.size = ids.size
+        store._after_append(0)
+        return store
+
+    def __len__(self):
+        return self.size
+
+    def touch(self):
+        self.version += 1
+
+    def get_ids(self):
+        return self.ids[:self.size]
+
+    def column(self, col):
+        return self.columns[col][:self.size]
+
+    def reserve(self, extra):
+        required = self.size + extra
+        if required <= self.capacity:
+            return
+        new_capacity = self.capacity
+        while new_capacity < required:
+            new_capacity *= 2
+        self.ids = np.concatenate([self.ids[:self.size], np.empty(new_capacity - self.size, dtype=np.int64)])
+        for col, dtype in self.schema.items():
+            grown = PassengerStore.empty_column(dtype, new_capacity)
+            grown[:self.size] = self.columns[col][:self.size]
+            self.columns[col] = grown
+        self.capacity = new_capacity
+
+    def _after_append(self, start):
+        new_ids = self.ids[start:self.size]
+        if self.ids_sorted and new_ids.size > 0:
+            last = self.ids[start - 1] if start > 0 else None
+            self.ids_sorted = (
+                (last is None or new_ids[0] > last) and
+                bool(np.all(new_ids[1:] > new_ids[:-1]))
+            )
+        if self._positions is not None:
+            for pos in range(start, self.size):
+                self._positions[int(self.ids[pos])] = pos
+        self.touch()
+
+    def append_row(self, passenger_id, values: dict):
+        self.reserve(1)
+        pos = self.size
+        self.ids[pos] = passenger_id
+        for col, value in values.items():
+            self.columns[col][pos] = value
+        self.size += 1
+        self._after_append(pos)
+
+    def extend(self, other):
+        if other.size == 0:
+            return
+        start = self.size
+        self.reserve(other.size)
+        self.ids[start:start + other.size] = other.get_ids()
+        for col in self.schema:
+            self.columns[col][start:start + other.size] = other.column(col)
+        self.size += other.size
+        self._after_append(start)
+
+    def extend_df(self, df: pd.DataFrame):
+        n = df.shape[0]
+        if n == 0:
+            return
+        start = self.size
+        self.reserve(n)
+        self.ids[start:start + n] = df.index.to_numpy(dtype=np.int64)
+        for col, dtype in self.schema.items():
+            target = self.columns[col]
+            if col not in df.columns:
+                continue
+            np_dtype = PassengerStore.numpy_dtype(dtype)
+            if np_dtype.kind == 'f':
+                target[start:start + n] = pd.array(df[col], dtype='Float64').to_numpy(dtype=np.float64, na_value=np.nan)
+            elif np_dtype.kind == 'M':
+                target[start:start + n] = pd.to_datetime(df[col]).to_numpy(dtype='datetime64[ns]')
+            elif np_dtype.kind == 'i':
+                target[start:start + n] = df[col].to_numpy(dtype=np.int64)
+            else:
+                target[start:start + n] = df[col].to_numpy(dtype=object)
+        self.size += n
+        self._after_append(start)
+
+    def take(self, selection):
+        "returns a compact store of the rows selected by a boolean mask or row positions"
+        ids = self.get_ids()[selection]
+        store = PassengerStore(self.schema, capacity=ids.size)
+        store.ids[:ids.size] = ids
+        for col in self.schema:
+            store.columns[col][:ids.size] = self.column(col)[selection]
+        store.size = ids.size
+        store._after_append(0)
+        return store
+
+    def get_positions(self):
+        if self._positions is None:
+            self._positions = {int(pid): pos for pos, pid in enumerate(self.get_ids())}
+        return self._positions
+
+    def positions_of(self, passenger_ids):
+        "row positions of the given ids, ids not stored are skipped"
+        passenger_ids = np.asarray(passenger_ids, dtype=np.int64)
+        if self.size == 0:
+            return np.empty(0, dtype=np.int64)
+        if self.ids_sorted:
+            ids = self.get_ids()
+            positions = np.minimum(np.searchsorted(ids, passenger_ids), self.size - 1)
+            return positions[ids[positions] == passenger_ids]
+        positions = self.get_positions()
+        return np.array(
+            [positions[pid] for pid in passenger_ids.tolist() if pid in positions],
+            dtype=np.int64
+        )
+
+    def contains(self, passenger_id):
+        return self.positions_of([passenger_id]).size > 0
+
+    def get(self, passenger_id, col):
+        positions = self.positions_of([passenger_id])
+        if positions.size == 0:
+            raise KeyError(passenger_id)
+        return self.columns[col][positions[0]]
+
+    def set(self, selection, col, value):
+        "sets a column for rows selected by a boolean mask or row positions"
+        self.column(col)[selection] = value
+        self.touch()
+
+    def set_by_ids(self, passenger_ids, col, value):
+        self.set(self.positions_of(passenger_ids), col, value)
+
+    def remove(self, passenger_ids):
+        keep = ~np.isin(self.get_ids(), np.asarray(passenger_ids, dtype=np.int64))
+        kept = int(keep.sum())
+        if kept == self.size:
+            return
+        self.ids[:kept] = self.get_ids()[keep]
+        for col, dtype in self.schema.items():
+            column = self.columns[col]
+            column[:kept] = column[:self.size][keep]
+            column[kept:self.size] = PassengerStore.empty_column(dtype, self.size - kept)
+        self.size = kept
+        self._positions = None
+        self.touch()
+
+    def clear(self):
+        self.remove(self.get_ids())
+
+    def to_df(self) -> pd.DataFrame:
+        data = {}
+        for col, dtype in self.schema.items():
+            values = self.column(col).copy()
+            if dtype == 'Float64':
+                data[col] = pd.array(values, dtype='Float64')
+            elif dtype is str:
+                # same rendering as astype(str), e.g. multi lift assignments
+                data[col] = pd.Series(values, dtype=object).astype(str).to_numpy(dtype=object)
+            else:
+                data[col] = values
+        return pd.DataFrame(data, index=pd.Index(self.get_ids().copy()), columns=list(self.schema))
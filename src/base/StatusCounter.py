@@ -0,0 +1,55 @@
+import pandas as pd
+
+from src.base.LiftAssignment import LiftAssignment
+
+
+class StatusCounter:
+    """
+    live passenger counts by status, kept current at each status transition
+    onboard passengers are also counted per lift
+    """
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self):
+        self.waiting = 0
+        self.arrived = 0
+        self.onboard = {}
+
+    def add(self, statuses, masks):
+        for status, mask in zip(statuses.tolist(), masks.tolist()):
+            if status == 'Waiting':
+                self.waiting += 1
+            elif status == 'Arrived':
+                self.arrived += 1
+            elif status == 'Onboard':
+                self._add_onboard(mask, 1)
+
+    def _add_onboard(self, mask, n):
+        lift_name = LiftAssignment.value_from_mask(mask)
+        self.onboard[lift_name] = self.onboard.get(lift_name, 0) + n
+
+    def board(self, masks):
+        "waiting passengers boarded the lifts of their masks"
+        self.waiting -= len(masks)
+        for mask in masks.tolist():
+            self._add_onboard(mask, 1)
+
+    def arrive(self, masks):
+        "onboard passengers reached their destination"
+        self.arrived += len(masks)
+        for mask in masks.tolist():
+            self._add_onboard(mask, -1)
+
+    def count_onboard(self, lift_name=None) -> int:
+        if lift_name is None:
+            return sum(self.onboard.values())
+        return self.onboard.get(lift_name, 0)
+
+    def summary(self) -> pd.Series:
+        "counts by status and lift"
+        counts = {('Arrived', ''): self.arrived}
+        counts |= {('Onboard', lift_name): n for lift_name, n in sorted(self.onboard.items()) if n > 0}
+        counts |= {('Waiting', ''): self.waiting}
+        return pd.Series(counts, name='count').rename_axis(['status', 'lift'])
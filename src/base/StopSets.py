@@ -0,0 +1,67 @@
+import numpy as np
+
+from src.base.LiftAssignment import LiftAssignment
+
+
+class StopSets:
+    """
+    floors each lift is committed to stop at, with the number of passengers needing each stop
+    a passenger assigned to one lift alone needs its source while waiting and its target until it arrives
+    kept current at each assignment and status transition, so a lookup is O(1)
+    """
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self):
+        self.stops = {}
+
+    def _change(self, lift_name, floor, n):
+        counts = self.stops.setdefault(lift_name, {})
+        count = counts.get(floor, 0) + n
+        if count > 0:
+            counts[floor] = count
+        else:
+            counts.pop(floor, None)
+
+    @classmethod
+    def sole_lift(cls, mask):
+        "name of the lift a mask assigns to alone, None for no lift or several"
+        if mask == 0 or mask & (mask - 1) != 0:
+            return None
+        return LiftAssignment.lift_names[mask.bit_length() - 1]
+
+    def change(self, masks, statuses, sources, targets, n):
+        "adds, with n = 1, or removes, with n = -1, the stops of passengers"
+        for mask, status, source, target in zip(masks.tolist(), statuses.tolist(), sources.tolist(), targets.tolist()):
+            lift_name = StopSets.sole_lift(mask)
+            if lift_name is None or status == 'Arrived':
+                continue
+            if status == 'Waiting':
+                self._change(lift_name, source, n)
+            self._change(lift_name, target, n)
+
+    def remove_floors(self, masks, floors):
+        "drops one stop per passenger at floors, sources on boarding and targets on arrival"
+        for mask, floor in zip(masks.tolist(), floors.tolist()):
+            lift_name = StopSets.sole_lift(mask)
+            if lift_name is not None:
+                self._change(lift_name, floor, -1)
+
+    def get(self, lift_name) -> dict:
+        return self.stops.get(lift_name, {})
+
+    def count(self, lift_name) -> int:
+        return len(self.get(lift_name))
+
+    def new_stops(self, lift_name, floors) -> int:
+        "how many of floors the lift is not committed to yet"
+        stops = self.get(lift_name)
+        return len(set(floors) - stops.keys())
+
+    def committed(self, lift_names, floor_index) -> np.ndarray:
+        "lifts by floors, whether each lift is committed to stop at each floor, floors by their floor_index ordinal"
+        committed = np.zeros((len(lift_names), len(floor_index)), dtype=bool)
+        for i, lift_name in enumerate(lift_names):
+            committed[i, [floor_index[floor] for floor in self.get(lift_name)]] = True
+        return committed
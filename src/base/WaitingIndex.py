@@ -0,0 +1,35 @@
+from itertools import islice
+
+
+class WaitingIndex:
+    """
+    ids of waiting passengers keyed by floor and direction
+    each queue keeps arrival order and drops boarded ids in O(1)
+    """
+
+    def __init__(self) -> None:
+        self.queues = {}
+
+    def add(self, floorname, direction, passenger_id):
+        self.queues.setdefault((floorname, direction), {})[passenger_id] = None
+
+    def remove(self, floorname, direction, passenger_id):
+        queue = self.queues.get((floorname, direction))
+        if queue is not None:
+            queue.pop(passenger_id, None)
+
+    def count(self, floorname, direction):
+        return len(self.queues.get((floorname, direction), ()))
+
+    def get_ids(self, floorname, direction, n=None):
+        "ids in arrival order, only the first n if given"
+        queue = self.queues.get((floorname, direction), {})
+        if n is None:
+            return list(queue)
+        return list(islice(queue, n))
+
+    def rebuild(self, floornames, directions, statuses, passenger_ids):
+        self.queues = {}
+        for floorname, direction, status, passenger_id in zip(floornames, directions, statuses, passenger_ids):
+            if status == 'Waiting':
+                self.add(floorname, direction, passenger_id)
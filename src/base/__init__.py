@@ -1,5 +1,10 @@
 import src.base.Passenger
 import src.base.Floor
+import src.base.PassengerStore
+import src.base.WaitingIndex
+import src.base.LiftAssignment
+import src.base.StatusCounter
+import src.base.LiftFleet
 import src.base.PassengerList
 import src.base.FloorList
 import src.base.Lift
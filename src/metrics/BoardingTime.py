@@ -1,3 +1,5 @@
+import numpy as np
+
 from src.base.Lift import Lift
 
 
@@ -15,3 +17,16 @@ def boarding_time(lift: Lift, pre_board_cnt, boarding_off_cnt, boarding_on_cnt)
 
     return (off_board_uncongested + on_board_uncongested) * 0.5 \
         + (off_board_congested + on_board_congested) * 1.5
+
+def boarding_times(capacity, pre_board_cnt, boarding_off_cnt, boarding_on_cnt) -> np.ndarray:
+    "boarding_time over arrays of lift capacities and passenger counts"
+    semi_cnt = pre_board_cnt - boarding_off_cnt
+    after_board_cnt = np.minimum(pre_board_cnt - boarding_off_cnt + boarding_on_cnt, capacity)
+
+    off_board_congested = np.minimum(np.maximum(pre_board_cnt - 0.5 * capacity, 0.0), pre_board_cnt - semi_cnt)
+    off_board_uncongested = np.minimum(np.maximum(capacity * 0.5 - semi_cnt, 0.0), pre_board_cnt - semi_cnt)
+    on_board_uncongested = np.minimum(np.maximum(capacity * 0.5 - semi_cnt, 0.0), after_board_cnt - semi_cnt)
+    on_board_congested = np.minimum(np.maximum(after_board_cnt - 0.5 * capacity, 0.0), after_board_cnt - semi_cnt)
+
+    return (off_board_uncongested + on_board_uncongested) * 0.5 \
+        + (off_board_congested + on_board_congested) * 1.5
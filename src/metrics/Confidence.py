@@ -0,0 +1,58 @@
+from statistics import NormalDist
+import numpy as np
+
+try:
+    from scipy.stats import t as student_t
+except ImportError:
+    student_t = None
+
+# exact Student t quantiles of df 1 to 29 at the usual one-sided probabilities
+T_TABLE = {
+    0.95: (
+        6.3138, 2.9200, 2.3534, 2.1318, 2.0150, 1.9432, 1.8946, 1.8595, 1.8331, 1.8125,
+        1.7959, 1.7823, 1.7709, 1.7613, 1.7531, 1.7459, 1.7396, 1.7341, 1.7291, 1.7247,
+        1.7207, 1.7171, 1.7139, 1.7109, 1.7081, 1.7056, 1.7033, 1.7011, 1.6991,
+    ),
+    0.975: (
+        12.7062, 4.3027, 3.1824, 2.7764, 2.5706, 2.4469, 2.3646, 2.3060, 2.2622, 2.2281,
+        2.2010, 2.1788, 2.1604, 2.1448, 2.1314, 2.1199, 2.1098, 2.1009, 2.0930, 2.0860,
+        2.0796, 2.0739, 2.0687, 2.0639, 2.0595, 2.0555, 2.0518, 2.0484, 2.0452,
+    ),
+    0.995: (
+        63.6567, 9.9248, 5.8409, 4.6041, 4.0321, 3.7074, 3.4995, 3.3554, 3.2498, 3.1693,
+        3.1058, 3.0545, 3.0123, 2.9768, 2.9467, 2.9208, 2.8982, 2.8784, 2.8609, 2.8453,
+        2.8314, 2.8188, 2.8073, 2.7969, 2.7874, 2.7787, 2.7707, 2.7633, 2.7564,
+    ),
+}
+
+
+def t_quantile(p, df):
+    """
+    Student t quantile, exact from T_TABLE or scipy when installed
+    otherwise from the Cornish-Fisher expansion of the normal quantile, close for df >= 30
+    """
+    if df < 30 and p in T_TABLE and df == int(df):
+        return T_TABLE[p][int(df) - 1]
+    if student_t is not None:
+        return float(student_t.ppf(p, df))
+    z = NormalDist().inv_cdf(p)
+    return (
+        z
+        + (z**3 + z) / (4 * df)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * df**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / (92160 * df**4)
+    )
+
+def confidence_interval(values, level=0.95):
+    "mean and half-width of the t confidence interval of the mean, nan half-width under 2 values"
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    n = values.size
+    if n == 0:
+        return np.nan, np.nan
+    mean = values.mean()
+    if n < 2:
+        return mean, np.nan
+    half_width = t_quantile(0.5 + level / 2, n - 1) * values.std(ddof=1) / np.sqrt(n)
+    return mean, half_width
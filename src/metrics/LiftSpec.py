@@ -1,7 +1,14 @@
 from math import sqrt
+import numpy as np
 
 
 class LiftSpec:
+    """
+    lift movement model
+    per floor list it caches the matrix of stop-to-stop travel times
+    and the move trajectories of floor pairs, shared by all lifts using the spec
+    """
+    _shared = {}
     
     def __init__(self, a: float = 1.0, max_v: float = 4.0,
                  overhead: float = 2.0, model: str = "accel") -> None:
@@ -9,6 +16,8 @@ class LiftSpec:
         self.max_v = max_v
         self.overhead = overhead
         self.model_type = model
+        self._travel_time_matrices = {}
+        self._move_trajectories = {}
         if model == "accel":
             self.calc_time = \
             lambda dist: LiftSpec.accel_model_time(
@@ -26,6 +35,15 @@ class LiftSpec:
         elif self.model_type == "unif":
             return f"model: {self.model_type}, max_v: {self.max_v}, overhead: {self.overhead}"
 
+    @classmethod
+    def shared(cls, a: float = 1.0, max_v: float = 4.0,
+               overhead: float = 2.0, model: str = "accel"):
+        "one spec instance per parameter set, so lifts with equal specs share cached tables"
+        key = (a, max_v, overhead, model)
+        if key not in cls._shared:
+            cls._shared[key] = cls(a=a, max_v=max_v, overhead=overhead, model=model)
+        return cls._shared[key]
+
     @classmethod
     def accel_model_time(cls, a, max_v, dist: float) -> float:
         accel_dist = max_v ** 2 / a
@@ -46,3 +64,42 @@ class LiftSpec:
     
     def get_time_to_max(self):
         return self.max_v / self.a
+
+    def calc_times(self, dists: np.ndarray) -> np.ndarray:
+        "calc_time over an array of distances"
+        if self.model_type == "accel":
+            accel_dist = self.max_v ** 2 / self.a
+            return np.where(
+                dists < accel_dist,
+                2 * np.sqrt(dists / self.a),
+                2 * self.max_v / self.a + (dists - accel_dist) / self.max_v
+            )
+        elif self.model_type == "unif":
+            return self.overhead + dists / self.max_v
+
+    def travel_time_matrix(self, floor_list) -> np.ndarray:
+        "times between stops at each pair of floors, indexed by floor_list.floor_index"
+        key = (id(floor_list), floor_list.version)
+        cached = self._travel_time_matrices.get(key)
+        if cached is None:
+            heights = floor_list.heights
+            cached = self.calc_times(np.abs(heights[:, None] - heights[None, :]))
+            self._travel_time_matrices[key] = cached
+        return cached
+
+    def floor_travel_time(self, floor_list, source, target) -> float:
+        "time between stops at the source and target floor names"
+        return float(self.travel_time_matrix(floor_list)[
+            floor_list.floor_index[source], floor_list.floor_index[target]
+        ])
+
+    def move_trajectory(self, floor_list, source, target):
+        "cached Trajectory of a move between stops at the source and target floor names"
+        key = (id(floor_list), floor_list.version, source, target)
+        if key not in self._move_trajectories:
+            from src.metrics.Trajectory import Trajectory
+
+            self._move_trajectories[key] = Trajectory.from_move(
+                floor_list.get_floor(source).height, floor_list.get_floor(target).height, self
+            )
+        return self._move_trajectories[key]
@@ -0,0 +1,63 @@
+from math import inf
+import numpy as np
+
+
+def min_cost_assignment(cost) -> tuple:
+    """
+    rows and columns of a minimum cost matching of a rectangular cost matrix,
+    matching every row when there are no more rows than columns and every column otherwise
+    inf marks a forbidden pair, forbidden pairs are left out of the result
+    shortest augmenting path Hungarian method, O(n^2 m) with the inner scans in numpy
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    transposed = cost.shape[0] > cost.shape[1]
+    matrix = cost.T if transposed else cost
+    forbidden = ~np.isfinite(matrix)
+    if forbidden.any():
+        # dearer than any matching of allowed pairs, so forbidden pairs are only taken when unavoidable
+        allowed = matrix[~forbidden]
+        big = (np.abs(allowed).max() + 1) * (min(matrix.shape) + 1) if allowed.size > 0 else 1.0
+        matrix = np.where(forbidden, big, matrix)
+    n, m = matrix.shape
+
+    # potentials and matching over 1-based rows and columns, column 0 is the virtual start
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        row_of[0] = i
+        j0 = 0
+        minv = np.full(m + 1, inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            free = ~used[1:]
+            reduced = matrix[i0 - 1] - u[i0] - v[1:]
+            improved = free & (reduced < minv[1:])
+            minv[1:][improved] = reduced[improved]
+            way[1:][improved] = j0
+            candidates = np.where(free, minv[1:], inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[row_of[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+        while j0 != 0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(row_of[1:])
+    rows = row_of[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    keep = np.isfinite(cost[rows, cols])
+    order = np.argsort(rows[keep], kind='stable')
+    return rows[keep][order], cols[keep][order]
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from src.base.PassengerList import PASSENGERS
@@ -11,49 +12,63 @@ def lift_summary():
         columns=['lift', 'floor', 'source', 'target', 'dir']
     )
 
-def calc_density(df, floorname, direction):
-    if direction == 'U':
-        return ((df.target > floorname) & (df.current <= floorname)).sum()
-    if direction == 'D':
-        return ((df.target < floorname) & (df.current >= floorname)).sum()
-
-
-def calc_density_by_group(df, floorname, direction, group):
-    if direction == 'U':
-        return ((df.target > floorname) & (df.current <= floorname) & (df.group == group)).sum()
-    if direction == 'D':
-        return ((df.target < floorname) & (df.current >= floorname) & (df.group == group)).sum()
-
-
-def calc_density_hist(df, floorname, floorheight, direction):
-    if direction == 'U':
-        return [floorheight] * ((df.target > floorname) & (df.current <= floorname)).sum()
-    if direction == 'D':
-        return [floorheight] * ((df.target < floorname) & (df.current >= floorname)).sum()
-
-
 def floor_request_snapshot(floor_list):
+    "waiting counts of every floor, from a single scan of each floor's direction column"
+    rows = []
+    for floorname, floor in floor_list.floors:
+        dirs = floor.passengers.store.column('dir')
+        rows += [[
+            floorname,
+            floor.height,
+            dirs.size,
+            int(np.count_nonzero(dirs == 'U')),
+            int(np.count_nonzero(dirs == 'D'))
+        ]]
     return pd.DataFrame(
-        [
-            [
-                floorname,
-                floor.height,
-                floor.get_floor_count(),
-                floor.get_floor_passenger_count_with_dir('U'),
-                floor.get_floor_passenger_count_with_dir('D')
-            ] for floorname, floor in floor_list.floors
-        ],
+        rows,
         columns = ['floor', 'height', 'total_waiting', 'upward_waiting', 'downward_waiting']
     )
 
+def direction_densities(current, target, groups, num_floors, num_groups):
+    """
+    passengers heading up and down across each floor ordinal, as (groups, floors) arrays
+    upward passengers cover floors current to target - 1, downward passengers target + 1 to current
+    counts are cumulative sums of +1 and -1 marks at the ends of each covered range
+    """
+    width = num_floors + 1
+    size = num_groups * width
+    up = target > current
+    down = target < current
+    up_marks = np.bincount(groups[up] * width + current[up], minlength=size) \
+        - np.bincount(groups[up] * width + target[up], minlength=size)
+    down_marks = np.bincount(groups[down] * width + target[down] + 1, minlength=size) \
+        - np.bincount(groups[down] * width + current[down] + 1, minlength=size)
+    density_up = np.cumsum(up_marks.reshape(num_groups, width), axis=1)[:, :num_floors]
+    density_down = np.cumsum(down_marks.reshape(num_groups, width), axis=1)[:, :num_floors]
+    return density_up, density_down
+
 def density_summary(floor_summary_df, passenger_df):
-    df = floor_summary_df.loc[:, ['floor', 'height']]
-    # df.columns = pd.MultiIndex.from_product([['floor'], ['floor', 'height', 'total_waiting', 'upward_waiting', 'downward_waiting']])
-    passenger_df['group'] = PASSENGERS.boarded_lift_info()
-    passenger_group_df = pd.Series([l.name for l in PASSENGERS.tracking_lifts] + ['Waiting'], name='lift')
-    df = df.merge(passenger_group_df, how='cross')
-    df['density_up'] = df \
-        .apply(lambda x: calc_density_by_group(passenger_df, x.floor, 'U', x.lift), axis=1)
-    df['density_down'] = df \
-        .apply(lambda x: calc_density_by_group(passenger_df, x.floor, 'D', x.lift), axis=1)
-    return pd.pivot_table(df, values=['density_up', 'density_down'], index=['floor', 'height'], columns=['lift'])
+    """
+    traveling passengers heading up and down across each floor, by the lift they are on or waiting
+    floors of floor_summary_df are taken in order as floor ordinals
+    """
+    floors = floor_summary_df.floor.to_numpy()
+    group_names = [l.name for l in PASSENGERS.tracking_lifts] + ['Waiting']
+    status = passenger_df.status.to_numpy()
+    traveling = status != 'Arrived'
+    groups = pd.Categorical(
+        np.where(status[traveling] == 'Waiting', 'Waiting', passenger_df.lift.to_numpy()[traveling]),
+        categories=group_names
+    ).codes.astype(np.int64)
+    current = pd.Categorical(passenger_df.current.to_numpy()[traveling], categories=floors).codes.astype(np.int64)
+    target = pd.Categorical(passenger_df.target.to_numpy()[traveling], categories=floors).codes.astype(np.int64)
+    known = (groups >= 0) & (current >= 0) & (target >= 0)
+    density_up, density_down = direction_densities(
+        current[known], target[known], groups[known], floors.size, len(group_names)
+    )
+    df = pd.DataFrame(
+        np.hstack([density_down.T, density_up.T]).astype(np.float64),
+        index=pd.MultiIndex.from_arrays([floors, floor_summary_df.height.to_numpy()], names=['floor', 'height']),
+        columns=pd.MultiIndex.from_product([['density_down', 'density_up'], group_names], names=[None, 'lift'])
+    )
+    return df.sort_index().sort_index(axis=1)
@@ -1,4 +1,5 @@
 from datetime import timedelta
+import numpy as np
 
 from src.base.PassengerList import PassengerList
 
@@ -24,6 +25,10 @@ def calculate_time_on_lift(passengers):
         .apply(timedelta.total_seconds)
     return PassengerList(df)
 
+def elapsed_seconds(end, start):
+    "seconds from start to end for numpy datetimes, nan where either is missing"
+    return (end - start) / np.timedelta64(1, 's')
+
 def calculate_all_metrics(passengers):
     df = passengers.df
     boarded_idx = (df.board_time.notna()) & (df.trip_start_time.notna())
@@ -36,3 +41,33 @@ def calculate_all_metrics(passengers):
     df.loc[arrived_idx, 'time_on_lift'] = (df.loc[arrived_idx, 'dest_arrival_time'] - df.loc[arrived_idx, 'board_time'])\
         .dt.total_seconds()
     return PassengerList(df)
+
+def trip_time_stats(df, quantile=0.95) -> dict:
+    "mean and upper quantile of waiting and travel time over passengers that have them"
+    stats = {}
+    for col in ['waiting_time', 'travel_time']:
+        values = df[col].dropna().astype(float)
+        stats[f'{col}_mean'] = values.mean()
+        stats[f'{col}_p{round(quantile * 100)}'] = values.quantile(quantile)
+    return stats
+
+# seconds of travel after which each further second is penalized
+PENALTY_THRESHOLD = 90.0
+PENALTY_WEIGHT = 1.0
+
+def trip_cost(df, end_time=None, threshold=PENALTY_THRESHOLD, penalty=PENALTY_WEIGHT) -> float:
+    """
+    mean cost per passenger of the optimization objective, seconds from arriving for a lift
+    to reaching the destination plus penalty times the seconds beyond threshold
+    given end_time, passengers still waiting or on board count the time they have spent so far,
+    so a policy cannot lower the cost by leaving passengers behind
+    """
+    start = df['trip_start_time'].to_numpy(dtype='datetime64[ns]')
+    end = df['dest_arrival_time'].to_numpy(dtype='datetime64[ns]')
+    if end_time is not None:
+        end = np.where(np.isnat(end), np.datetime64(end_time, 'ns'), end)
+    seconds = elapsed_seconds(end, start)
+    seconds = seconds[~np.isnan(seconds)]
+    if seconds.size == 0:
+        return np.nan
+    return float(np.mean(seconds + penalty * np.maximum(seconds - threshold, 0.0)))
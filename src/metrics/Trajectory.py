@@ -0,0 +1,210 @@
+from math import sqrt, inf
+from bisect import bisect_right
+
+from src.metrics.LiftSpec import LiftSpec
+
+
+class Trajectory:
+    """
+    committed motion of a lift as piecewise polynomial segments
+    segment i starts at times[i] seconds after the move starts, with signed
+    velocity velocities[i] and signed constant acceleration accels[i]
+    the last segment is the lift at rest on its target
+    """
+    # heights within this many metres count as equal, segment boundaries carry rounding
+    HEIGHT_TOL = 1e-9
+
+    def __init__(self, spec: LiftSpec) -> None:
+        self.spec = spec
+        self.times = []
+        self.heights = []
+        self.velocities = []
+        self.accels = []
+        self.dirs = []
+        self._deadlines = {}
+
+    def __str__(self):
+        return f"{self.spec.__str__()}, segments: {len(self.times)}, arrival: {self.arrival_time()}"
+
+    def add_segment(self, duration, velocity, accel, dir):
+        "ends the last segment after duration seconds and starts a new one from its end state"
+        if not self.times:
+            raise ValueError('a trajectory starts with start_at')
+        t, h, v, acc = self.times[-1], self.heights[-1], self.velocities[-1], self.accels[-1]
+        self.times += [t + duration]
+        self.heights += [self.height_after(h, v, acc, duration)]
+        self.velocities += [velocity]
+        self.accels += [accel]
+        self.dirs += [dir]
+        return self
+
+    def start_at(self, height, velocity, accel, dir):
+        self.times = [0.0]
+        self.heights = [height]
+        self.velocities = [velocity]
+        self.accels = [accel]
+        self.dirs = [dir]
+        return self
+
+    @classmethod
+    def height_after(cls, h, v, acc, dt):
+        return h + dt * (v + acc * dt / 2)
+
+    @classmethod
+    def sign(cls, dir):
+        return 1 if dir == 'U' else -1
+
+    @classmethod
+    def from_move(cls, source_height, target_height, spec: LiftSpec, start=None, dir=None):
+        """
+        move from rest at source_height to rest at target_height
+        start continues an existing trajectory, dir overrides the direction kept at rest
+        """
+        trajectory = start if start is not None else cls(spec)
+        move_dir = 'U' if target_height > source_height else 'D'
+        s = cls.sign(move_dir)
+        dist = abs(target_height - source_height)
+        if start is None:
+            trajectory.start_at(source_height, 0.0, 0.0, move_dir)
+        if spec.model_type == 'accel':
+            a, max_v = spec.a, spec.max_v
+            if dist >= spec.get_accel_dist():
+                time_to_max = spec.get_time_to_max()
+                time_at_max = (dist - spec.get_accel_dist()) / max_v
+                trajectory.add_segment(0.0, 0.0, s * a, move_dir)
+                trajectory.add_segment(time_to_max, s * max_v, 0.0, move_dir)
+                trajectory.add_segment(time_at_max, s * max_v, -s * a, move_dir)
+                trajectory.add_segment(time_to_max, 0.0, 0.0, dir or move_dir)
+            else:
+                time_to_half = sqrt(dist / a)
+                trajectory.add_segment(0.0, 0.0, s * a, move_dir)
+                trajectory.add_segment(time_to_half, s * a * time_to_half, -s * a, move_dir)
+                trajectory.add_segment(time_to_half, 0.0, 0.0, dir or move_dir)
+        elif spec.model_type == 'unif':
+            # the overhead is split between starting and stopping
+            trajectory.add_segment(spec.overhead / 2, s * spec.max_v, 0.0, move_dir)
+            trajectory.add_segment(dist / spec.max_v, 0.0, 0.0, move_dir)
+            trajectory.add_segment(spec.overhead / 2, 0.0, 0.0, dir or move_dir)
+        # rest exactly on the target
+        trajectory.heights[-1] = target_height
+        return trajectory
+
+    @classmethod
+    def from_status(cls, height, direction, velocity, new_height, spec: LiftSpec):
+        """
+        redirect of a lift at height moving in direction with speed velocity to rest at new_height
+        a lift that cannot stop in time brakes and turns back
+        a uniform model lift keeps its speed to a target ahead, and otherwise stops at once and starts a new move
+        """
+        assert direction in ['U', 'D']
+        trajectory = cls(spec)
+        s = cls.sign(direction)
+        if spec.model_type == 'unif':
+            if velocity > 0 and s * (new_height - height) >= 0:
+                trajectory.start_at(height, s * velocity, 0.0, direction)
+                trajectory.add_segment(abs(new_height - height) / velocity, 0.0, 0.0, direction)
+                trajectory.add_segment(spec.overhead / 2, 0.0, 0.0, direction)
+                trajectory.heights[-1] = new_height
+                return trajectory
+            return cls.from_move(height, new_height, spec, dir=direction)
+        a, max_v = spec.a, spec.max_v
+        trajectory.start_at(height, s * velocity, 0.0, direction)
+        stop_height = height + s * velocity ** 2 / a / 2
+        if s * stop_height <= s * new_height:
+            time_to_max = (max_v - velocity) / a
+            dist_to_max = time_to_max * (velocity + max_v) / 2
+            dist = abs(new_height - height)
+            if dist > spec.get_accel_dist() / 2 + dist_to_max:
+                max_speed_time = (dist - spec.get_accel_dist() / 2 - dist_to_max) / max_v
+                trajectory.add_segment(0.0, s * velocity, s * a, direction)
+                trajectory.add_segment(time_to_max, s * max_v, 0.0, direction)
+                trajectory.add_segment(max_speed_time, s * max_v, -s * a, direction)
+                trajectory.add_segment(spec.get_time_to_max(), 0.0, 0.0, direction)
+            else:
+                discriminant = velocity ** 2 / 2 + a * dist
+                accel_time = (sqrt(discriminant) - velocity) / a
+                velocity_to_reach = velocity + a * accel_time
+                trajectory.add_segment(0.0, s * velocity, s * a, direction)
+                trajectory.add_segment(accel_time, s * velocity_to_reach, -s * a, direction)
+                trajectory.add_segment(velocity_to_reach / a, 0.0, 0.0, direction)
+            trajectory.heights[-1] = new_height
+            return trajectory
+        trajectory.add_segment(0.0, s * velocity, -s * a, direction)
+        trajectory.add_segment(velocity / a, 0.0, 0.0, direction)
+        trajectory.heights[-1] = stop_height
+        return cls.from_move(stop_height, new_height, spec, start=trajectory, dir=direction)
+
+    def arrival_time(self):
+        "seconds until the lift rests on its target"
+        return self.times[-1]
+
+    def segment_at(self, time_elapsed):
+        return max(bisect_right(self.times, time_elapsed) - 1, 0)
+
+    def state_at(self, time_elapsed):
+        "height, direction and speed of the lift time_elapsed seconds into the move"
+        time_elapsed = max(time_elapsed, 0.0)
+        i = self.segment_at(time_elapsed)
+        dt = time_elapsed - self.times[i]
+        v = self.velocities[i] + self.accels[i] * dt
+        return self.height_after(self.heights[i], self.velocities[i], self.accels[i], dt), self.dirs[i], abs(v)
+
+    def stop_excess(self, i, new_height, dt):
+        "how far past new_height the lift comes to rest when braking dt seconds into segment i"
+        s = Trajectory.sign(self.dirs[i])
+        h = self.height_after(self.heights[i], self.velocities[i], self.accels[i], dt)
+        v = self.velocities[i] + self.accels[i] * dt
+        return s * (h - new_height) + self.braking_dist(v)
+
+    def braking_dist(self, velocity):
+        "a uniform model lift stops at once"
+        return velocity ** 2 / self.spec.a / 2 if self.spec.model_type == 'accel' else 0.0
+
+    def is_monotone(self):
+        "no turning back, so once a floor cannot be stopped at it stays so"
+        return len(set(self.dirs)) == 1
+
+    def stop_deadline(self, new_height):
+        """
+        last time into the move at which braking still stops the lift at or before new_height
+        -inf when it never can, inf when it always can
+        """
+        key = float(new_height)
+        if key not in self._deadlines:
+            self._deadlines[key] = self.calc_stop_deadline(key)
+        return self._deadlines[key]
+
+    def calc_stop_deadline(self, new_height):
+        # braking distance only grows along a monotone trajectory, so the first segment
+        # that overshoots new_height holds the deadline
+        a = self.spec.a
+        for i in range(len(self.times)):
+            if self.stop_excess(i, new_height, 0.0) > Trajectory.HEIGHT_TOL:
+                return -inf if i == 0 else self.times[i]
+            if i == len(self.times) - 1:
+                return inf
+            duration = self.times[i + 1] - self.times[i]
+            if self.stop_excess(i, new_height, duration) <= Trajectory.HEIGHT_TOL:
+                continue
+            # stop_excess is quadratic in dt within a segment
+            s = Trajectory.sign(self.dirs[i])
+            u, alpha = s * self.velocities[i], s * self.accels[i]
+            c0 = self.stop_excess(i, new_height, 0.0) - Trajectory.HEIGHT_TOL
+            c1 = u * (1 + alpha / a)
+            c2 = alpha * (1 + alpha / a) / 2
+            if c2 == 0 and c1 == 0:
+                # braking at full deceleration keeps the stop height, any overshoot is rounding
+                continue
+            if c2 == 0:
+                root = -c0 / c1
+            else:
+                root = (-c1 + sqrt(max(c1 ** 2 - 4 * c2 * c0, 0.0))) / (2 * c2)
+            return self.times[i] + min(max(root, 0.0), duration)
+        return inf
+
+    def can_stop_at(self, time_elapsed, new_height):
+        "whether braking time_elapsed seconds into the move stops the lift at or before new_height"
+        if self.is_monotone():
+            return time_elapsed <= self.stop_deadline(new_height)
+        h, d, v = self.state_at(time_elapsed)
+        return Trajectory.sign(d) * (h - new_height) + self.braking_dist(v) <= Trajectory.HEIGHT_TOL
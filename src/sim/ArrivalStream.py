@@ -0,0 +1,59 @@
+import asyncio
+import numpy as np
+
+from src.utils.Clock import CLOCK
+
+
+class ArrivalSource:
+    "yields (offset, trip) arrivals from arrivals(), trips are (source, target, dir)"
+
+    def arrivals(self):
+        raise NotImplementedError
+
+    async def run(self, on_arrival, recorder=None):
+        """
+        awaits on_arrival(source, target, start_time) at each arrival
+        sleeps to absolute arrival times so slow callbacks do not shift later arrivals
+        recorder, such as a TraceRecorder, gets every arrival as it happens
+        """
+        loop = asyncio.get_running_loop()
+        loop_start = loop.time()
+        for arrival_offset, trip in self.arrivals():
+            delay = loop_start + arrival_offset - loop.time()
+            await asyncio.sleep(max(delay, 0))
+            if recorder is not None:
+                recorder.record(arrival_offset, trip[0], trip[1])
+            await on_arrival(trip[0], trip[1], CLOCK.now())
+
+
+class ArrivalStream(ArrivalSource):
+    """
+    superposition of independent Poisson trip arrivals as one stream
+    arrivals come at the total rate and each picks its trip with probability
+    proportional to the trip rate, drawn in numpy blocks
+    """
+    BLOCK_SIZE = 1024
+
+    def __init__(self, trip_arrival_rates: dict, block_size=BLOCK_SIZE, seed=None) -> None:
+        self.trips = list(trip_arrival_rates.keys())
+        rates = np.array(list(trip_arrival_rates.values()), dtype=np.float64)
+        self.total_rate = rates.sum()
+        assert self.total_rate > 0
+        self.trip_probs = rates / self.total_rate
+        self.block_size = block_size
+        self.rng = np.random.default_rng(seed)
+
+    def draw_block(self, start_offset=0.0):
+        "arrival offsets in seconds from the stream start and trip indices of the next block"
+        gaps = self.rng.exponential(1 / self.total_rate, self.block_size)
+        trip_idx = self.rng.choice(len(self.trips), size=self.block_size, p=self.trip_probs)
+        return start_offset + np.cumsum(gaps), trip_idx
+
+    def arrivals(self):
+        "yields (offset, trip) pairs without end"
+        offset = 0.0
+        while True:
+            offsets, trip_idx = self.draw_block(offset)
+            for arrival_offset, i in zip(offsets.tolist(), trip_idx.tolist()):
+                yield arrival_offset, self.trips[i]
+            offset = offsets[-1]
@@ -0,0 +1,140 @@
+"""
+Arrival traces in a compact fixed-width binary format
+A trace file is a header naming the floors followed by one 12 byte record per arrival:
+its offset in seconds from the trace start and the ordinals of its source and target floors.
+TraceRecorder writes traces, from a running ArrivalSource or from arrays such as converted
+building logs, and ArrivalTrace replays them memory-mapped, block by block in time order
+"""
+
+import json
+import struct
+import numpy as np
+
+from src.sim.ArrivalStream import ArrivalSource
+
+MAGIC = b'LIFTTRC1'
+RECORD_DTYPE = np.dtype([('offset', '<f8'), ('source', '<u2'), ('target', '<u2')])
+# records start at a multiple of this many bytes
+HEADER_ALIGN = 16
+
+
+def write_header(f, floors):
+    header = json.dumps({'floors': list(floors)}).encode()
+    f.write(MAGIC + struct.pack('<I', len(header)) + header)
+    f.write(b'\0' * (-f.tell() % HEADER_ALIGN))
+
+def read_header(f):
+    "floor names of the trace and the byte offset of its first record"
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError('not an arrival trace file')
+    (length,) = struct.unpack('<I', f.read(4))
+    header = json.loads(f.read(length))
+    end = len(MAGIC) + 4 + length
+    return header['floors'], end + (-end % HEADER_ALIGN)
+
+
+class TraceRecorder:
+    """
+    appends arrivals to a trace file, buffered in blocks of fixed-width records
+    offsets must not decrease, so that the trace replays in time order
+    """
+    BLOCK_SIZE = 4096
+
+    def __init__(self, path, floor_list=None, block_size=BLOCK_SIZE) -> None:
+        from src.base.FloorList import FLOOR_LIST
+
+        self.floor_list = floor_list if floor_list is not None else FLOOR_LIST
+        self.path = path
+        self.file = open(path, 'wb')
+        write_header(self.file, self.floor_list.list_floors())
+        self.buffer = np.empty(block_size, dtype=RECORD_DTYPE)
+        self.buffered = 0
+        self.count = 0
+        self.last_offset = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, offset, source, target):
+        if offset < self.last_offset:
+            raise ValueError('trace offsets must not decrease')
+        self.buffer[self.buffered] = (offset, self.floor_list.get_floor_index(source),
+                                      self.floor_list.get_floor_index(target))
+        self.buffered += 1
+        self.count += 1
+        self.last_offset = offset
+        if self.buffered == self.buffer.size:
+            self.flush()
+
+    def write(self, offsets, sources, targets):
+        "appends many arrivals at once from arrays of offsets in seconds and floor names"
+        offsets = np.asarray(offsets, dtype=np.float64)
+        if offsets.size == 0:
+            return
+        if offsets[0] < self.last_offset or np.any(np.diff(offsets) < 0):
+            raise ValueError('trace offsets must not decrease')
+        records = np.empty(offsets.size, dtype=RECORD_DTYPE)
+        records['offset'] = offsets
+        records['source'] = self.floor_list.ordinals_of(sources)
+        records['target'] = self.floor_list.ordinals_of(targets)
+        self.flush()
+        records.tofile(self.file)
+        self.count += offsets.size
+        self.last_offset = float(offsets[-1])
+
+    def flush(self):
+        self.buffer[:self.buffered].tofile(self.file)
+        self.buffered = 0
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+
+class ArrivalTrace(ArrivalSource):
+    """
+    replays a trace file, memory-mapped so only the block being fed is read into memory
+    every replay of a trace feeds the same passengers at the same times
+    """
+    BLOCK_SIZE = 4096
+
+    def __init__(self, path, block_size=BLOCK_SIZE) -> None:
+        with open(path, 'rb') as f:
+            self.floors, records_offset = read_header(f)
+            f.seek(0, 2)
+            size = f.tell()
+        if size > records_offset:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=records_offset)
+        else:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+        self.block_size = block_size
+        self.trips = {}
+
+    def __len__(self):
+        return self.records.size
+
+    def duration(self):
+        "offset of the last arrival in seconds"
+        return float(self.records['offset'][-1]) if self.records.size > 0 else 0.0
+
+    def get_trip(self, source, target):
+        "(source, target, dir) of floor ordinals, one tuple per trip"
+        key = (source, target)
+        if key not in self.trips:
+            self.trips[key] = (self.floors[source], self.floors[target], 'U' if target > source else 'D')
+        return self.trips[key]
+
+    def arrivals(self):
+        "yields (offset, trip) pairs in trace order"
+        for start in range(0, self.records.size, self.block_size):
+            block = np.array(self.records[start:start + self.block_size])
+            for offset, source, target in zip(
+                block['offset'].tolist(), block['source'].tolist(), block['target'].tolist()
+            ):
+                yield offset, self.get_trip(source, target)
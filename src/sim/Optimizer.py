@@ -0,0 +1,159 @@
+"""
+Successive halving search over dispatch and fleet parameters of the multiple lift simulation
+Every candidate configuration is first evaluated on a short run; each rung keeps the best
+1/eta of the candidates by trip cost and gives the survivors eta times the simulated seconds,
+first as longer runs and then as more replications, so only promising candidates reach
+full length replicated runs. Evaluations run in a process pool and are cached like sweeps
+"""
+
+import os
+import json
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+from src.sim.Sweep import BASE_CONFIG, config_key, run_config
+
+
+class SuccessiveHalving:
+    """
+    space maps configuration keys to lists of values as a ParameterSweep grid does,
+    e.g. {'dispatch': ['baseline', 'matching'], 'onboarding_mode': ['earliest', 'random']}
+    num_candidates configurations are drawn from the space, all of them when it is smaller
+    rung r simulates min_timeout * eta**r seconds per candidate, as one run of that length up to
+    max_timeout and as replications of max_timeout beyond, at most max_replications of them
+    all candidates of a rung see the same seeds, so they are compared on the same arrivals
+    """
+    CACHE_DIR = 'data/optimize'
+    ETA = 3
+    OBJECTIVE = 'trip_cost'
+
+    def __init__(self, space: dict, base_config=None, num_candidates=27, eta=ETA, min_timeout=300,
+                 max_timeout=3600, max_replications=8, objective=OBJECTIVE, cache_dir=CACHE_DIR,
+                 workers=None, seed=0) -> None:
+        assert eta >= 2
+        assert 0 < min_timeout <= max_timeout
+        self.base_config = BASE_CONFIG | (base_config or {})
+        unknown = set(space) - set(self.base_config)
+        if unknown:
+            raise ValueError(f'unknown search parameters {sorted(unknown)}')
+        self.space = space
+        self.num_candidates = num_candidates
+        self.eta = eta
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_replications = max_replications
+        self.objective = objective
+        self.cache_dir = cache_dir
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.seed = seed
+        self.rungs = []
+        self.configs = []
+        self.best = None
+        self.simulated_seconds = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def candidates(self) -> list:
+        "configurations searched, drawn by mixed radix index so large spaces are never enumerated"
+        keys = list(self.space)
+        sizes = [len(self.space[k]) for k in keys]
+        total = math.prod(sizes)
+        if total <= self.num_candidates:
+            indices = range(total)
+        else:
+            indices = sorted(random.Random(self.seed).sample(range(total), self.num_candidates))
+        configs = []
+        for index in indices:
+            values = {}
+            for k, size in zip(reversed(keys), reversed(sizes)):
+                index, i = divmod(index, size)
+                values[k] = self.space[k][i]
+            configs += [self.base_config | values]
+        return configs
+
+    def rung_budget(self, rung) -> tuple:
+        "timeout and replication count of each candidate in a rung"
+        budget = self.min_timeout * self.eta ** rung
+        timeout = min(budget, self.max_timeout)
+        replications = min(math.ceil(budget / timeout), self.max_replications)
+        return timeout, replications
+
+    def cache_path(self, evaluation) -> str:
+        return os.path.join(self.cache_dir, f'{config_key(evaluation)}.json')
+
+    def save_result(self, evaluation, result):
+        # written to a temporary file first, so an interrupted search never leaves a partial entry
+        path = self.cache_path(evaluation)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'config': evaluation, 'result': result}, f)
+        os.replace(path + '.tmp', path)
+
+    def load_result(self, evaluation) -> dict:
+        with open(self.cache_path(evaluation)) as f:
+            return json.load(f)['result']
+
+    def evaluate(self, executor, configs, timeout, replications) -> np.ndarray:
+        "mean objective of each configuration over its replications, inf where it has no value"
+        evaluations = [
+            [config | {'seed': self.seed + i, 'timeout': timeout} for i in range(replications)]
+            for config in configs
+        ]
+        pending = [e for runs in evaluations for e in runs if not os.path.exists(self.cache_path(e))]
+        futures = {executor.submit(run_config, e): e for e in pending}
+        for future in as_completed(futures):
+            self.save_result(futures[future], future.result())
+            self.simulated_seconds += timeout
+        scores = np.array([
+            np.mean([self.load_result(e)[self.objective] for e in runs], dtype=np.float64)
+            for runs in evaluations
+        ])
+        return np.where(np.isnan(scores), np.inf, scores)
+
+    def run(self) -> pd.DataFrame:
+        """
+        runs rungs until one candidate is left or the full budget was spent on the survivors
+        and returns the results of every rung, best holds the best configuration
+        """
+        self.rungs = []
+        self.simulated_seconds = 0
+        self.configs = configs = self.candidates()
+        ids = list(range(len(configs)))
+        rung = 0
+        # a fresh process per run, since the simulation keeps module level state
+        with ProcessPoolExecutor(max_workers=self.workers, max_tasks_per_child=1) as executor:
+            while True:
+                timeout, replications = self.rung_budget(rung)
+                scores = self.evaluate(executor, [configs[i] for i in ids], timeout, replications)
+                order = np.argsort(scores, kind='stable')
+                full_budget = timeout == self.max_timeout and replications == self.max_replications
+                keep = 1 if full_budget else max(1, len(ids) // self.eta)
+                self.rungs += [{
+                    'rung': rung, 'timeout': timeout, 'replications': replications,
+                    'ids': ids, 'scores': scores, 'kept': [ids[i] for i in order[:keep]],
+                }]
+                ids = [ids[i] for i in order[:keep]]
+                if len(ids) == 1:
+                    break
+                rung += 1
+        self.best = configs[ids[0]]
+        return self.results_df()
+
+    def exhaustive_seconds(self) -> int:
+        "simulated seconds of running every candidate at the full budget"
+        return len(self.candidates()) * self.max_timeout * self.max_replications
+
+    def results_df(self) -> pd.DataFrame:
+        "searched parameters, budget and objective of every candidate in every rung"
+        rows = []
+        for rung in self.rungs:
+            kept = set(rung['kept'])
+            for i, score in zip(rung['ids'], rung['scores'].tolist()):
+                config = self.configs[i]
+                params = {k: json.dumps(config[k]) if isinstance(config[k], dict) else config[k] for k in self.space}
+                rows += [{
+                    'rung': rung['rung'], 'candidate': i, **params, 'timeout': rung['timeout'],
+                    'replications': rung['replications'], self.objective: score, 'kept': i in kept,
+                }]
+        return pd.DataFrame(rows)
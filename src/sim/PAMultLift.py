@@ -2,31 +2,39 @@
 Simulation of multiple lifts moving with baseline coordination setting
 In a tower of 20 floors, 5 lifts and 
 passengers arrival rates from a statistical Poisson process
-After running through 1 hour, passenger records are saved to file
+Completed passenger records are streamed to file as the run goes
 """
 
 import asyncio
-from random import expovariate
-from datetime import datetime
 import streamlit as st
+import matplotlib.pyplot as plt
 
 from src.base.FloorList import FLOOR_LIST
 from src.base.Passenger import Passenger
 from src.base.PassengerList import PASSENGERS
-from src.base.Lift import Lift
+from src.base.MatchingDispatcher import MatchingDispatcher
+from src.base.DestinationDispatcher import DestinationDispatcher
+from src.base.Lift import Lift, LIFT_CAPACITY_DEFAULT
+from src.metrics.LiftSpec import LiftSpec
+from src.sim.ArrivalStream import ArrivalStream
+from src.sim.ArrivalTrace import ArrivalTrace, TraceRecorder
 from src.metrics.Summary import floor_request_snapshot, density_summary, lift_summary
 from src.utils.Plotting import plot
-from src.utils.Logging import print_st
+from src.utils.Events import EVENTS, Notice, ConsoleSink, StreamlitSink
+from src.utils.Clock import CLOCK, run_virtual
+from src.utils.RunWriter import RunWriter
 
 TRIPS = [(
     source, target,
-    'U' if target > source else 'D'
+    FLOOR_LIST.get_direction(source, target)
     )
     for source in FLOOR_LIST.list_floors()
     for target in FLOOR_LIST.list_floors()
     if source != target
 ]
 COUNTERS = {t:0 for t in TRIPS}
+# live figure redraws per second
+REDRAW_FPS = 2
 
 # for simulation
 trip_arrival_rates = {}
@@ -34,10 +42,7 @@ for source in FLOOR_LIST.list_floors():
     for target in FLOOR_LIST.list_floors():
         if target == source:
             continue
-        elif target > source:
-            dir = 'U'
-        else:
-            dir = 'D'
+        dir = FLOOR_LIST.get_direction(source, target)
         key = (source, target, dir)
         if (source == '000') | (target == '000'):
             # trip_arrival_rates[key] = 0.00005 # sparse request
@@ -57,83 +62,116 @@ async def passenger_arrival(source_floor, target_floor, start_time):
     new_passenger = Passenger(source_floor, target_floor, start_time)
     await PASSENGERS.passenger_arrival(new_passenger)
 
-# simulates exponential arrival time of passengers
-async def exp_gen(rate=1.0):
-    time_taken = expovariate(rate)
-    await asyncio.sleep(time_taken)
-
-# simulates continuous arrival
-async def cont_exp_gen(trip, rate=1.0):
+# simulates all trips as one merged Poisson arrival stream, or replays a recorded trace
+async def merged_arrivals(seed=None, demand_scale=1.0, trace=None, record_trace=None):
+    "trace is an arrival trace file to replay instead, record_trace a file to record the arrivals to"
+    recorder = TraceRecorder(record_trace) if record_trace is not None else None
     try:
-        source_floor = trip[0]
-        target_floor = trip[1]
-        while True:
-            await exp_gen(rate=rate)
-            await passenger_arrival(source_floor, target_floor, datetime.now())
-            # for debugging
-            # print('passenger arrived from', trip[0], 'moving', trip[2], 'to', trip[1])
-            await asyncio.sleep(0)
+        if trace is not None:
+            source = ArrivalTrace(trace)
+        else:
+            rates = {trip: rate * demand_scale for trip, rate in trip_arrival_rates.items()}
+            source = ArrivalStream(rates, seed=seed)
+        await source.run(passenger_arrival, recorder=recorder)
     except MemoryError:
         print('memory error')
         PASSENGERS.log('memory error')
         return None
+    finally:
+        if recorder is not None:
+            recorder.close()
 
 # simulates run of multiple continuous exponential processes in fixed time
-async def all_arrivals():
-    jobs = [cont_exp_gen(trip=k, rate=v) for k,v in trip_arrival_rates.items()]
-    jobs += [PASSENGERS.reassignment_listener()]
-    start_time = datetime.now()
-    print_st(f'Arrivals start: {start_time}')
+async def all_arrivals(seed=None, demand_scale=1.0, trace=None, record_trace=None):
+    jobs = [merged_arrivals(seed=seed, demand_scale=demand_scale, trace=trace, record_trace=record_trace)]
+    if PASSENGERS.dispatcher is not None:
+        jobs += [PASSENGERS.dispatcher.run()]
+    else:
+        jobs += [PASSENGERS.reassignment_listener()]
+    start_time = CLOCK.now()
+    EVENTS.emit(Notice, f'Arrivals start: {start_time}')
     arrival_timeout = 1680
     try:
         async with asyncio.timeout(arrival_timeout):
             await asyncio.gather(*jobs)
     except asyncio.TimeoutError:
-        print_st('All arrivals completed')
+        EVENTS.emit(Notice, 'All arrivals completed')
         PASSENGERS.log('PASSENGERS ARRIVAL COMPLETE')
     
-async def lift_operation():
-    l1 = Lift('Lift A', 'G', 'U')
-    PASSENGERS.register_lift(l1)
-    l2 = Lift('Lift B', 'G', 'U')
-    PASSENGERS.register_lift(l2)
-    l3 = Lift('Lift C', 'G', 'U')
-    PASSENGERS.register_lift(l3)
-    l4 = Lift('Lift D', 'G', 'U')
-    PASSENGERS.register_lift(l4)
-    l5 = Lift('Lift E', 'G', 'U')
-    PASSENGERS.register_lift(l5)
-    # l6 = Lift('L6', 'G', 'U')
-    # PASSENGERS.register_lift(l6)
-    # l7 = Lift('L7', 'G', 'U')
-    # PASSENGERS.register_lift(l7)
-    # l8 = Lift('L8', 'G', 'U')
-    # PASSENGERS.register_lift(l8)
+async def lift_operation(num_lifts=5, capacity=LIFT_CAPACITY_DEFAULT, lift_spec=None,
+                         assign_multi=True, bypass_prev_assignment=True, onboarding_mode='earliest',
+                         start_floor=None):
+    """
+    lift_spec holds LiftSpec parameters shared by all lifts
+    lifts start at start_floor, the bottom floor by default
+    """
+    if start_floor is None:
+        start_floor = FLOOR_LIST.get_bottom_floor()
+    lifts = []
+    for i in range(num_lifts):
+        lift = Lift(
+            lift_name(i), start_floor, 'U', capacity=capacity,
+            spec=LiftSpec.shared(**lift_spec) if lift_spec is not None else None,
+            assign_multi=assign_multi, bypass_prev_assignment=bypass_prev_assignment,
+            onboarding_mode=onboarding_mode
+        )
+        PASSENGERS.register_lift(lift)
+        lifts += [lift]
 
     # need to let lifts take up only unassigned passengers
-    await asyncio.gather(
-        l1.lift_baseline_operation(),
-        l2.lift_baseline_operation(),
-        l3.lift_baseline_operation(),
-        l4.lift_baseline_operation(),
-        l5.lift_baseline_operation(),
-        # l6.lift_baseline_operation(),
-        # l7.lift_baseline_operation(),
-        # l8.lift_baseline_operation()
-    )
+    await asyncio.gather(*[lift.lift_baseline_operation() for lift in lifts])
+
+def lift_name(i):
+    "Lift A to Lift Z, then Lift AA, Lift AB and so on"
+    letters = ''
+    i += 1
+    while i > 0:
+        i, r = divmod(i - 1, 26)
+        letters = chr(ord('A') + r) + letters
+    return f'Lift {letters}'
+
+def set_dispatch(dispatch='baseline', dispatch_params=None, lift_params=None) -> dict:
+    "sets the dispatcher of PASSENGERS and returns lift_params adjusted to it"
+    lift_params = lift_params or {}
+    if dispatch == 'matching':
+        PASSENGERS.dispatcher = MatchingDispatcher(PASSENGERS, **(dispatch_params or {}))
+    elif dispatch == 'destination':
+        PASSENGERS.dispatcher = DestinationDispatcher(PASSENGERS, **(dispatch_params or {}))
+        # lifts board only the passengers allocated to them
+        lift_params = lift_params | {'assign_multi': False, 'bypass_prev_assignment': False}
+    else:
+        PASSENGERS.dispatcher = None
+    return lift_params
 
-async def visualize_figure(col_figure):
+async def visualize_figure(col_figure, sink, fps=REDRAW_FPS):
+    "redraws at most fps times a second while the sink is dirty, frames missed by slow redraws are counted"
+    loop = asyncio.get_running_loop()
+    frame_time = 1 / fps
     with col_figure:
-        with st.empty():
-            while True:
-                await PASSENGERS.visual_lock.acquire()
-                lift_summary_df = lift_summary()
-                floor_summary_df = floor_request_snapshot(FLOOR_LIST)
-                density_summary_df = density_summary(floor_summary_df, PASSENGERS.df)
-                fig = plot(lift_summary_df, floor_summary_df, density_summary_df)
+        placeholder = st.empty()
+        next_frame = loop.time()
+        while True:
+            next_frame += frame_time
+            await asyncio.sleep(max(next_frame - loop.time(), 0))
+            if not sink.dirty:
+                continue
+            sink.dirty = False
+            lift_summary_df = lift_summary()
+            floor_summary_df = floor_request_snapshot(FLOOR_LIST)
+            density_summary_df = density_summary(floor_summary_df, PASSENGERS.df)
+            fig = plot(lift_summary_df, floor_summary_df, density_summary_df)
+            sink.frames_drawn += 1
+            late = loop.time() - next_frame
+            if late > frame_time:
+                skipped = int(late // frame_time)
+                sink.frames_skipped += skipped
+                next_frame += skipped * frame_time
+            with placeholder.container():
                 st.pyplot(fig)
+                st.caption(f'{fps} fps, frames drawn {sink.frames_drawn}, skipped {sink.frames_skipped}')
+            plt.close(fig)
 
-async def visualize_text(col_text):
+async def visualize_text(col_text, sink):
     import sys
 
     with col_text:
@@ -151,33 +189,68 @@ async def visualize_text(col_text):
 
         try:
             while True:
-                msg = await PASSENGERS.print_queue.get()
-                # msg_list += [msg]
-                # print_msg = "\n\n".join(msg_list)
-                with st.empty():
-                    # text_container.write(print_msg)
-                    text_container.write(msg)
-                    # text_container.markdown(scroll_script, unsafe_allow_html=True)
+                for event in await sink.wait():
+                    # msg_list += [msg]
+                    # print_msg = "\n\n".join(msg_list)
+                    with st.empty():
+                        # text_container.write(print_msg)
+                        text_container.write(str(event))
+                        # text_container.markdown(scroll_script, unsafe_allow_html=True)
         except Exception:
             exception_type, value, traceback = sys.exc_info()
-            PASSENGERS.log(f'print_operation error info {exception_type, value, traceback}')
+            PASSENGERS.log("print_operation error info %s", (exception_type, value, traceback))
 
-async def visualize_operation():
+async def visualize_operation(sink, fps=REDRAW_FPS):
     col_figure, _, col_text, _ = st.columns([7, 1, 3, 1])
 
     await asyncio.sleep(1)    
-    await asyncio.gather(visualize_text(col_text), visualize_figure(col_figure))
+    await asyncio.gather(visualize_text(col_text, sink), visualize_figure(col_figure, sink, fps=fps))
 
-async def main():
-    timeout = 1800
-    start_time = datetime.now()
+async def main(timeout=1800, visualize=True, seed=None, save_file=True, demand_scale=1.0,
+               sinks=None, redraw_fps=REDRAW_FPS, trace=None, record_trace=None, dispatch='baseline',
+               dispatch_params=None, **lift_params):
+    """
+    lift_params are passed to lift_operation
+    sinks receive the simulation events, printed to the console by default, an empty list publishes none
+    redraw_fps caps the redraw rate of the visualized figure
+    trace replays the arrivals of a trace file instead of drawing them, record_trace records them to one
+    dispatch 'matching' assigns hall calls in batched min-cost solves instead of the baseline lift search,
+    'destination' allocates each passenger to a lift by its target on arrival,
+    dispatch_params such as epoch and stop_time are passed to the dispatcher
+    """
+    start_time = CLOCK.now()
     start_time.hour
+    # each simulation of a process starts from no passengers and lifts
+    PASSENGERS.reset()
+    EVENTS.set_sinks(sinks if sinks is not None else [ConsoleSink()])
+    lift_params = set_dispatch(dispatch, dispatch_params, lift_params)
+    if save_file:
+        time_start_str = f'{start_time.hour:02}_{start_time.minute:02}_{start_time.second:02}'
+        PASSENGERS.run_writer = RunWriter(f'data/PAMultLift_{time_start_str}')
+    jobs = [
+        all_arrivals(seed=seed, demand_scale=demand_scale, trace=trace, record_trace=record_trace),
+        lift_operation(**lift_params)
+    ]
+    if visualize:
+        jobs += [visualize_operation(EVENTS.add_sink(StreamlitSink()), fps=redraw_fps)]
     try:
         async with asyncio.timeout(timeout):
-            await asyncio.gather(visualize_operation(), all_arrivals(), lift_operation())
+            await asyncio.gather(*jobs)
     except asyncio.TimeoutError:
-        print('timeout: save passengers to file')
-        time_start_str = f'{start_time.hour:02}_{start_time.minute:02}_{start_time.second:02}'
-        out_file = f'data/PAMultLift_{time_start_str}.csv'
-        PASSENGERS.df.sort_values(['status', 'dir', 'source', 'trip_start_time']) \
-            .to_csv(out_file)
+        EVENTS.close()
+    finally:
+        # passengers still traveling are written last, also when the run fails
+        if PASSENGERS.run_writer is not None:
+            writer, PASSENGERS.run_writer = PASSENGERS.run_writer, None
+            writer.close(PASSENGERS.store.take(PASSENGERS.store.column('status') != 'Arrived'))
+            print(f'passengers saved to {writer.out_dir}')
+
+def main_virtual(timeout=1800, seed=None, save_file=True, origin=None, sinks=None, **sim_params):
+    """
+    runs main on a virtual clock, so simulated time passes as fast as it can be computed
+    origin is the simulated start time, the current time by default
+    headless runs publish no events unless sinks, such as [ConsoleSink()], are given
+    """
+    sinks = sinks if sinks is not None else []
+    run_virtual(main(timeout=timeout, visualize=False, seed=seed, save_file=save_file, sinks=sinks, **sim_params),
+                origin=origin)
@@ -1,14 +1,16 @@
 import asyncio
-from random import expovariate
-from datetime import datetime
 from src.base.FloorList import FLOOR_LIST
 from src.base.Passenger import Passenger
 from src.base.PassengerList import PASSENGERS
 from src.base.Lift import Lift
+from src.sim.ArrivalStream import ArrivalStream
+from src.utils.Clock import CLOCK
+from src.utils.Events import EVENTS, ConsoleSink
+from src.utils.RunWriter import RunWriter
 
 TRIPS = [(
     source, target,
-    'U' if target > source else 'D'
+    FLOOR_LIST.get_direction(source, target)
     )
     for source in FLOOR_LIST.list_floors()
     for target in FLOOR_LIST.list_floors()
@@ -22,10 +24,7 @@ for source in FLOOR_LIST.list_floors():
     for target in FLOOR_LIST.list_floors():
         if target == source:
             continue
-        elif target > source:
-            dir = 'U'
-        else:
-            dir = 'D'
+        dir = FLOOR_LIST.get_direction(source, target)
         key = (source, target, dir)
         if (source == '000') | (target == '000'):
             trip_arrival_rates[key] = 0.003
@@ -39,30 +38,18 @@ async def passenger_arrival(source_floor, target_floor, start_time):
     new_passenger = Passenger(source_floor, target_floor, start_time)
     await PASSENGERS.passenger_arrival(new_passenger)
 
-# simulates exponential arrival time of passengers
-async def exp_gen(rate=1.0):
-    time_taken = expovariate(rate)
-    await asyncio.sleep(time_taken)
-
-# simulates continuous arrival
-async def cont_exp_gen(trip, rate=1.0):
+# simulates all trips as one merged Poisson arrival stream
+async def merged_arrivals(seed=None):
     try:
-        source_floor = trip[0]
-        target_floor = trip[1]
-        while True:
-            await exp_gen(rate=rate)
-            await passenger_arrival(source_floor, target_floor, datetime.now())
-            # for debugging
-            # print('passenger arrived from', trip[0], 'moving', trip[2], 'to', trip[1])
-            await asyncio.sleep(0)
+        await ArrivalStream(trip_arrival_rates, seed=seed).run(passenger_arrival)
     except MemoryError:
         print('memory error')
         return None
 
 # simulates run of multiple continuous exponential processes in fixed time
-async def all_arrivals():
-    jobs = [cont_exp_gen(trip=k, rate=v) for k,v in trip_arrival_rates.items()]
-    start_time = datetime.now()
+async def all_arrivals(seed=None):
+    jobs = [merged_arrivals(seed=seed)]
+    start_time = CLOCK.now()
     print(f'all start: {start_time}')
     await asyncio.gather(*jobs)
     
@@ -75,14 +62,16 @@ async def lift_operation():
 
 async def main():
     timeout = 500
-    start_time = datetime.now()
+    EVENTS.set_sinks([ConsoleSink()])
+    start_time = CLOCK.now()
     start_time.hour
+    time_start_str = f'{start_time.hour:02}_{start_time.minute:02}_{start_time.second:02}'
+    PASSENGERS.run_writer = RunWriter(f'../data/PASimOneLift_{time_start_str}')
     try:
         async with asyncio.timeout(timeout):
             await asyncio.gather(all_arrivals(), lift_operation())
     except asyncio.TimeoutError:
-        print('timeout: save passengers to file')
-        time_start_str = f'{start_time.hour:02}_{start_time.minute:02}_{start_time.second:02}'
-        out_file = f'../data/PASimOneLift_{time_start_str}.csv'
-        PASSENGERS.df.sort_values(['status', 'dir', 'source', 'trip_start_time']) \
-            .to_csv(out_file)
+        print('timeout: save remaining passengers to file')
+    finally:
+        writer, PASSENGERS.run_writer = PASSENGERS.run_writer, None
+        writer.close(PASSENGERS.store.take(PASSENGERS.store.column('status') != 'Arrived'))
@@ -1,17 +1,17 @@
 import asyncio
 from random import expovariate
-from datetime import datetime
 from src.base.Floor import Floor
 from src.base.FloorList import FloorList
 from src.base.Passenger import Passenger
 from src.base.PassengerList import PASSENGERS
+from src.utils.Clock import CLOCK
 
 FLOORS = list(str(i).zfill(3) for i in range(1, 5))
 FLOOR_HEIGHTS = {'001': 0, '002': 5, '003': 8, '004': 11}
 FLOOR_LIST = FloorList(FLOORS, FLOOR_HEIGHTS)
 TRIPS = [(
     source, target,
-    'U' if target > source else 'D'
+    FLOOR_LIST.get_direction(source, target)
     )
     for source in FLOOR_LIST.list_floors()
     for target in FLOOR_LIST.list_floors()
@@ -61,7 +61,7 @@ def increment_counter(counter_type):
     COUNTERS[counter_type] += 1
 
 def passenger_arrival(source_floor, target_floor, start_time):
-    new_passenger = Passenger(source_floor, target_floor, start_time)
+    new_passenger = Passenger(source_floor, target_floor, start_time, floor_list=FLOOR_LIST)
     PASSENGERS.passenger_arrival(new_passenger)
 
 # simulates exponential arrival time of passengers
@@ -75,11 +75,11 @@ async def cont_exp_gen(trip, rate=1.0):
         source_floor = trip[0]
         target_floor = trip[1]
         while True:
-            start_time = datetime.now()
+            start_time = CLOCK.now()
             await exp_gen(rate=rate)
-            passenger_arrival(source_floor, target_floor, datetime.now())
+            passenger_arrival(source_floor, target_floor, CLOCK.now())
             increment_counter(trip)
-            end_time = datetime.now()
+            end_time = CLOCK.now()
             # for logging
             print('trip', trip, 'rate ', rate, 'generated taking', end_time-start_time)
     except MemoryError:
@@ -90,7 +90,7 @@ async def cont_exp_gen(trip, rate=1.0):
 async def main():
     jobs = [cont_exp_gen(trip=k, rate=v) for k,v in trip_arrival_rates.items()]
     timeout = 5
-    start_time = datetime.now()
+    start_time = CLOCK.now()
     print(f'all start: {start_time}')
     try:
         async with asyncio.timeout(timeout):
@@ -98,7 +98,7 @@ async def main():
     except asyncio.TimeoutError:
         print(f'timeout after {timeout} seconds')
         print('counter', COUNTERS)
-        print('arrived passengers: ', PASSENGERS.df)
+        print('arrived passengers: ', PASSENGERS.history().df)
 
 if __name__ == "__main__":
     asyncio.run(main=main())
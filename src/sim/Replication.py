@@ -0,0 +1,122 @@
+"""
+Monte Carlo replications of the multiple lift simulation
+Independent seeded runs execute in a process pool on the virtual clock,
+replications are added until the confidence intervals of the chosen
+statistics are tight enough
+"""
+
+import os
+import random
+import contextlib
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+import pandas as pd
+
+from src.metrics.Confidence import confidence_interval
+
+
+# simulated start time of replications, so runs are reproducible
+ORIGIN = datetime(2000, 1, 1)
+
+
+def run_replication(seed, timeout=1800, **sim_params) -> dict:
+    """
+    runs one simulation in a fresh process and returns its trip time statistics and trip cost
+    sim_params are passed to PAMultLift.main
+    """
+    from src.sim.PAMultLift import main_virtual, PASSENGERS
+    from src.metrics.TimeMetrics import trip_time_stats, trip_cost
+
+    random.seed(seed)
+    np.random.seed(seed)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        main_virtual(timeout=timeout, seed=seed, save_file=False, sinks=[], origin=ORIGIN, **sim_params)
+    history = PASSENGERS.history()
+    return {'seed': seed, 'passengers': history.count_passengers()} | trip_time_stats(history.df) | {
+        'trip_cost': trip_cost(history.df, end_time=ORIGIN + timedelta(seconds=timeout))
+    }
+
+
+class ReplicationRunner:
+    """
+    adds replications until the confidence interval half-width of every
+    statistic in stop_on is within half_width, or max_runs is reached
+    sim_params, such as dispatch or num_lifts, are passed to every replication
+    """
+    STOP_ON = ('waiting_time_mean', 'travel_time_mean')
+
+    def __init__(self, timeout=1800, half_width=1.0, level=0.95, stop_on=STOP_ON,
+                 min_runs=4, max_runs=64, workers=None, base_seed=0, sim_params=None) -> None:
+        assert min_runs >= 2
+        assert max_runs >= min_runs
+        self.timeout = timeout
+        self.half_width = half_width
+        self.level = level
+        self.stop_on = list(stop_on)
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.base_seed = base_seed
+        self.sim_params = sim_params or {}
+        self.results = []
+
+    def results_df(self) -> pd.DataFrame:
+        return pd.DataFrame(self.results)
+
+    def contiguous_results(self) -> list:
+        """
+        results of seeds base_seed onwards up to the first seed not yet finished
+        so the statistics do not depend on which replications happen to finish first
+        """
+        by_seed = {result['seed']: result for result in self.results}
+        prefix = []
+        while self.base_seed + len(prefix) in by_seed:
+            prefix += [by_seed[self.base_seed + len(prefix)]]
+        return prefix
+
+    def summary(self, results=None) -> pd.DataFrame:
+        "mean, confidence interval and run count of each statistic, over all results by default"
+        df = pd.DataFrame(self.results if results is None else results).drop(columns=['seed', 'passengers'])
+        rows = {}
+        for col in df.columns:
+            mean, half_width = confidence_interval(df[col], level=self.level)
+            rows[col] = {
+                'mean': mean,
+                'half_width': half_width,
+                'ci_low': mean - half_width,
+                'ci_high': mean + half_width,
+                'runs': df[col].notna().sum(),
+            }
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    def is_converged(self) -> bool:
+        results = self.contiguous_results()
+        if len(results) < self.min_runs:
+            return False
+        half_widths = self.summary(results).loc[self.stop_on, 'half_width']
+        return bool((half_widths <= self.half_width).all())
+
+    def run(self) -> pd.DataFrame:
+        # a fresh process per replication, since the simulation keeps module level state
+        executor = ProcessPoolExecutor(max_workers=self.workers, max_tasks_per_child=1)
+        try:
+            submitted = 0
+            pending = set()
+            while submitted < min(self.workers, self.max_runs):
+                pending.add(executor.submit(run_replication, self.base_seed + submitted, self.timeout, **self.sim_params))
+                submitted += 1
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                self.results += [future.result() for future in done]
+                if self.is_converged():
+                    break
+                while submitted < self.max_runs and len(pending) < self.workers:
+                    pending.add(executor.submit(run_replication, self.base_seed + submitted, self.timeout, **self.sim_params))
+                    submitted += 1
+        finally:
+            # returns without waiting on replications still in flight
+            executor.shutdown(wait=False, cancel_futures=True)
+        # replications past the first unfinished seed are dropped, so results repeat for any worker count
+        self.results = self.contiguous_results()
+        return self.summary()
@@ -0,0 +1,104 @@
+"""
+Parameter sweep over the multiple lift simulation
+Each configuration of the grid runs in its own process and its statistics
+are cached under a hash of the full configuration, so rerunning a sweep
+only runs configurations that have no cached result yet
+"""
+
+import os
+import json
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+from src.base.Lift import LIFT_CAPACITY_DEFAULT
+from src.sim.Replication import run_replication
+
+BASE_CONFIG = {
+    'timeout': 1800,
+    'seed': 0,
+    'num_lifts': 5,
+    'capacity': LIFT_CAPACITY_DEFAULT,
+    'lift_spec': {'a': 1.0, 'max_v': 4.0},
+    'assign_multi': True,
+    'bypass_prev_assignment': True,
+    'onboarding_mode': 'earliest',
+    'dispatch': 'baseline',
+    'dispatch_params': {},
+    'demand_scale': 1.0,
+}
+
+
+def config_key(config: dict) -> str:
+    "content hash of a configuration, independent of key order"
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+def run_config(config: dict) -> dict:
+    sim_params = {k: v for k, v in config.items() if k not in ('seed', 'timeout')}
+    return run_replication(config['seed'], timeout=config['timeout'], **sim_params)
+
+
+class ParameterSweep:
+    """
+    grid maps configuration keys to lists of values, lift_spec values are dicts of LiftSpec parameters
+    e.g. {'num_lifts': [4, 5, 6], 'lift_spec': [{'a': 1.0, 'max_v': 4.0}, {'a': 1.2, 'max_v': 5.0}]}
+    """
+    CACHE_DIR = 'data/sweep'
+
+    def __init__(self, grid: dict, base_config=None, cache_dir=CACHE_DIR, workers=None) -> None:
+        self.base_config = BASE_CONFIG | (base_config or {})
+        unknown = set(grid) - set(self.base_config)
+        if unknown:
+            raise ValueError(f'unknown sweep parameters {sorted(unknown)}')
+        self.grid = grid
+        self.cache_dir = cache_dir
+        self.workers = workers if workers is not None else os.cpu_count()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def configs(self) -> list:
+        keys = list(self.grid)
+        return [
+            self.base_config | dict(zip(keys, values))
+            for values in itertools.product(*[self.grid[k] for k in keys])
+        ]
+
+    def cache_path(self, config) -> str:
+        return os.path.join(self.cache_dir, f'{config_key(config)}.json')
+
+    def is_cached(self, config) -> bool:
+        return os.path.exists(self.cache_path(config))
+
+    def save_result(self, config, result):
+        # written to a temporary file first, so an interrupted sweep never leaves a partial entry
+        path = self.cache_path(config)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'config': config, 'result': result}, f)
+        os.replace(path + '.tmp', path)
+
+    def load_result(self, config) -> dict:
+        with open(self.cache_path(config)) as f:
+            return json.load(f)['result']
+
+    def pending_configs(self) -> list:
+        return [config for config in self.configs() if not self.is_cached(config)]
+
+    def run(self) -> pd.DataFrame:
+        pending = self.pending_configs()
+        if pending:
+            # a fresh process per configuration, since the simulation keeps module level state
+            with ProcessPoolExecutor(max_workers=self.workers, max_tasks_per_child=1) as executor:
+                futures = {executor.submit(run_config, config): config for config in pending}
+                for future in as_completed(futures):
+                    self.save_result(futures[future], future.result())
+        return self.results_df()
+
+    def results_df(self) -> pd.DataFrame:
+        "swept parameters and statistics of every cached configuration in the grid"
+        rows = []
+        for config in self.configs():
+            if not self.is_cached(config):
+                continue
+            params = {k: json.dumps(config[k]) if isinstance(config[k], dict) else config[k] for k in self.grid}
+            rows += [params | self.load_result(config)]
+        return pd.DataFrame(rows)
@@ -0,0 +1,308 @@
+"""
+Zoned simulation of tall buildings served by several lift banks
+A building is partitioned into zones, such as low-rise, high-rise and shuttle banks. Each zone
+is simulated by its own worker process on its own virtual clock, with FLOOR_LIST and PASSENGERS
+holding only the zone's floors and passengers, so zones run on separate cores.
+The coordinator draws the building's arrivals and splits each trip into legs, one per zone.
+A passenger changing banks at a sky lobby is reported by the zone it leaves and handed to the
+next zone through the worker pipes. Zones advance in lockstep windows no longer than the
+transfer time, so a transfer reaches its next zone before that zone's clock passes it
+"""
+
+import os
+import contextlib
+import multiprocessing
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from src.sim.ArrivalStream import ArrivalStream
+
+
+class Zone:
+    """
+    a lift bank serving floors, lifts start at the lowest of them
+    sim_params, such as capacity, lift_spec or dispatch, are passed to the zone's lifts and dispatcher
+    """
+
+    def __init__(self, name, floors, num_lifts=5, **sim_params) -> None:
+        self.name = name
+        self.floors = list(floors)
+        self.num_lifts = num_lifts
+        self.sim_params = sim_params
+
+    def __repr__(self):
+        return f'Zone({self.name!r}, {len(self.floors)} floors, {self.num_lifts} lifts)'
+
+
+class Building:
+    "floors from the bottom up with their heights, and the zones serving them"
+
+    def __init__(self, floors, floor_heights, zones) -> None:
+        self.floors = list(floors)
+        self.floor_heights = dict(floor_heights)
+        self.zones = list(zones)
+        for zone in self.zones:
+            unknown = set(zone.floors) - set(self.floors)
+            if unknown:
+                raise ValueError(f'zone {zone.name} serves unknown floors {sorted(unknown)}')
+            # zone floors follow the building order, so their ordinals follow height
+            zone.floors = [f for f in self.floors if f in set(zone.floors)]
+        self.routes = {}
+
+    @classmethod
+    def tower(cls, num_floors=100, sky_lobby=50, low_lifts=10, shuttle_lifts=6, high_lifts=14, **sim_params):
+        """
+        a tower of floors G, L01, L02 and so on with a low-rise bank from G below the sky lobby,
+        a shuttle bank between G and the sky lobby and a high-rise bank from the sky lobby up
+        """
+        floors = ['G'] + [f'L{i:02}' for i in range(1, num_floors)]
+        floor_heights = {f: float(2 + int(f[1:]) * 3) if f != 'G' else 0.0 for f in floors}
+        lobby = floors[sky_lobby]
+        zones = [
+            Zone('low', floors[:sky_lobby], low_lifts, **sim_params),
+            Zone('shuttle', ['G', lobby], shuttle_lifts, **sim_params),
+            Zone('high', floors[sky_lobby:], high_lifts, **sim_params),
+        ]
+        return cls(floors, floor_heights, zones)
+
+    def route(self, source, target) -> list:
+        """
+        legs (zone index, source, target) of the trip with the fewest lift changes,
+        the first zone serving both floors of a leg takes it
+        """
+        key = (source, target)
+        if key in self.routes:
+            return self.routes[key]
+        paths = {i: [] for i, zone in enumerate(self.zones) if source in zone.floors}
+        floors = {i: source for i in paths}
+        frontier = list(paths)
+        route = None
+        while frontier and route is None:
+            next_frontier = []
+            for i in frontier:
+                if target in self.zones[i].floors:
+                    route = paths[i] + [(i, floors[i], target)]
+                    break
+                for j, zone in enumerate(self.zones):
+                    if j in paths:
+                        continue
+                    shared = [f for f in zone.floors if f in self.zones[i].floors and f != floors[i]]
+                    if shared:
+                        paths[j] = paths[i] + [(i, floors[i], shared[0])]
+                        floors[j] = shared[0]
+                        next_frontier += [j]
+            frontier = next_frontier
+        if route is None:
+            raise ValueError(f'no zones connect {source} to {target}')
+        self.routes[key] = route
+        return route
+
+    def demand(self, lobby_rate=0.01, interfloor_rate=0.0001) -> dict:
+        "trip arrival rates per second, lobby_rate for trips from or to G and interfloor_rate for the rest"
+        return {
+            (source, target, 'U' if self.floors.index(target) > self.floors.index(source) else 'D'):
+                lobby_rate if 'G' in (source, target) else interfloor_rate
+            for source in self.floors for target in self.floors if source != target
+        }
+
+
+def zone_worker(conn, floors, floor_heights, num_lifts, sim_params, origin):
+    """
+    simulates one zone in a fresh process, answering the coordinator's messages
+    ('step', until, legs) starts legs (id, at, source, target) and runs the zone's clock up to until,
+    replying with the legs completed since the last step as (id, board, arrival) seconds
+    ('finish',) replies with the zone's passenger records and the CPU seconds its simulation took
+    """
+    import time
+    import asyncio
+    from src.base.FloorList import FLOOR_LIST
+
+    FLOOR_LIST.reset(floors, floor_heights)
+    from src.base.Passenger import Passenger
+    from src.base.PassengerList import PASSENGERS
+    from src.sim.PAMultLift import lift_operation, set_dispatch
+    from src.utils.Clock import CLOCK, VirtualTimeEventLoop
+    from src.utils.Events import EVENTS
+
+    def seconds(times):
+        return (times - np.datetime64(origin, 'ns')) / np.timedelta64(1, 's')
+
+    async def operate(jobs):
+        await asyncio.gather(*jobs)
+
+    async def start_leg(leg_id, source, target):
+        passenger = Passenger(source, target)
+        leg_ids[passenger.id] = leg_id
+        await PASSENGERS.passenger_arrival(passenger)
+
+    def completed_legs():
+        "legs whose passengers arrived since the last call, read from the end of the archive"
+        nonlocal archived
+        store = PASSENGERS.archive.store
+        ids = store.get_ids()[archived:].tolist()
+        boards = seconds(store.column('board_time')[archived:]).tolist()
+        arrivals = seconds(store.column('dest_arrival_time')[archived:]).tolist()
+        archived = store.size
+        return [(leg_ids[i], b, a) for i, b, a in zip(ids, boards, arrivals) if i in leg_ids]
+
+    leg_ids = {}
+    archived = 0
+    sim_params = dict(sim_params)
+    dispatch = sim_params.pop('dispatch', 'baseline')
+    dispatch_params = sim_params.pop('dispatch_params', None)
+    cpu_start = time.process_time()
+    loop = VirtualTimeEventLoop()
+    asyncio.set_event_loop(loop)
+    CLOCK.attach(loop, origin)
+    EVENTS.set_sinks([])
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        lift_params = set_dispatch(dispatch, dispatch_params, sim_params)
+        jobs = [lift_operation(num_lifts=num_lifts, **lift_params)]
+        if PASSENGERS.dispatcher is not None:
+            jobs += [PASSENGERS.dispatcher.run()]
+        else:
+            jobs += [PASSENGERS.reassignment_listener()]
+        operation = loop.create_task(operate(jobs))
+        while True:
+            message = conn.recv()
+            if message[0] == 'finish':
+                break
+            _, until, legs = message
+            for leg_id, at, source, target in legs:
+                loop.call_at(at, lambda *leg: loop.create_task(start_leg(*leg)), leg_id, source, target)
+            loop.run_until_complete(asyncio.sleep(until - loop.time()))
+            if operation.done():
+                operation.result()
+            conn.send(completed_legs())
+        records = PASSENGERS.history().df
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+    conn.send((records.assign(leg=records.index.map(lambda i: leg_ids.get(i))), time.process_time() - cpu_start))
+    CLOCK.detach()
+    loop.close()
+
+
+class ZonedSimulation:
+    """
+    runs the zones of a building side by side, each in its own process
+    trip_arrival_rates are per building trip (source, target, dir) as in PAMultLift, the building's
+    default demand otherwise; a passenger changing zones reaches the next one transfer_time seconds
+    after leaving the last, and zones synchronize every window seconds, at most transfer_time
+    """
+    TRANSFER_TIME = 30.0
+
+    def __init__(self, building: Building, trip_arrival_rates=None, transfer_time=TRANSFER_TIME,
+                 window=None, seed=None) -> None:
+        assert transfer_time > 0
+        window = window if window is not None else transfer_time
+        if not 0 < window <= transfer_time:
+            raise ValueError('window must be positive and at most transfer_time')
+        self.building = building
+        self.trip_arrival_rates = trip_arrival_rates if trip_arrival_rates is not None else building.demand()
+        for source, target, _ in self.trip_arrival_rates:
+            building.route(source, target)
+        self.transfer_time = transfer_time
+        self.window = window
+        self.seed = seed
+        self.journeys = None
+        self.zone_records = {}
+        self.zone_cpu_seconds = {}
+
+    def arrivals(self, until):
+        "building arrivals as (offset, source, target) up to until seconds"
+        for offset, trip in ArrivalStream(self.trip_arrival_rates, seed=self.seed).arrivals():
+            if offset >= until:
+                return
+            yield offset, trip[0], trip[1]
+
+    def run(self, timeout=1800, arrival_timeout=None, origin=None) -> pd.DataFrame:
+        """
+        simulates timeout seconds, drawing arrivals for the first arrival_timeout of them,
+        and returns one row per journey, counted over all of its legs
+        """
+        origin = origin if origin is not None else datetime.now()
+        self.zone_records = {}
+        self.zone_cpu_seconds = {}
+        arrival_timeout = arrival_timeout if arrival_timeout is not None else timeout
+        context = multiprocessing.get_context('spawn')
+        workers = []
+        for zone in self.building.zones:
+            conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=zone_worker, name=f'zone {zone.name}',
+                args=(child_conn, zone.floors, {f: self.building.floor_heights[f] for f in zone.floors},
+                      zone.num_lifts, zone.sim_params, origin),
+            )
+            process.start()
+            # only the worker holds its end, so a failed worker closes the pipe instead of hanging recv
+            child_conn.close()
+            workers += [(conn, process)]
+
+        journeys = []
+        # legs to start in each zone, as (id, at, source, target)
+        pending = [[] for _ in workers]
+        arrivals = self.arrivals(arrival_timeout)
+        next_arrival = next(arrivals, None)
+        try:
+            now = 0.0
+            while now < timeout:
+                until = min(now + self.window, timeout)
+                while next_arrival is not None and next_arrival[0] < until:
+                    offset, source, target = next_arrival
+                    legs = self.building.route(source, target)
+                    journeys += [{
+                        'source': source, 'target': target, 'legs': len(legs), 'next_leg': 0,
+                        'start': offset, 'waiting': 0.0, 'leg_start': offset, 'arrival': np.nan,
+                    }]
+                    zone, leg_source, leg_target = legs[0]
+                    pending[zone] += [(len(journeys) - 1, offset, leg_source, leg_target)]
+                    next_arrival = next(arrivals, None)
+                for (conn, _), legs in zip(workers, pending):
+                    conn.send(('step', until, legs))
+                pending = [[] for _ in workers]
+                for conn, _ in workers:
+                    for journey_id, board, arrival in conn.recv():
+                        self.complete_leg(journeys[journey_id], journey_id, board, arrival, pending)
+                now = until
+            for conn, _ in workers:
+                conn.send(('finish',))
+            for zone, (conn, _) in zip(self.building.zones, workers):
+                self.zone_records[zone.name], self.zone_cpu_seconds[zone.name] = conn.recv()
+        finally:
+            for conn, process in workers:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+        self.journeys = self.journeys_df(journeys, origin)
+        return self.journeys
+
+    def complete_leg(self, journey, journey_id, board, arrival, pending):
+        "adds a finished leg to its journey and queues the next leg, transfer_time later"
+        journey['waiting'] += board - journey['leg_start']
+        journey['next_leg'] += 1
+        if journey['next_leg'] == journey['legs']:
+            journey['arrival'] = arrival
+            return
+        zone, source, target = self.building.route(journey['source'], journey['target'])[journey['next_leg']]
+        journey['leg_start'] = arrival + self.transfer_time
+        pending[zone] += [(journey_id, journey['leg_start'], source, target)]
+
+    @staticmethod
+    def journeys_df(journeys, origin) -> pd.DataFrame:
+        df = pd.DataFrame(journeys, columns=[
+            'source', 'target', 'legs', 'next_leg', 'start', 'waiting', 'leg_start', 'arrival'
+        ])
+        arrived = df['arrival'].notna()
+        return pd.DataFrame({
+            'source': df['source'],
+            'target': df['target'],
+            'legs': df['legs'],
+            'status': np.where(arrived, 'Arrived', 'Traveling'),
+            'trip_start_time': origin + pd.to_timedelta(df['start'], unit='s'),
+            'dest_arrival_time': origin + pd.to_timedelta(df['arrival'], unit='s'),
+            'waiting_time': df['waiting'].where(arrived),
+            'travel_time': (df['arrival'] - df['start']).where(arrived),
+        }).rename_axis('id')
@@ -0,0 +1,186 @@
+"""
+Micro-benchmarks of the dispatch hot paths on synthetic populated states
+Results are saved as JSON baselines and later runs are compared against them
+"""
+
+import os
+import json
+import platform
+import statistics
+from datetime import datetime
+from time import perf_counter
+import numpy as np
+import pandas as pd
+
+from src.base.FloorList import FLOOR_LIST
+from src.base.PassengerList import PassengerList, PASSENGERS
+from src.base.Lift import Lift
+from src.base.LiftFleet import LiftFleet
+from src.base.DestinationDispatcher import DestinationDispatcher
+from src.metrics.BoardingTime import boarding_time
+from src.metrics.Summary import floor_request_snapshot, density_summary
+from src.metrics.TimeMetrics import calculate_all_metrics
+from src.utils.Clock import CLOCK
+
+PASSENGER_COUNTS = [1_000, 10_000, 100_000]
+LIFT_COUNTS = [5, 20]
+BASELINE_FILE = 'data/benchmarks/baseline.json'
+# share of passengers still waiting in a synthetic state, the rest of those not onboard have arrived
+WAITING_SHARE = 0.02
+_LIFTS = {}
+
+
+def get_lifts(num_lifts):
+    "lifts are built once per count, since each lift sets up its own loggers"
+    if num_lifts not in _LIFTS:
+        _LIFTS[num_lifts] = [Lift(f'Bench {i}', 'G', 'U') for i in range(num_lifts)]
+    return _LIFTS[num_lifts]
+
+def synthetic_passenger_df(num_passengers, lift_names, capacity, rng) -> pd.DataFrame:
+    floors = np.array(FLOOR_LIST.list_floors(), dtype=object)
+    source_idx = rng.integers(0, floors.size, num_passengers)
+    target_idx = (source_idx + rng.integers(1, floors.size, num_passengers)) % floors.size
+    num_onboard = min(len(lift_names) * capacity // 2, num_passengers)
+    num_waiting = min(int(num_passengers * WAITING_SHARE), num_passengers - num_onboard)
+    status = np.full(num_passengers, 'Arrived', dtype=object)
+    status[-num_waiting - num_onboard:] = 'Onboard'
+    status[num_passengers - num_waiting:] = 'Waiting'
+    lift = np.array(lift_names, dtype=object)[rng.integers(0, len(lift_names), num_passengers)]
+    # a few waiting passengers are assigned, leaving each lift room for assign_passengers
+    waiting_assigned = min(len(lift_names) * capacity // 4, num_waiting)
+    lift[num_passengers - num_waiting + waiting_assigned:] = 'Unassigned'
+
+    now = CLOCK.now()
+    trip_start_time = pd.to_datetime(now) - pd.to_timedelta(
+        np.sort(rng.uniform(0, 3600, num_passengers))[::-1], unit='s'
+    )
+    board_time = trip_start_time + pd.to_timedelta(rng.uniform(0, 60, num_passengers), unit='s')
+    dest_arrival_time = board_time + pd.to_timedelta(rng.uniform(0, 60, num_passengers), unit='s')
+    df = pd.DataFrame({
+        'source': floors[source_idx],
+        'current': floors[source_idx],
+        'target': floors[target_idx],
+        'dir': np.where(target_idx > source_idx, 'U', 'D').astype(object),
+        'status': status,
+        'lift': lift,
+        'trip_start_time': trip_start_time,
+        'board_time': board_time.where(status != 'Waiting'),
+        'dest_arrival_time': dest_arrival_time.where(status == 'Arrived'),
+        'travel_time': pd.NA,
+        'waiting_time': pd.NA,
+        'time_on_lift': pd.NA,
+    }, index=pd.RangeIndex(1, num_passengers + 1))
+    return df.astype(PassengerList.schema)
+
+def build_state(num_passengers, num_lifts, seed=0):
+    "populates PASSENGERS, floors and lifts, returns the tracking lifts"
+    rng = np.random.default_rng(seed)
+    lifts = get_lifts(num_lifts)
+    floors = FLOOR_LIST.list_floors()
+    PASSENGERS.df = synthetic_passenger_df(
+        num_passengers, [lift.name for lift in lifts], lifts[0].capacity, rng
+    )
+    PASSENGERS.tracking_lifts = []
+    PASSENGERS.fleet = LiftFleet()
+    for floorname, floor in FLOOR_LIST.floors:
+        floor.passengers = PASSENGERS.filter_waiting_at(floor)
+    now = CLOCK.now()
+    for i, lift in enumerate(lifts):
+        lift.floor = floors[int(rng.integers(0, len(floors) - 1))]
+        lift.height = lift.get_current_floor().height
+        lift.dir = 'U'
+        lift.next_dir = 'U'
+        lift.loading_state = False
+        lift.redirect_state = False
+        lift.floor_move_state = {
+            'start_move_floor': lift.floor,
+            'target_floor': floors[-1],
+            'start_move_time': now,
+        }
+        onboard = PASSENGERS.filter_by_status_onboard().filter_by_lift_assigned(lift)
+        lift.passengers = PassengerList(lift_tracking=True)
+        lift.passengers.bulk_add_passengers(onboard)
+        lift.calculate_passenger_count()
+        PASSENGERS.register_lift(lift)
+    return lifts
+
+def benchmark_calls(lifts) -> dict:
+    "named zero argument calls timed on a populated state"
+    lift = lifts[0]
+    target_floor = FLOOR_LIST.list_floors()[-1]
+    target_height = FLOOR_LIST.get_floor(target_floor).height
+    floor_summary_df = floor_request_snapshot(FLOOR_LIST)
+    dispatcher = DestinationDispatcher(PASSENGERS)
+    bottom_floor = FLOOR_LIST.get_bottom_floor()
+
+    def next_baseline_target():
+        lift_dir = lift.dir
+        lift.next_baseline_target()
+        lift.dir = lift_dir
+
+    return {
+        'next_baseline_target': next_baseline_target,
+        'precalc_next_target_after_loading': lift.precalc_next_target_after_loading,
+        'get_reaching_time': lambda: lift.get_reaching_time(CLOCK.now(), target_height),
+        'lift_search_redirect_gen': lambda: list(PASSENGERS.lift_search_redirect_gen(target_floor, 'U')),
+        # one call allocated as it arrives, the destination dispatch case
+        'destination_allocation': lambda: dispatcher.allocate_trips(CLOCK.now(), [bottom_floor], [target_floor]),
+        'assign_passengers': lambda: lift.assign_passengers(target_floor, assign_multi=True),
+        'calculate_all_metrics': lambda: calculate_all_metrics(PASSENGERS.history()),
+        'density_summary': lambda: density_summary(floor_summary_df, PASSENGERS.df),
+        'boarding_time': lambda: boarding_time(lift, lift.passenger_count, 2, 3),
+    }
+
+def time_call(fn, repeat=5, min_sample_time=0.05) -> dict:
+    "per call seconds, each of repeat samples runs enough calls to last min_sample_time"
+    start = perf_counter()
+    fn()
+    first = perf_counter() - start
+    number = max(1, int(min_sample_time / max(first, 1e-9)))
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            fn()
+        samples += [(perf_counter() - start) / number]
+    return {'min': min(samples), 'median': statistics.median(samples), 'number': number, 'repeat': repeat}
+
+def run_suite(passenger_counts=PASSENGER_COUNTS, lift_counts=LIFT_COUNTS, names=None, repeat=5) -> dict:
+    results = {}
+    for num_passengers in passenger_counts:
+        for num_lifts in lift_counts:
+            lifts = build_state(num_passengers, num_lifts)
+            for name, fn in benchmark_calls(lifts).items():
+                if names is not None and name not in names:
+                    continue
+                results[f'{name}[passengers={num_passengers},lifts={num_lifts}]'] = time_call(fn, repeat=repeat)
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+
+def save_results(results, path=BASELINE_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+def load_results(path=BASELINE_FILE) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def compare_results(baseline, current, threshold=0.2) -> pd.DataFrame:
+    "ratio of current to baseline minimum per call time, regressions are ratios above 1 + threshold"
+    rows = []
+    for key, result in current['results'].items():
+        if key not in baseline['results']:
+            continue
+        base_time = baseline['results'][key]['min']
+        ratio = result['min'] / base_time
+        rows += [[key, base_time, result['min'], ratio, ratio > 1 + threshold]]
+    return pd.DataFrame(rows, columns=['benchmark', 'baseline_s', 'current_s', 'ratio', 'regression'])
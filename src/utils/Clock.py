@@ -0,0 +1,87 @@
+import asyncio
+import selectors
+from datetime import datetime, timedelta
+
+
+class SimClock:
+    """
+    clock read by all simulation state
+    follows the wall clock unless a virtual time event loop is attached
+    """
+
+    def __init__(self) -> None:
+        self.loop = None
+        self.origin = None
+
+    def attach(self, loop, origin=None):
+        self.loop = loop
+        self.origin = origin if origin is not None else datetime.now()
+
+    def detach(self):
+        self.loop = None
+        self.origin = None
+
+    def is_virtual(self):
+        return self.loop is not None
+
+    def now(self) -> datetime:
+        if self.loop is None:
+            return datetime.now()
+        return self.origin + timedelta(seconds=self.loop.time())
+
+    def elapsed(self) -> float:
+        "seconds of simulated time since the clock was attached"
+        if self.loop is None:
+            return 0.0
+        return self.loop.time()
+
+
+class VirtualTimeSelector(selectors.DefaultSelector):
+    """
+    selector that never blocks for a timeout
+    instead of sleeping until the next scheduled event, virtual time jumps to it
+    """
+
+    def __init__(self, loop) -> None:
+        super().__init__()
+        self.loop = loop
+
+    def select(self, timeout=None):
+        if timeout is None:
+            # nothing scheduled, only external wake ups can make progress
+            return super().select(None)
+        events = super().select(0)
+        if not events and timeout > 0:
+            self.loop.advance(timeout)
+        return events
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    discrete-event loop for simulation
+    asyncio keeps its timers (sleeps, wait_for and timeout deadlines) in a heap,
+    when no callback is ready the loop jumps straight to the earliest of them
+    """
+
+    def __init__(self) -> None:
+        self._virtual_time = 0.0
+        super().__init__(VirtualTimeSelector(self))
+
+    def time(self):
+        return self._virtual_time
+
+    def advance(self, seconds):
+        self._virtual_time += seconds
+
+
+def run_virtual(main, origin=None):
+    "runs coroutine main on virtual time, with CLOCK following the simulation"
+    with asyncio.Runner(loop_factory=VirtualTimeEventLoop) as runner:
+        CLOCK.attach(runner.get_loop(), origin)
+        try:
+            return runner.run(main)
+        finally:
+            CLOCK.detach()
+
+
+CLOCK = SimClock()
@@ -0,0 +1,225 @@
+"""
+Simulation events published to pluggable sinks
+The console sink prints each event, the file sink writes events in batches and never drops any,
+the streamlit sink keeps the latest events for the page and counts the older ones it drops.
+An empty sink list publishes nothing and costs a single check
+"""
+
+import asyncio
+from collections import deque
+from typing import NamedTuple, Any
+
+from src.utils.Clock import CLOCK
+
+
+class Notice(NamedTuple):
+    time: Any
+    text: str
+
+    def __str__(self):
+        return self.text
+
+class PassengerArrived(NamedTuple):
+    time: Any
+    floor: str
+    count: int
+    target: str = None
+
+    def __str__(self):
+        if self.target is not None:
+            return f"{self.count} New passenger arrived at {self.floor} traveling to {self.target}"
+        return f"{self.count} new passenger arrived at {self.floor}"
+
+class Boarded(NamedTuple):
+    time: Any
+    lift: str
+    floor: str
+    count: int
+
+    def __str__(self):
+        return f"{self.count} passengers boarded {self.lift} at {self.floor}"
+
+class Offboarded(NamedTuple):
+    time: Any
+    lift: str
+    floor: str
+    count: int
+
+    def __str__(self):
+        return f"{self.count} passengers offboarded {self.lift} at {self.floor}"
+
+class LiftTargetChosen(NamedTuple):
+    time: Any
+    lift: str
+    target: str
+    next_dir: str
+
+    def __str__(self):
+        return f"{self.lift} lift new target {self.target} next direction {self.next_dir}"
+
+class LiftMoving(NamedTuple):
+    time: Any
+    lift: str
+    target: str
+
+    def __str__(self):
+        return f"{self.lift} moving to target {self.target}"
+
+class LiftMoved(NamedTuple):
+    time: Any
+    lift: str
+    floor: str
+    dir: str
+
+    def __str__(self):
+        return f"{self.lift} reaches {self.floor} facing {self.dir}"
+
+class Redirected(NamedTuple):
+    time: Any
+    lift: str
+    floor: str
+    prev_floor: str
+
+    def __str__(self):
+        return f"Redirecting {self.lift} to {self.floor}"
+
+class LiftStationed(NamedTuple):
+    time: Any
+    lift: str
+    floor: str
+
+    def __str__(self):
+        return f"{self.lift} stationed at {self.floor}"
+
+class LiftLoaded(NamedTuple):
+    time: Any
+    lift: str
+    floor: str
+    dir: str
+    passenger_ids: Any
+
+    def __str__(self):
+        return (f"{self.lift} facing {self.dir} after loading at {self.floor}, lift passengers: "
+                f"{', '.join([str(i) for i in self.passenger_ids])}")
+
+class StatusCounts(NamedTuple):
+    time: Any
+    counts: Any
+
+    def __str__(self):
+        return f"overall stats {self.counts}"
+
+
+class EventSink:
+    "receives every published event"
+    def publish(self, event):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class BufferedSink(EventSink):
+    "keeps published events in a buffer of at most maxlen until they are drained"
+    MAXLEN = 1000
+
+    def __init__(self, maxlen=MAXLEN) -> None:
+        self.buffer = deque(maxlen=maxlen)
+
+    def publish(self, event):
+        self.buffer.append(event)
+
+    def drain(self) -> list:
+        "removes and returns the buffered events, oldest first"
+        events = list(self.buffer)
+        self.buffer.clear()
+        return events
+
+
+class ConsoleSink(EventSink):
+    "prints events as they are published"
+    def publish(self, event):
+        print(event)
+
+
+class FileSink(BufferedSink):
+    "appends events to a text file, writing whenever maxlen events are buffered and on flush, so none are dropped"
+    def __init__(self, path, maxlen=BufferedSink.MAXLEN) -> None:
+        super().__init__(maxlen)
+        self.path = path
+        self.file = open(path, 'a')
+
+    def publish(self, event):
+        self.buffer.append(event)
+        if len(self.buffer) == self.buffer.maxlen:
+            self.flush()
+
+    def flush(self):
+        self.file.writelines(f"{event.time} {event}\n" for event in self.drain())
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class StreamlitSink(BufferedSink):
+    """
+    keeps the latest maxlen events for the streamlit page, which drains them when it wakes on ready
+    events the page has not drained in time are dropped and counted
+    dirty marks the figure stale, so any number of events between frames make one redraw
+    """
+    def __init__(self, maxlen=BufferedSink.MAXLEN) -> None:
+        super().__init__(maxlen)
+        self.dropped = 0
+        self.ready = asyncio.Event()
+        self.dirty = True
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+
+    def publish(self, event):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(event)
+        self.ready.set()
+        self.dirty = True
+
+    async def wait(self) -> list:
+        await self.ready.wait()
+        self.ready.clear()
+        return self.drain()
+
+
+class EventBus:
+    "publishes events to its sinks, with no sinks events are not even built"
+    def __init__(self, sinks=None) -> None:
+        self.sinks = list(sinks) if sinks is not None else []
+
+    @property
+    def active(self):
+        "whether any sink listens, to skip building costly event fields"
+        return len(self.sinks) > 0
+
+    def set_sinks(self, sinks):
+        self.close()
+        self.sinks = list(sinks)
+
+    def add_sink(self, sink):
+        self.sinks += [sink]
+        return sink
+
+    def emit(self, event_type, *fields):
+        "builds the event from its fields after the time, only when some sink listens"
+        if not self.sinks:
+            return
+        event = event_type(CLOCK.now(), *fields)
+        for sink in self.sinks:
+            sink.publish(event)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+# sinks are opt-in, set by each simulation's main
+EVENTS = EventBus()
@@ -1,10 +1,84 @@
 import logging
-import os, errno
+import os, errno, atexit, queue
+from logging.handlers import QueueHandler, QueueListener
 import streamlit as st
 
-def get_logger(logger_name, logger_class, logging_level):
+LOGFILE_DIR = '../logs'
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+
+# one file handler and one queue handler per log file, shared by every logger writing to it
+_file_handlers = {}
+_queue_handlers = {}
+_log_queue = queue.SimpleQueue()
+_listener = None
+_listener_pid = None
+
+
+class Deferred:
+    "log argument whose value is only computed when the record is written"
+    __slots__ = ('fn',)
+
+    def __init__(self, fn) -> None:
+        self.fn = fn
+
+    def __str__(self):
+        return str(self.fn())
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    queues records as they are, leaving message and args unmerged
+    so formatting happens on the listener thread, and only for records that are written
+    """
+    def __init__(self, log_queue, logfile_name) -> None:
+        super().__init__(log_queue)
+        self.logfile_name = logfile_name
+
+    def prepare(self, record):
+        record.logfile_name = self.logfile_name
+        return record
+
+
+class LogFileRouter(logging.Handler):
+    "listener side handler writing each record to the file of the logger that made it"
+    def emit(self, record):
+        _file_handlers[record.logfile_name].handle(record)
+
+
+def start_logging():
+    "starts the listener thread, again in a forked child since threads do not survive a fork"
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+    _listener = QueueListener(_log_queue, LogFileRouter())
+    _listener_pid = os.getpid()
+    _listener.start()
 
-    logfile_dir = '../logs'
+def stop_logging():
+    "writes out queued records and stops the listener thread"
+    global _listener
+    if _listener is None or _listener_pid != os.getpid():
+        return
+    _listener.stop()
+    _listener = None
+    for handler in _file_handlers.values():
+        handler.flush()
+
+atexit.register(stop_logging)
+
+def get_file_handler(logfile_name):
+    if logfile_name not in _file_handlers:
+        handler = logging.FileHandler(logfile_name)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        _file_handlers[logfile_name] = handler
+    return _file_handlers[logfile_name]
+
+def get_logger(logger_name, logger_class, logging_level):
+    """
+    logger writing to the log file of logger_class through the shared listener thread
+    repeated calls for a logger name do not add handlers
+    """
+    logfile_dir = LOGFILE_DIR
     if not os.path.exists(logfile_dir):
         try:
             os.makedirs(logfile_dir)
@@ -17,28 +91,16 @@ def get_logger(logger_name, logger_class, logging_level):
     elif logging_level == logging.DEBUG:
         logfile_name = f"{logfile_dir}/{logger_class}_detail.log"
 
-    if not os.path.exists(logfile_name):
-        try:
-            open(logfile_name, 'a').close()
-        except OSError as e:
-            if e.errno != errno.EEXIST:
-                raise
+    get_file_handler(logfile_name)
+    if logfile_name not in _queue_handlers:
+        _queue_handlers[logfile_name] = DeferredQueueHandler(_log_queue, logfile_name)
+    start_logging()
 
     py_logger = logging.getLogger(logger_name)
     py_logger.setLevel(logging_level)
-
-    py_handler = logging.FileHandler(logfile_name)
-    py_formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
-
-    py_handler.setFormatter(py_formatter)
-    py_logger.addHandler(py_handler)
+    for handler in list(py_logger.handlers):
+        if isinstance(handler, DeferredQueueHandler) and handler is not _queue_handlers[logfile_name]:
+            py_logger.removeHandler(handler)
+    if _queue_handlers[logfile_name] not in py_logger.handlers:
+        py_logger.addHandler(_queue_handlers[logfile_name])
     return py_logger
-
-def print_st(*args):
-    from src.base.PassengerList import PASSENGERS
-
-    print(*args)
-    msg = ' '.join([str(a) for a in args])
-    if PASSENGERS.visual_lock.locked():
-        PASSENGERS.visual_lock.release()
-    PASSENGERS.print_queue.put_nowait(msg)
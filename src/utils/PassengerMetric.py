@@ -1,4 +1,4 @@
-from datetime import datetime
+from src.utils.Clock import CLOCK
 
 class PassengerMetric:
     ""
@@ -17,7 +17,7 @@ class PassengerMetric:
 
     def get_patience_end(self):
         if self.arrival_time is None:
-            eval_time = datetime.now()
+            eval_time = CLOCK.now()
         else:
             eval_time = self.arrival_time
         if (eval_time - self.start_time).seconds > self.PATIENCE_INTERVAL:
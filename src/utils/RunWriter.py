@@ -0,0 +1,196 @@
+"""
+Streaming output of simulation runs as compressed columnar chunks
+Completed passengers are buffered and written chunk by chunk from a background thread,
+Parquet when pyarrow is installed and npz otherwise. A manifest lists each chunk with its
+columns and time ranges, so readers load only the columns and chunks they need
+"""
+
+import os
+import json
+import queue
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from src.base.LiftAssignment import LiftAssignment
+from src.base.PassengerStore import PassengerStore
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def default_format():
+    return 'parquet' if pa is not None else 'npz'
+
+def store_columns(store: PassengerStore) -> dict:
+    "file ready column arrays of a store, strings as unicode and lift assignments readable"
+    columns = {'id': store.get_ids().copy()}
+    for col in store.schema:
+        values = store.column(col)
+        if col == 'lift':
+            values = LiftAssignment.values_from_masks(values)
+        if values.dtype == object:
+            values = np.array([str(v) if v is not None else '' for v in values], dtype=str)
+        columns[col] = values.copy()
+    return columns
+
+def time_range(values):
+    "first and last time of a datetime column as ISO strings, None when all are missing"
+    values = values[~np.isnat(values)]
+    if values.size == 0:
+        return None
+    return [str(values.min()), str(values.max())]
+
+
+class RunWriter:
+    """
+    writes passenger records of a run to out_dir in chunks of at least chunk_rows rows
+    add only copies rows into the buffer, serializing and compressing happen on the writer thread
+    """
+    CHUNK_ROWS = 1000
+
+    def __init__(self, out_dir, chunk_rows=CHUNK_ROWS, format=None) -> None:
+        self.out_dir = out_dir
+        self.chunk_rows = chunk_rows
+        self.format = format if format is not None else default_format()
+        if self.format == 'parquet' and pa is None:
+            raise ImportError('parquet output needs pyarrow')
+        os.makedirs(out_dir, exist_ok=True)
+        self.manifest = {'format': self.format, 'chunks': []}
+        self.buffer = []
+        self.buffered_rows = 0
+        self.rows_written = 0
+        self.error = None
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.write_loop, name='RunWriter', daemon=True)
+        self.thread.start()
+
+    def add(self, store: PassengerStore):
+        "buffers a compact store of records, handing a chunk to the writer thread once enough are buffered"
+        if store.size == 0:
+            return
+        self.buffer += [store]
+        self.buffered_rows += store.size
+        if self.buffered_rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if self.buffered_rows == 0:
+            return
+        chunk = PassengerStore(self.buffer[0].schema, capacity=self.buffered_rows)
+        for store in self.buffer:
+            chunk.extend(store)
+        self.buffer = []
+        self.buffered_rows = 0
+        self.queue.put(chunk)
+
+    def sync(self):
+        "waits until the writer thread has written every chunk handed to it"
+        written = threading.Event()
+        self.queue.put(written)
+        written.wait()
+        if self.error is not None:
+            raise self.error
+
+    def close(self, remaining: PassengerStore = None):
+        "writes the buffer and remaining, such as passengers still traveling, then waits for the writer thread"
+        if remaining is not None:
+            self.add(remaining)
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def write_loop(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, threading.Event):
+                chunk.set()
+                continue
+            if self.error is not None:
+                continue
+            try:
+                self.write_chunk(chunk)
+            except Exception as e:
+                self.error = e
+
+    def write_chunk(self, chunk: PassengerStore):
+        columns = store_columns(chunk)
+        file_name = f"chunk_{len(self.manifest['chunks']):05}.{self.format}"
+        path = os.path.join(self.out_dir, file_name)
+        if self.format == 'parquet':
+            pq.write_table(pa.table(columns), path, compression='zstd')
+        else:
+            np.savez_compressed(path, **columns)
+        self.rows_written += chunk.size
+        self.manifest['chunks'] += [{
+            'file': file_name,
+            'rows': chunk.size,
+            'columns': list(columns.keys()),
+            'time_ranges': {
+                col: time_range(values) for col, values in columns.items() if values.dtype.kind == 'M'
+            },
+        }]
+        self.write_manifest()
+
+    def write_manifest(self):
+        "replaces the manifest atomically, so it always lists complete chunks only"
+        path = os.path.join(self.out_dir, MANIFEST_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+
+def load_manifest(run_dir) -> dict:
+    with open(os.path.join(run_dir, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+def load_run(run_dir, columns=None, start=None, end=None, time_column='dest_arrival_time') -> pd.DataFrame:
+    """
+    passenger records of a run indexed by id
+    columns limits the columns read, start and end keep rows whose time_column lies within them,
+    skipping chunks whose manifest time range lies outside
+    """
+    manifest = load_manifest(run_dir)
+    start = np.datetime64(start, 'ns') if start is not None else None
+    end = np.datetime64(end, 'ns') if end is not None else None
+    read_columns = None
+    if columns is not None:
+        read_columns = ['id'] + [col for col in columns if col != 'id']
+        if (start is not None or end is not None) and time_column not in read_columns:
+            read_columns += [time_column]
+    frames = []
+    for chunk in manifest['chunks']:
+        if start is not None or end is not None:
+            chunk_range = chunk['time_ranges'].get(time_column)
+            if chunk_range is None:
+                continue
+            if start is not None and np.datetime64(chunk_range[1], 'ns') < start:
+                continue
+            if end is not None and np.datetime64(chunk_range[0], 'ns') > end:
+                continue
+        path = os.path.join(run_dir, chunk['file'])
+        if manifest['format'] == 'parquet':
+            df = pq.read_table(path, columns=read_columns).to_pandas()
+        else:
+            with np.load(path) as data:
+                df = pd.DataFrame({col: data[col] for col in (read_columns or data.files)})
+        if start is not None:
+            df = df[df[time_column] >= start]
+        if end is not None:
+            df = df[df[time_column] <= end]
+        frames += [df]
+    if not frames:
+        return pd.DataFrame(columns=read_columns or ['id']).set_index('id')
+    df = pd.concat(frames, ignore_index=True).set_index('id')
+    if columns is not None:
+        df = df[[col for col in columns if col != 'id']]
+    return df
@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the streamlit page at the repo root shadows the streamlit package src.utils.Logging imports,
+# so the package is imported before the repo root is put on the path
+sys.path = [p for p in sys.path if os.path.abspath(p or os.curdir) != ROOT]
+import streamlit  # noqa: E402,F401
+sys.path.append(ROOT)
@@ -0,0 +1,49 @@
+import pytest
+
+from src.base.FloorList import FLOOR_LIST
+from src.sim.ArrivalTrace import ArrivalTrace, TraceRecorder
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'arrivals.trc'
+    with TraceRecorder(path, block_size=3) as recorder:
+        for offset, source, target in [(0.5, 'G', 'L05'), (1.0, 'L03', 'G'), (1.0, 'L01', 'L02'), (2.5, 'L07', 'L04')]:
+            recorder.record(offset, source, target)
+        recorder.write([3.0, 4.25, 9.0], ['G', 'L02', 'L09'], ['L08', 'G', 'L01'])
+        recorder.record(10.0, 'G', 'L01')
+        assert recorder.count == 8
+
+    trace = ArrivalTrace(path, block_size=2)
+    assert trace.floors == FLOOR_LIST.list_floors()
+    assert len(trace) == 8
+    assert trace.duration() == 10.0
+    assert list(trace.arrivals()) == [
+        (0.5, ('G', 'L05', 'U')), (1.0, ('L03', 'G', 'D')), (1.0, ('L01', 'L02', 'U')), (2.5, ('L07', 'L04', 'D')),
+        (3.0, ('G', 'L08', 'U')), (4.25, ('L02', 'G', 'D')), (9.0, ('L09', 'L01', 'D')), (10.0, ('G', 'L01', 'U')),
+    ]
+    # every replay feeds the same arrivals
+    assert list(trace.arrivals()) == list(ArrivalTrace(path).arrivals())
+
+
+def test_empty_trace(tmp_path):
+    path = tmp_path / 'empty.trc'
+    with TraceRecorder(path) as recorder:
+        recorder.write([], [], [])
+    trace = ArrivalTrace(path)
+    assert trace.floors == FLOOR_LIST.list_floors()
+    assert len(trace) == 0
+    assert trace.duration() == 0.0
+    assert list(trace.arrivals()) == []
+
+
+def test_offsets_must_not_decrease(tmp_path):
+    with TraceRecorder(tmp_path / 'arrivals.trc') as recorder:
+        recorder.record(5.0, 'G', 'L01')
+        with pytest.raises(ValueError):
+            recorder.record(4.0, 'G', 'L01')
+        with pytest.raises(ValueError):
+            recorder.write([6.0, 5.5], ['G', 'G'], ['L01', 'L02'])
+    not_a_trace = tmp_path / 'other.bin'
+    not_a_trace.write_bytes(b'\0' * 32)
+    with pytest.raises(ValueError):
+        ArrivalTrace(not_a_trace)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from src.metrics.Confidence import t_quantile, confidence_interval
+from src.sim.Replication import ReplicationRunner
+
+
+@pytest.mark.parametrize('p, df, expected', [
+    (0.975, 1, 12.706), (0.975, 3, 3.182), (0.975, 4, 2.776), (0.975, 10, 2.228), (0.975, 29, 2.045),
+    (0.95, 5, 2.015), (0.995, 3, 5.841), (0.995, 20, 2.845),
+    (0.975, 30, 2.042), (0.975, 60, 2.000), (0.975, 120, 1.980), (0.995, 40, 2.704),
+])
+def test_t_quantile_known_values(p, df, expected):
+    assert t_quantile(p, df) == pytest.approx(expected, abs=5e-4)
+
+
+def test_confidence_interval():
+    mean, half_width = confidence_interval([1.0, 2.0, 3.0, 4.0, np.nan])
+    assert mean == 2.5
+    assert half_width == pytest.approx(3.182 * np.std([1, 2, 3, 4], ddof=1) / 2, abs=1e-3)
+    assert np.isnan(confidence_interval([1.0])[1])
+
+
+def result(seed, waiting):
+    return {'seed': seed, 'passengers': 10, 'waiting_time_mean': waiting, 'travel_time_mean': 0.0}
+
+
+def test_convergence_on_contiguous_seeds():
+    runner = ReplicationRunner(half_width=1.0, min_runs=4, base_seed=10)
+    # completion order, seed 12 still running
+    runner.results = [result(10, 5.0), result(13, 5.0), result(11, 5.0), result(14, 5.0)]
+    assert [r['seed'] for r in runner.contiguous_results()] == [10, 11]
+    assert not runner.is_converged()
+    runner.results += [result(12, 5.0)]
+    assert [r['seed'] for r in runner.contiguous_results()] == [10, 11, 12, 13, 14]
+    assert runner.is_converged()
+    # a wide spread among the first seeds is not hidden by later seeds finishing first
+    runner.results = [result(10, 0.0), result(11, 9.0), result(12, 0.0), result(13, 9.0)] + \
+        [result(seed, 4.5) for seed in range(15, 40)]
+    assert not runner.is_converged()
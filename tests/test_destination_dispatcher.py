@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+import numpy as np
+
+from src.base.FloorList import FLOOR_LIST
+from src.base.Lift import Lift
+from src.base.LiftFleet import LiftFleet
+from src.base.DestinationDispatcher import DestinationDispatcher
+from src.base.StopSets import StopSets
+from src.metrics.BoardingTime import boarding_time, boarding_times
+from src.utils.Clock import CLOCK
+
+
+def dispatcher_for(capacities):
+    fleet = LiftFleet()
+    for i, capacity in enumerate(capacities):
+        fleet.add(Lift(f'Dest {i}', FLOOR_LIST.get_bottom_floor(), 'S', capacity=capacity))
+    return DestinationDispatcher(SimpleNamespace(fleet=fleet, stop_sets=StopSets()))
+
+
+def test_trips_to_one_destination_share_a_lift():
+    floors = FLOOR_LIST.list_floors()
+    dispatcher = dispatcher_for([12, 12])
+    allocated = dispatcher.allocate_trips(CLOCK.now(), [floors[0]] * 3, [floors[5], floors[5], floors[9]])
+    # the third trip adds one stop to the lift already stopping at its source, two to the other
+    assert allocated.tolist() == [0, 0, 0]
+
+
+def test_full_lifts_are_skipped():
+    floors = FLOOR_LIST.list_floors()
+    dispatcher = dispatcher_for([0, 2, 1])
+    allocated = dispatcher.allocate_trips(CLOCK.now(), [floors[0]] * 5, [floors[3]] * 5)
+    assert np.bincount(allocated[allocated >= 0], minlength=3).tolist() == [0, 2, 1]
+    assert allocated.tolist()[3:] == [-1, -1]
+
+
+def test_committed_stops_are_reused():
+    floors = FLOOR_LIST.list_floors()
+    dispatcher = dispatcher_for([12, 12])
+    dispatcher.passengers.stop_sets._change('Dest 1', floors[7], 1)
+    allocated = dispatcher.allocate_trips(CLOCK.now(), [floors[0]], [floors[7]])
+    assert allocated.tolist() == [1]
+
+
+def test_boarding_times_match_boarding_time():
+    for capacity in [1, 5, 12]:
+        counts = np.arange(capacity + 1)
+        for off in [0, 1]:
+            for on in [0, 1, 3]:
+                pre = np.maximum(counts, off)
+                expected = [boarding_time(SimpleNamespace(capacity=capacity), p, off, on) for p in pre.tolist()]
+                assert boarding_times(np.full(pre.size, capacity), pre, off, on).tolist() == expected
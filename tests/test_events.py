@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from src.utils.Events import ConsoleSink, FileSink, Notice, StreamlitSink
+
+
+def notices(n):
+    return [Notice(datetime(2026, 1, 1, 8, 0, i), f'notice {i}') for i in range(n)]
+
+
+def test_file_sink_never_drops(tmp_path):
+    sink = FileSink(tmp_path / 'events.log', maxlen=2)
+    for event in notices(5):
+        sink.publish(event)
+    sink.close()
+    lines = (tmp_path / 'events.log').read_text().splitlines()
+    assert lines == [f'2026-01-01 08:00:0{i} notice {i}' for i in range(5)]
+
+
+def test_streamlit_sink_drops_oldest():
+    sink = StreamlitSink(maxlen=3)
+    for event in notices(5):
+        sink.publish(event)
+    assert sink.dropped == 2
+    assert [str(event) for event in sink.drain()] == ['notice 2', 'notice 3', 'notice 4']
+
+
+def test_console_sink_prints_without_buffering(capsys):
+    sink = ConsoleSink()
+    for event in notices(2):
+        sink.publish(event)
+    assert capsys.readouterr().out == 'notice 0\nnotice 1\n'
+    assert not hasattr(sink, 'buffer')
@@ -0,0 +1,22 @@
+from src.base.Floor import Floor
+from src.base.FloorList import FloorList
+
+
+def test_reset_and_add_floor():
+    floors = FloorList(['B', 'G', 'F1'], {'B': -3.0, 'G': 0.0, 'F1': 3.5})
+    assert floors.heights.tolist() == [-3.0, 0.0, 3.5]
+    assert floors.names_of([2, 0]).tolist() == ['F1', 'B']
+    version = floors.version
+
+    floors.add_floor(Floor('F2', 7.0))
+    assert floors.version > version
+    assert floors.heights_of(['F2', 'G']).tolist() == [7.0, 0.0]
+    assert floors.names_of([3]).tolist() == ['F2']
+    assert floors.get_floor_index('F2') == 3
+
+    version = floors.version
+    floors.reset(['G', 'F1'], {'G': 0.0, 'F1': 4.0})
+    assert floors.version > version
+    assert floors.heights.tolist() == [0.0, 4.0]
+    assert floors.floorname_array.tolist() == ['G', 'F1']
+    assert floors.list_floors() == ['G', 'F1']
@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+import numpy as np
+
+from src.base.FloorList import FLOOR_LIST
+from src.base.Lift import Lift
+from src.base.LiftFleet import LiftFleet
+from src.base.MatchingDispatcher import MatchingDispatcher
+from src.base.StopSets import StopSets
+from src.metrics.MinCostAssignment import min_cost_assignment
+from src.utils.Clock import CLOCK
+
+
+def stationed_fleet(capacities):
+    fleet = LiftFleet()
+    for i, capacity in enumerate(capacities):
+        fleet.add(Lift(f'Match {i}', FLOOR_LIST.get_bottom_floor(), 'S', capacity=capacity))
+    return fleet
+
+
+def match(capacities, num_calls, slots=MatchingDispatcher.SLOTS):
+    "number of calls matched to each lift, calls wait one per floor above the bottom"
+    fleet = stationed_fleet(capacities)
+    dispatcher = MatchingDispatcher(SimpleNamespace(fleet=fleet, stop_sets=StopSets()), slots=slots)
+    sources = np.array(FLOOR_LIST.list_floors()[1:num_calls + 1], dtype=object)
+    dirs = np.full(num_calls, 'D', dtype=object)
+    counts = np.ones(num_calls, dtype=np.int64)
+    cost = dispatcher.cost_matrix(CLOCK.now(), sources, dirs, counts)
+    assert cost.shape == (num_calls, len(fleet) * slots)
+    _, columns = min_cost_assignment(cost)
+    return np.bincount(columns % len(fleet), minlength=len(fleet)).tolist()
+
+
+def test_lift_with_k_places_gets_at_most_k_calls():
+    for k in range(1, MatchingDispatcher.SLOTS + 1):
+        assert match([k], MatchingDispatcher.SLOTS + 2)[0] == k
+
+
+def test_lift_takes_at_most_slots_calls():
+    assert match([12], MatchingDispatcher.SLOTS + 2) == [MatchingDispatcher.SLOTS]
+
+
+def test_full_lift_gets_no_calls():
+    assert match([0, 12], 2) == [0, 2]
+
+
+def test_calls_spill_over_to_lifts_with_room():
+    assert match([1, 1, 12], 4) == [1, 1, 2]
@@ -0,0 +1,57 @@
+from itertools import permutations
+import numpy as np
+
+from src.metrics.MinCostAssignment import min_cost_assignment
+
+
+def brute_force_cost(cost):
+    "cheapest total over all matchings of the smaller side, forbidden pairs left out"
+    n, m = cost.shape
+    if n > m:
+        return brute_force_cost(cost.T)
+    best = np.inf
+    for cols in permutations(range(m), n):
+        pairs = cost[np.arange(n), list(cols)]
+        best = min(best, pairs[np.isfinite(pairs)].sum())
+    return best
+
+
+def test_square_matrix():
+    cost = np.array([[4.0, 1.0, 3.0], [2.0, 0.0, 5.0], [3.0, 2.0, 2.0]])
+    rows, cols = min_cost_assignment(cost)
+    assert rows.tolist() == [0, 1, 2]
+    assert sorted(cols.tolist()) == [0, 1, 2]
+    assert cost[rows, cols].sum() == brute_force_cost(cost) == 5.0
+
+
+def test_rectangular_matrices():
+    rng = np.random.default_rng(0)
+    for shape in [(2, 5), (5, 2), (3, 4), (4, 3), (1, 6), (6, 1)]:
+        cost = rng.uniform(0, 10, size=shape)
+        rows, cols = min_cost_assignment(cost)
+        assert rows.size == min(shape)
+        assert len(set(rows.tolist())) == rows.size
+        assert len(set(cols.tolist())) == cols.size
+        assert np.isclose(cost[rows, cols].sum(), brute_force_cost(cost))
+
+
+def test_all_inf_row_is_left_out():
+    cost = np.array([[1.0, 2.0, 3.0], [np.inf, np.inf, np.inf], [2.0, 1.0, np.inf]])
+    rows, cols = min_cost_assignment(cost)
+    assert 1 not in rows.tolist()
+    assert np.isfinite(cost[rows, cols]).all()
+    assert cost[rows, cols].sum() == 2.0
+
+
+def test_forbidden_pairs_taken_only_when_unavoidable():
+    # both rows prefer column 0, row 1 may only use column 0
+    cost = np.array([[1.0, 3.0], [2.0, np.inf]])
+    rows, cols = min_cost_assignment(cost)
+    assert dict(zip(rows.tolist(), cols.tolist())) == {0: 1, 1: 0}
+
+
+def test_empty_and_all_forbidden():
+    rows, cols = min_cost_assignment(np.empty((0, 3)))
+    assert rows.size == cols.size == 0
+    rows, cols = min_cost_assignment(np.full((2, 3), np.inf))
+    assert rows.size == cols.size == 0
@@ -0,0 +1,74 @@
+import numpy as np
+
+from src.base.PassengerList import PassengerList
+from src.base.PassengerStore import PassengerStore
+
+SCHEMA = PassengerList.store_schema
+
+
+def row(i):
+    return {'source': 'G', 'current': 'G', 'target': f'{i:03}', 'dir': 'U', 'status': 'Waiting', 'lift': 0}
+
+
+def store_of(ids, capacity=PassengerStore.INITIAL_CAPACITY):
+    store = PassengerStore(SCHEMA, capacity=capacity)
+    for i in ids:
+        store.append_row(i, row(i))
+    return store
+
+
+def test_growth_across_capacity_keeps_rows():
+    store = store_of(range(1, 5), capacity=4)
+    assert store.capacity == 4
+    store.append_row(5, row(5))
+    assert store.capacity == 8
+    store.extend(store_of(range(6, 21)))
+    assert store.size == 20 and store.capacity == 32
+    assert store.get_ids().tolist() == list(range(1, 21))
+    assert store.column('target').tolist() == [f'{i:03}' for i in range(1, 21)]
+    # rows past size stay empty, so a later append does not see stale values
+    assert store.columns['target'][20:].tolist() == [None] * 12
+    assert store.get(17, 'target') == '017'
+
+
+def test_df_cache_invalidated_by_set():
+    passengers = PassengerList(store=store_of(range(1, 4)))
+    df = passengers.df
+    assert passengers.df is df
+    passengers.store.set(np.array([1]), 'status', 'Onboard')
+    assert passengers.df is not df
+    assert passengers.df.status.tolist() == ['Waiting', 'Onboard', 'Waiting']
+    passengers.store.append_row(4, row(4))
+    assert passengers.df.index.tolist() == [1, 2, 3, 4]
+
+
+def test_remove_then_append_keeps_positions():
+    store = store_of(range(1, 7))
+    store.remove([2, 5])
+    store.append_row(7, row(7))
+    assert store.get_ids().tolist() == [1, 3, 4, 6, 7]
+    assert store.positions_of([7, 1, 6, 2]).tolist() == [4, 0, 3]
+    assert store.get(6, 'target') == '006'
+    assert store.get(7, 'target') == '007'
+
+
+def test_remove_then_append_keeps_positions_of_unsorted_ids():
+    store = store_of([5, 2, 9, 1])
+    assert not store.ids_sorted
+    assert store.positions_of([1, 9]).tolist() == [3, 2]
+    store.remove([2])
+    store.append_row(3, row(3))
+    assert store.positions_of([5, 9, 1, 3, 2]).tolist() == [0, 1, 2, 3]
+    assert store.get(3, 'target') == '003'
+    assert store.get(1, 'target') == '001'
+
+
+def test_take_and_select_are_compact_copies():
+    store = store_of(range(1, 11))
+    taken = store.take(store.column('target') > '005')
+    assert taken.get_ids().tolist() == [6, 7, 8, 9, 10]
+    taken.set(np.array([0]), 'status', 'Arrived')
+    assert store.get(6, 'status') == 'Waiting'
+    selected = PassengerList(store=store).select(np.array([9, 0]))
+    assert selected.get_ids().tolist() == [10, 1]
+    assert selected.store.positions_of([1]).tolist() == [1]
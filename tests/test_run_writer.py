@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.base.PassengerList import PassengerList
+from src.base.PassengerStore import PassengerStore
+import src.utils.RunWriter as run_writer
+from src.utils.RunWriter import RunWriter, load_manifest, load_run
+
+FORMATS = [pytest.param('parquet', marks=pytest.mark.skipif(run_writer.pa is None, reason='needs pyarrow')), 'npz']
+ORIGIN = np.datetime64('2026-01-01T08:00:00', 'ns')
+
+
+def minutes(i):
+    return ORIGIN + np.timedelta64(i, 'm')
+
+
+def store_of(ids):
+    "arrived passengers, id i reaching its destination i minutes after the origin"
+    store = PassengerStore(PassengerList.store_schema)
+    for i in ids:
+        store.append_row(i, {
+            'source': 'G', 'current': f'{i:03}', 'target': f'{i:03}', 'dir': 'U', 'status': 'Arrived', 'lift': 0,
+            'trip_start_time': minutes(i) - np.timedelta64(90, 's'), 'dest_arrival_time': minutes(i),
+            'travel_time': 90.0,
+        })
+    return store
+
+
+def write_run(out_dir, format, chunk_rows=4):
+    writer = RunWriter(out_dir, chunk_rows=chunk_rows, format=format)
+    writer.add(store_of(range(1, 4)))
+    writer.add(store_of(range(4, 9)))
+    writer.add(store_of(range(9, 11)))
+    # a passenger still traveling has no arrival time
+    traveling = PassengerStore(PassengerList.store_schema)
+    traveling.append_row(11, {'source': 'G', 'current': 'G', 'target': '011', 'dir': 'U', 'status': 'Onboard', 'lift': 0})
+    writer.close(remaining=traveling)
+    return writer
+
+
+@pytest.mark.parametrize('format', FORMATS)
+def test_round_trip(tmp_path, format):
+    writer = write_run(tmp_path, format)
+    assert writer.rows_written == 11
+    manifest = load_manifest(tmp_path)
+    assert manifest['format'] == format
+    assert [chunk['rows'] for chunk in manifest['chunks']] == [8, 3]
+    assert manifest['chunks'][0]['time_ranges']['dest_arrival_time'] == [str(minutes(1)), str(minutes(8))]
+
+    df = load_run(tmp_path)
+    assert df.index.tolist() == list(range(1, 12))
+    assert df.target.tolist() == [f'{i:03}' for i in range(1, 12)]
+    assert df.status.tolist() == ['Arrived'] * 10 + ['Onboard']
+    assert df.lift.tolist() == ['Unassigned'] * 11
+    assert df.dest_arrival_time.iloc[:10].tolist() == [minutes(i) for i in range(1, 11)]
+    assert np.isnat(df.dest_arrival_time.to_numpy()[10])
+    assert df.travel_time.iloc[:10].tolist() == [90.0] * 10
+
+
+@pytest.mark.parametrize('format', FORMATS)
+def test_partial_time_range(tmp_path, format):
+    write_run(tmp_path, format)
+    df = load_run(tmp_path, columns=['target'], start=minutes(3), end=minutes(6))
+    assert df.columns.tolist() == ['target']
+    assert df.index.tolist() == [3, 4, 5, 6]
+    assert df.target.tolist() == ['003', '004', '005', '006']
+
+    # chunks outside the range are not read
+    os.remove(tmp_path / load_manifest(tmp_path)['chunks'][1]['file'])
+    assert load_run(tmp_path, start=minutes(2), end=minutes(8)).index.tolist() == list(range(2, 9))
+    assert load_run(tmp_path, columns=['target'], start=minutes(20)).empty
+
+
+def test_npz_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_writer, 'pa', None)
+    with pytest.raises(ImportError):
+        RunWriter(tmp_path / 'parquet', format='parquet')
+    writer = write_run(tmp_path / 'default', None)
+    assert writer.format == 'npz'
+    assert load_run(tmp_path / 'default', columns=['status']).status.tolist() == ['Arrived'] * 10 + ['Onboard']
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from src.base.LiftAssignment import LiftAssignment
+from src.base.PassengerList import PASSENGERS
+from src.sim.PAMultLift import main_virtual
+
+ORIGIN = datetime(2026, 1, 1)
+
+
+def run(**sim_params):
+    main_virtual(timeout=300, seed=1, save_file=False, origin=ORIGIN, **sim_params)
+    return PASSENGERS.history().df
+
+
+def test_simulations_back_to_back_in_one_process():
+    # names registered before, e.g. by earlier benchmarks or runs, do not use up lift bits
+    for i in range(LiftAssignment.MAX_LIFTS - len(LiftAssignment.lift_names)):
+        LiftAssignment.bit(f'Earlier {i}')
+    first = run()
+    assert len(LiftAssignment.lift_names) == 5
+    assert (first.status == 'Arrived').any()
+    second = run()
+    assert len(LiftAssignment.lift_names) == 5
+    assert second.equals(first)
+
+
+def test_dispatchers_back_to_back_in_one_process():
+    for dispatch in ['matching', 'destination', 'matching']:
+        df = run(dispatch=dispatch, num_lifts=4)
+        assert len(LiftAssignment.lift_names) == 4
+        assert (df.status == 'Arrived').any()
@@ -0,0 +1,55 @@
+import pytest
+
+from src.metrics.CalcAccelModelMovingStatus import CalcAccelModelMovingStatus
+from src.metrics.LiftSpec import LiftSpec
+from src.metrics.Trajectory import Trajectory
+
+SPEC = LiftSpec()
+SAMPLE_TIMES = [0.0, 0.3, 1.0, 2.5, 4.0, 7.0, 12.0, 20.0]
+
+
+def assert_matches(trajectory, status, new_height):
+    assert trajectory.arrival_time() == pytest.approx(status.calc_time(new_height))
+    for t in SAMPLE_TIMES:
+        h, d, v = trajectory.state_at(t)
+        expected_h, expected_d, expected_v = status.calc_status(new_height, t)
+        assert (h, d, v) == (pytest.approx(expected_h), expected_d, pytest.approx(expected_v, abs=1e-9))
+
+
+@pytest.mark.parametrize('source, target', [(0.0, 40.0), (30.0, 0.0), (10.0, 13.0), (10.0, 8.0)])
+def test_from_move_matches_moving_status(source, target):
+    dir = 'U' if target > source else 'D'
+    trajectory = Trajectory.from_move(source, target, SPEC)
+    assert_matches(trajectory, CalcAccelModelMovingStatus(source, dir, 0.0, SPEC), target)
+
+
+@pytest.mark.parametrize('height, dir, velocity, new_height', [
+    (0.0, 'U', 1.0, 40.0),   # reaches max speed
+    (30.0, 'D', 4.0, 0.0),   # already at max speed
+    (10.0, 'U', 2.0, 13.0),  # brakes before reaching max speed
+    (10.0, 'U', 3.0, 12.0),  # overshoots and turns back
+    (10.0, 'D', 2.0, 12.0),  # target behind
+])
+def test_from_status_matches_moving_status(height, dir, velocity, new_height):
+    trajectory = Trajectory.from_status(height, dir, velocity, new_height, SPEC)
+    assert_matches(trajectory, CalcAccelModelMovingStatus(height, dir, velocity, SPEC), new_height)
+
+
+def test_uniform_model():
+    spec = LiftSpec(model='unif')
+    trajectory = Trajectory.from_move(0.0, 20.0, spec)
+    assert trajectory.arrival_time() == pytest.approx(spec.calc_time(20.0))
+    # the overhead is split between starting and stopping
+    assert trajectory.state_at(spec.overhead / 4) == (0.0, 'U', 0.0)
+    assert trajectory.state_at(spec.overhead / 2 + 2.5) == (pytest.approx(10.0), 'U', spec.max_v)
+
+    # redirect ahead keeps the speed, a uniform lift stops at once so any floor ahead can be reached
+    redirect = Trajectory.from_status(10.0, 'U', spec.max_v, 14.0, spec)
+    assert redirect.arrival_time() == pytest.approx(1.0 + spec.overhead / 2)
+    assert redirect.state_at(0.5) == (pytest.approx(12.0), 'U', spec.max_v)
+    assert redirect.can_stop_at(0.9, 14.0) and not redirect.can_stop_at(0.9, 13.0)
+
+    # a floor behind is a new move from where the lift stops
+    back = Trajectory.from_status(10.0, 'U', spec.max_v, 2.0, spec)
+    assert back.arrival_time() == pytest.approx(spec.calc_time(8.0))
+    assert back.state_at(back.arrival_time()) == (2.0, 'U', 0.0)
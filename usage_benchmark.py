@@ -0,0 +1,21 @@
+"""
+python usage_benchmark.py save [baseline.json]
+python usage_benchmark.py compare [baseline.json]
+"""
+import sys
+from src.utils.Benchmark import run_suite, save_results, load_results, compare_results, BASELINE_FILE
+
+mode = sys.argv[1] if len(sys.argv) > 1 else 'compare'
+path = sys.argv[2] if len(sys.argv) > 2 else BASELINE_FILE
+results = run_suite()
+if mode == 'save':
+    save_results(results, path)
+    print(f'saved {len(results["results"])} benchmarks to {path}')
+elif mode == 'compare':
+    comparison = compare_results(load_results(path), results)
+    print(comparison.to_string(index=False))
+    if comparison.regression.any():
+        print(f'{comparison.regression.sum()} regressions')
+        sys.exit(1)
+else:
+    raise ValueError('mode is save or compare')
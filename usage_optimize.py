@@ -0,0 +1,14 @@
+from src.sim.Optimizer import SuccessiveHalving
+
+if __name__ == '__main__':
+    search = SuccessiveHalving({
+        'dispatch': ['baseline', 'matching'],
+        'dispatch_params': [{}, {'stop_time': 3.0}, {'stop_time': 8.0}],
+        'onboarding_mode': ['earliest', 'random'],
+        'bypass_prev_assignment': [True, False],
+        'capacity': [10, 12],
+        'lift_spec': [{'a': 1.0, 'max_v': 4.0}, {'a': 1.2, 'max_v': 5.0}],
+    }, num_candidates=27, min_timeout=300, max_timeout=1800, max_replications=4)
+    print(search.run())
+    print('best', search.best)
+    print(f'{search.simulated_seconds} simulated seconds, {search.exhaustive_seconds()} for every candidate at full budget')
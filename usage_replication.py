@@ -0,0 +1,8 @@
+from src.sim.Replication import ReplicationRunner
+
+if __name__ == '__main__':
+    for dispatch in ['baseline', 'matching']:
+        runner = ReplicationRunner(timeout=1800, half_width=1.0, sim_params={'dispatch': dispatch})
+        print(dispatch)
+        print(runner.run())
+        print(runner.results_df())
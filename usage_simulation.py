@@ -1,3 +1,3 @@
 from src.sim.PAMultLift import *
 
-asyncio.run(main=main())
+main_virtual()
@@ -0,0 +1,12 @@
+from src.sim.Sweep import ParameterSweep
+
+if __name__ == '__main__':
+    sweep = ParameterSweep({
+        'num_lifts': [4, 5, 6],
+        'capacity': [10, 12],
+        'lift_spec': [{'a': 1.0, 'max_v': 4.0}, {'a': 1.2, 'max_v': 5.0}],
+        'bypass_prev_assignment': [True, False],
+        'demand_scale': [0.5, 1.0],
+    })
+    print(f'{len(sweep.pending_configs())} of {len(sweep.configs())} configurations to run')
+    print(sweep.run())
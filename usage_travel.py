@@ -6,13 +6,10 @@ import pandas as pd
 import asyncio
 
 import src.base.PassengerList
+import src.base.PassengerBatch
 
 p_list = src.base.PassengerList.PASSENGERS
-p1 = src.base.Passenger.Passenger('G', 'L10', datetime.now())
-p1_df = src.base.PassengerList.PassengerList.passenger_to_df(p1) 
-p2 = src.base.Passenger.Passenger('G', 'L02', datetime.now())
-p2_df = src.base.PassengerList.PassengerList.passenger_to_df(p2)
-pp12 = src.base.PassengerList.PassengerList(pd.concat([p1_df, p2_df]))
+pp12 = src.base.PassengerBatch.PassengerBatch(['G', 'G'], ['L10', 'L02'], datetime.now())
 p_list.passenger_list_arrival(pp12)
 # p_list.passenger_arrival(src.base.Passenger.Passenger('000', '010', datetime.now()))
 # p_list.passenger_arrival(src.base.Passenger.Passenger('000', '002', datetime.now()))
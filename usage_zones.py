@@ -0,0 +1,8 @@
+from src.sim.Zones import Building, ZonedSimulation
+
+if __name__ == '__main__':
+    building = Building.tower(num_floors=100, sky_lobby=50, low_lifts=10, shuttle_lifts=6, high_lifts=14)
+    simulation = ZonedSimulation(building, trip_arrival_rates=building.demand(0.004, 0.00005), seed=1)
+    journeys = simulation.run(timeout=1800)
+    print(journeys.groupby('legs')[['waiting_time', 'travel_time']].describe())
+    print('zone cpu seconds', simulation.zone_cpu_seconds)